@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque, defaultdict
+from datetime import timedelta
+from typing import Callable
+
+import discord
+
+AuditKey = tuple[discord.AuditLogAction, int]
+
+
+class AuditLogIndex:
+    """
+    Per guild ring buffer of gateway audit log entries indexed by (action, target_id),
+    so attribution doesn't need a REST audit log fetch.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._buffers: dict[int, deque[discord.AuditLogEntry]] = defaultdict(deque)
+        self._index: dict[int, dict[AuditKey, deque[discord.AuditLogEntry]]] = defaultdict(dict)
+        self._waiters: dict[tuple[int, AuditKey], list[asyncio.Future]] = defaultdict(list)
+
+    @staticmethod
+    def _target_id(entry: discord.AuditLogEntry) -> int | None:
+        target = entry.target
+        return getattr(target, "id", None)
+
+    def record(self, entry: discord.AuditLogEntry) -> None:
+        """
+        Store a new entry and wake anyone waiting on its key
+        """
+        target_id = self._target_id(entry)
+        if target_id is None:
+            return
+
+        guild_id = entry.guild.id
+        key = (entry.action, target_id)
+        buffer = self._buffers[guild_id]
+        index = self._index[guild_id]
+
+        if len(buffer) >= self.max_entries:
+            oldest = buffer.popleft()
+            oldest_key = (oldest.action, self._target_id(oldest))
+            entries = index.get(oldest_key)
+            if entries:
+                entries.popleft()
+                if not entries:
+                    del index[oldest_key]
+
+        buffer.append(entry)
+        index.setdefault(key, deque()).append(entry)
+
+        for waiter in self._waiters.pop((guild_id, key), []):
+            if not waiter.done():
+                waiter.set_result(True)
+
+    def get(
+            self,
+            guild_id: int,
+            action: discord.AuditLogAction,
+            target_id: int,
+            check: Callable[[discord.AuditLogEntry], bool] | None = None,
+            max_age: float = 15
+    ) -> discord.AuditLogEntry | None:
+        """
+        Newest recent entry for the action on the target, None when there is none
+        """
+        entries = self._index.get(guild_id, {}).get((action, target_id))
+        if not entries:
+            return None
+
+        threshold = discord.utils.utcnow() - timedelta(seconds=max_age)
+        for entry in reversed(entries):
+            if entry.created_at < threshold:
+                break
+            if check is None or check(entry):
+                return entry
+
+        return None
+
+    async def wait_for(
+            self,
+            guild_id: int,
+            action: discord.AuditLogAction,
+            target_id: int,
+            check: Callable[[discord.AuditLogEntry], bool] | None = None,
+            timeout: float = 2.0
+    ) -> discord.AuditLogEntry | None:
+        """
+        Like get, but waits up to timeout seconds for the entry to arrive from the gateway
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+
+        while True:
+            entry = self.get(guild_id, action, target_id, check)
+            remaining = deadline - loop.time()
+            if entry is not None or remaining <= 0:
+                return entry
+
+            key = (guild_id, (action, target_id))
+            waiter = loop.create_future()
+            self._waiters[key].append(waiter)
+            try:
+                if not await asyncio.wait_for(waiter, timeout=remaining):
+                    # The guild was forgotten, its entry will never be recorded
+                    return None
+            except asyncio.TimeoutError:
+                waiters = self._waiters.get(key)
+                if waiters and waiter in waiters:
+                    waiters.remove(waiter)
+                    if not waiters:
+                        del self._waiters[key]
+
+    def forget(self, guild_id: int) -> None:
+        """
+        Drop every entry of a guild and release its waiters empty handed
+        """
+        self._buffers.pop(guild_id, None)
+        self._index.pop(guild_id, None)
+
+        for key in [key for key in self._waiters if key[0] == guild_id]:
+            for waiter in self._waiters.pop(key):
+                if not waiter.done():
+                    waiter.set_result(False)
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._buffers),
+            "entries": sum(len(buffer) for buffer in self._buffers.values()),
+            "waiters": sum(len(waiters) for waiters in self._waiters.values()),
+        }
+
+
+audit_log_index = AuditLogIndex()
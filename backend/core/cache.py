@@ -0,0 +1,148 @@
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Hashable, Callable, Mapping
+
+_caches: dict[str, "TTLCache"] = {}
+
+# Resets of the per guild in-memory state kept outside of a TTLCache, run along with reset_guild_caches
+_guild_reset_hooks: list[Callable[[int | None], None]] = []
+
+
+def freeze_mapping(value: dict | None) -> Mapping | None:
+    """
+    Read-only copy of a JSONB value, so a cached snapshot cannot be changed through it
+    """
+    return MappingProxyType(dict(value)) if value is not None else None
+
+
+class TTLCache:
+    """
+    Size bounded LRU cache whose entries expire after a time-to-live. A guild keyed cache
+    is keyed by a guild id, or by tuples starting with one.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl: float = 300, guild_keyed: bool = True):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.guild_keyed = guild_keyed
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+        _caches[name] = self
+
+    def get(self, key: Hashable) -> Any | None:
+        """
+        Return the cached value, or None when it is missing or expired
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drop a single entry
+        """
+        self._entries.pop(key, None)
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """
+        Drop every entry of a guild keyed cache belonging to the guild
+        """
+        stale = [
+            key for key in self._entries
+            if key == guild_id or (isinstance(key, tuple) and key and key[0] == guild_id)
+        ]
+        for key in stale:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Drop every entry
+        """
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        Return counters describing the cache usage
+        """
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def get_all_cache_stats() -> list[dict]:
+    """
+    Retrieve the counters of every registered cache
+    """
+    return [cache.stats() for cache in _caches.values()]
+
+
+def clear_all_caches() -> None:
+    """
+    Drop the entries of every registered cache
+    """
+    for cache in _caches.values():
+        cache.clear()
+
+
+def reset_guild_caches(guild_id: int | None) -> None:
+    """
+    Drop what the guild keyed caches hold for a guild, or for every guild when None
+    """
+    for cache in _caches.values():
+        if not cache.guild_keyed:
+            continue
+
+        if guild_id is None:
+            cache.clear()
+        else:
+            cache.invalidate_guild(guild_id)
+
+    for hook in _guild_reset_hooks:
+        hook(guild_id)
+
+
+def register_guild_reset(hook: Callable[[int | None], None]) -> None:
+    """
+    Run hook with the guild id, or None for every guild, whenever reset_guild_caches runs,
+    for per guild state held outside of a TTLCache
+    """
+    _guild_reset_hooks.append(hook)
@@ -1,30 +1,458 @@
+import asyncio
+import functools
 import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Callable
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base
+from sqlalchemy import exc, select, update, func, literal, literal_column, DateTime, TypeDecorator, event, text
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base, Session as SyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.core.cache import reset_guild_caches
+from backend.core.helper import get_time_now
+from backend.core.instrumentation import query_metrics, pool_metrics, current_guild_id
 
 load_dotenv(f"io/.env")
 
-Engine = create_engine(
-    os.getenv("POSTGRESQL"),
-    pool_pre_ping=True,
-    pool_recycle=280,
-    pool_timeout=30,
-    pool_size=10,
-    max_overflow=5
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "280"))
+
+# checkout pings every reused connection, background pings idle ones every DB_PING_INTERVAL, off never pings
+PING_MODE = os.getenv("DB_PING_MODE", "checkout").lower()
+PING_INTERVAL = float(os.getenv("DB_PING_INTERVAL", "60"))
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool recording how long each checkout waited for a connection
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+
+        pool_metrics.record_wait((time.perf_counter() - started) * 1000)
+        record.info["checkout_started"] = time.perf_counter()
+        return record
+
+
+Engine = create_async_engine(
+    make_url(os.getenv("POSTGRESQL")).set(drivername="postgresql+asyncpg"),
+    poolclass=MeteredQueuePool,
+    pool_pre_ping=PING_MODE == "checkout",
+    pool_recycle=POOL_RECYCLE,
+    pool_timeout=POOL_TIMEOUT,
+    pool_size=POOL_SIZE,
+    max_overflow=POOL_MAX_OVERFLOW
 )
 
+# Objects returned by directors outlive their session, keep them loaded after commit
+Session = async_sessionmaker(Engine, expire_on_commit=False)
+
 Base = declarative_base()
 
+query_metrics.slow_query_ms = float(os.getenv("SLOW_QUERY_MS", "250"))
+
+
+@event.listens_for(Engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - context._query_started) * 1000
+    query_metrics.record(statement, elapsed_ms, cursor.rowcount)
+
+
+@event.listens_for(Engine.sync_engine, "checkout")
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    # The pre-ping, when enabled, runs between getting the connection and this event
+    started = connection_record.info.pop("checkout_started", None)
+    if started is not None and PING_MODE == "checkout":
+        pool_metrics.record_ping((time.perf_counter() - started) * 1000)
+
+
+def get_pool_stats() -> dict:
+    """
+    Return the live pool state along with the checkout counters
+    """
+    pool = Engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "ping_mode": PING_MODE,
+        **pool_metrics.stats(),
+    }
+
+
+async def keep_pool_healthy():
+    """
+    Ping the idle connections every PING_INTERVAL so dead ones are replaced before a handler gets them
+    """
+    while True:
+        await asyncio.sleep(PING_INTERVAL)
+
+        # The queue is first in first out, checking out the idle count in turn visits each of them once
+        for _ in range(Engine.sync_engine.pool.checkedin()):
+            pool_metrics.health_checks += 1
+            try:
+                async with Engine.connect() as connection:
+                    await connection.execute(text("SELECT 1"))
+            except Exception as e:
+                pool_metrics.health_check_failures += 1
+                print(f"Idle connection health check failed -> {e}")
+
+
+class UnitOfWork:
+    """
+    Session shared by the director calls of one command or interaction, committed once when it ends
+    and rolled back when it fails. The session is only created by the first director call needing it,
+    commands answered from the caches never check out a connection.
+    """
+
+    __slots__ = ("task", "guild_id", "session", "guild_ids", "after_commit", "open")
+
+    def __init__(self, guild_id: int | None = None):
+        self.task = asyncio.current_task()
+        self.guild_id = guild_id
+        self.session: AsyncSession | None = None
+        # Guilds whose cached state may hold rows of this unit of work, None when one is unknown
+        self.guild_ids: set[int | None] = set()
+        self.after_commit: list[Callable[[], None]] = []
+        self.open = True
+
+
+_unit_of_work: ContextVar[UnitOfWork | None] = ContextVar("unit_of_work", default=None)
+
+
+def _current_unit_of_work() -> UnitOfWork | None:
+    """
+    The open unit of work of this task, tasks spawned from it get their own sessions
+    """
+    work = _unit_of_work.get()
+    if work is None or not work.open or work.task is not asyncio.current_task():
+        return None
+    return work
+
+
+@event.listens_for(SyncSession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state):
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SyncSession, "after_flush")
+def _track_flush_writes(session, flush_context):
+    session.info["wrote"] = True
+
+
+def begin_unit_of_work(guild_id: int | None = None):
+    """
+    Bind a unit of work to the current command or interaction, returns the token for end_unit_of_work
+    """
+    return _unit_of_work.set(UnitOfWork(guild_id))
+
+
+async def end_unit_of_work(token, failed: bool = False) -> None:
+    """
+    Commit the unit of work bound by begin_unit_of_work and release it, or roll it back when
+    the command or callback failed. A failed commit is raised once the changes were rolled back.
+    """
+    work = _unit_of_work.get()
+    _unit_of_work.reset(token)
+    work.open = False
+
+    if work.session is None:
+        return
+
+    if failed:
+        await _discard_unit_of_work(work)
+        return
+
+    try:
+        await work.session.commit()
+    except Exception:
+        await _discard_unit_of_work(work)
+        raise
+
+    await work.session.close()
+
+    for callback in work.after_commit:
+        callback()
+
+
+async def _discard_unit_of_work(work: UnitOfWork) -> None:
+    work.open = False
+    work.after_commit.clear()
+
+    session, work.session = work.session, None
+    try:
+        await session.rollback()
+    finally:
+        await session.close()
+
+    if not session.info.get("wrote"):
+        return
+
+    # Only the guilds this unit of work touched may have cached rows that were rolled back
+    for guild_id in work.guild_ids:
+        reset_guild_caches(guild_id)
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """
+    Run callback once the writes of the current unit of work are committed, dropped when it is
+    rolled back. Outside of a unit of work the writes are already committed and it runs at once.
+    """
+    work = _current_unit_of_work()
+    if work is None:
+        callback()
+    else:
+        work.after_commit.append(callback)
 
-def init_tables():
+
+def _guild_of(args) -> int | None:
+    for arg in args:
+        guild = getattr(arg, "guild", None)
+        if guild is not None:
+            return getattr(guild, "id", None)
+    return None
+
+
+def unit_of_work(func):
+    """
+    Decorator running a view or listener callback in its own unit of work
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = begin_unit_of_work(_guild_of(args))
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException:
+            await end_unit_of_work(token, failed=True)
+            raise
+
+        await end_unit_of_work(token)
+        return result
+
+    return wrapper
+
+
+@asynccontextmanager
+async def get_session():
+    """
+    Session of the current unit of work, or a fresh one outside of them
+    """
+    work = _current_unit_of_work()
+
+    if work is None:
+        async with Session() as session:
+            yield session
+        return
+
+    if work.session is None:
+        work.session = Session(info={"unit_of_work": True})
+
+    guild_id = current_guild_id()
+    work.guild_ids.add(guild_id if guild_id is not None else work.guild_id)
+
+    try:
+        yield work.session
+    except BaseException:
+        # Rows flushed before the error must not be committed by a later call or the end of the request,
+        # a nested call may already have discarded it
+        if work.session is not None:
+            await _discard_unit_of_work(work)
+        raise
+
+
+async def commit(session: AsyncSession) -> None:
+    """
+    Commit, or only flush when the session belongs to a unit of work committed at its end
+    """
+    if session.info.get("unit_of_work"):
+        await session.flush()
+    else:
+        await session.commit()
+
+
+class NaiveDateTime(TypeDecorator):
+    """
+    Timestamp without time zone that accepts aware datetimes by keeping their wall clock time,
+    the way Postgres treats an offset given to a timestamp column (asyncpg refuses them otherwise).
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            return value.replace(tzinfo=None)
+        return value
+
+
+def _column_default(column) -> Any:
+    default = column.default
+    if default is None:
+        return None
+    return default.arg(None) if default.is_callable else default.arg
+
+
+def _build_assignments(model, values: dict[str, Any], merge: dict[str, dict] | None) -> dict[str, Any]:
+    """
+    Column assignments for an UPDATE, JSONB columns in merge are shallow merged with ||
+    """
+    columns = model.__table__.c
+    assignments: dict[str, Any] = dict(values)
+
+    for name, partial in (merge or {}).items():
+        if partial:
+            current = func.coalesce(columns[name], literal({}, JSONB))
+            assignments[name] = current.op("||")(literal(partial, JSONB))
+
+    if assignments and "updated_at" in columns and "updated_at" not in assignments:
+        assignments["updated_at"] = get_time_now()
+
+    return assignments
+
+
+def _known_columns(model, values: dict[str, Any]) -> dict[str, Any]:
+    columns = model.__table__.c
+    return {field: value for field, value in values.items() if value is not None and field in columns}
+
+
+async def upsert(
+        session: AsyncSession,
+        model,
+        keys: dict[str, Any],
+        values: dict[str, Any] | None = None,
+        merge: dict[str, dict] | None = None,
+        defaults: dict[str, Any] | None = None
+):
+    """
+    Create or update a row with a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+    keys must match a unique constraint, None values and unknown columns are ignored,
+    merge holds partial dicts for JSONB columns and defaults only apply on insert.
+    With nothing to change an existing row is only read, never rewritten.
+    Returns the row and whether it was created.
+    """
+    values = _known_columns(model, values or {})
+    columns = model.__table__.c
+
+    insert_values = {**_known_columns(model, defaults or {}), **values, **keys}
+    for name, partial in (merge or {}).items():
+        insert_values[name] = {**(_column_default(columns[name]) or {}), **(partial or {})}
+
+    assignments = _build_assignments(model, values, merge)
+    if not assignments:
+        # A no-op DO UPDATE would still lock the row and write a new version of it
+        statement = (
+            insert(model)
+            .values(**insert_values)
+            .on_conflict_do_nothing(index_elements=list(keys))
+            .returning(model)
+            .execution_options(populate_existing=True)
+        )
+
+        created = await session.scalar(statement)
+        if created is not None:
+            return created, True
+        return await session.scalar(select(model).filter_by(**keys)), False
+
+    statement = (
+        insert(model)
+        .values(**insert_values)
+        .on_conflict_do_update(index_elements=list(keys), set_=assignments)
+        .returning(model, literal_column("(xmax = 0)").label("created"))
+        .execution_options(populate_existing=True)
+    )
+
+    row = (await session.execute(statement)).one()
+    return row[0], bool(row[1])
+
+
+async def update_returning(
+        session: AsyncSession,
+        model,
+        keys: dict[str, Any],
+        values: dict[str, Any] | None = None,
+        merge: dict[str, dict] | None = None
+):
+    """
+    Update an existing row with a single UPDATE ... RETURNING, same rules as upsert.
+    Falls back to a plain SELECT when there is nothing to change, None when no row matches.
+    """
+    assignments = _build_assignments(model, _known_columns(model, values or {}), merge)
+    if not assignments:
+        return await session.scalar(select(model).filter_by(**keys))
+
+    statement = (
+        update(model)
+        .filter_by(**keys)
+        .values(**assignments)
+        .returning(model)
+        .execution_options(populate_existing=True)
+    )
+
+    return await session.scalar(statement)
+
+
+async def insert_missing(
+        session: AsyncSession,
+        model,
+        keys: list[str],
+        rows: list[dict[str, Any]],
+        batch_size: int = 1000
+) -> list[tuple]:
+    """
+    Bulk create rows with INSERT ... ON CONFLICT DO NOTHING, keys must match a unique constraint.
+    Rows must share the same fields, returns the keys of the rows that were created.
+    """
+    key_columns = [model.__table__.c[key] for key in keys]
+    created: list[tuple] = []
+
+    # Batched to stay under the bind parameter limit of the driver
+    for start in range(0, len(rows), batch_size):
+        statement = (
+            insert(model)
+            .values(rows[start:start + batch_size])
+            .on_conflict_do_nothing(index_elements=keys)
+            .returning(*key_columns)
+        )
+        created.extend(tuple(row) for row in await session.execute(statement))
+
+    return created
+
+
+async def init_tables():
     # noinspection PyUnresolvedReferences
     from backend.guilds.models.guild import Guild
 
+    # noinspection PyUnresolvedReferences
+    from backend.guilds.models.panel_message import PanelMessage
+
     # noinspection PyUnresolvedReferences
     from backend.permissions.models.permission import Permission
 
+    # noinspection PyUnresolvedReferences
+    from backend.permissions.models.command_cooldown import CommandCooldown
+
     # noinspection PyUnresolvedReferences
     from backend.punishments.models.punishment import Punishment
 
@@ -46,4 +474,8 @@ def init_tables():
     # noinspection PyUnresolvedReferences
     from backend.voice.models.voice import Voice
 
-    Base.metadata.create_all(Engine)
+    from backend.core.migrations import run_migrations
+
+    async with Engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+        await run_migrations(connection)
@@ -0,0 +1,94 @@
+import asyncio
+
+import discord
+
+from backend.core.cache import TTLCache
+from backend.core.workers import WorkerPool, get_retry_after
+
+
+class DMOutbox:
+    """
+    Delivers private messages in the background with bounded concurrency, members
+    known to have their DMs closed are skipped until the entry expires.
+    """
+
+    def __init__(self, workers: int = 8, max_attempts: int = 3):
+        self.max_attempts = max_attempts
+        self.delivered = 0
+        self.failed = 0
+        self.skipped = 0
+        self._pool = WorkerPool("dm_outbox", workers=workers, per_key_limit=1)
+        self._closed = TTLCache("closed_dms", max_size=16384, ttl=6 * 3600, guild_keyed=False)
+
+    def send(self, user: discord.abc.User, message: str, ctx=None) -> asyncio.Task:
+        """
+        Queue a DM and return a task resolving to whether it was delivered, ctx is told on failure
+        """
+        return asyncio.create_task(self._send(user, message, ctx))
+
+    async def _send(self, user: discord.abc.User, message: str, ctx) -> bool:
+        if user is None:
+            return False
+
+        if self._closed.get(user.id):
+            self.skipped += 1
+            delivered = False
+        else:
+            try:
+                delivered = await self._pool.submit(user.id, lambda: self._deliver(user, message))
+            except Exception:
+                delivered = False
+
+        if delivered:
+            self.delivered += 1
+            return True
+
+        self.failed += 1
+        if ctx:
+            try:
+                await ctx.reply(f"Wasn't able to message **{user}**.")
+            except Exception:
+                pass
+
+        return False
+
+    async def _deliver(self, user: discord.abc.User, message: str) -> bool:
+        for attempt in range(self.max_attempts):
+            try:
+                await user.send(message)
+                return True
+            except discord.Forbidden as e:
+                # 50007 also answers for users sharing no guild with the bot, like one just banned or kicked
+                if e.code == 50007 and self._shares_another_guild(user):
+                    self._closed.set(user.id, True)
+                return False
+            except discord.HTTPException as e:
+                # Rate limits are retried by the pool, server errors here
+                if get_retry_after(e) is not None:
+                    raise
+                if e.status < 500 or attempt + 1 == self.max_attempts:
+                    return False
+
+                await asyncio.sleep(2 ** attempt)
+
+        return False
+
+    @staticmethod
+    def _shares_another_guild(user: discord.abc.User) -> bool:
+        """
+        Whether the user is still in a guild of the bot besides the one of the member being messaged,
+        which the cache may still list right after a ban or kick
+        """
+        left = getattr(user, "guild", None)
+        return any(guild is not left and guild.get_member(user.id) is not None for guild in user.mutual_guilds)
+
+    def stats(self) -> dict:
+        return {
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "closed": len(self._closed),
+        }
+
+
+dm_outbox = DMOutbox()
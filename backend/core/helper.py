@@ -1,3 +1,4 @@
+import asyncio
 import json
 import random
 import re
@@ -12,6 +13,8 @@ import pytz
 from dateutil.parser import isoparse
 from discord.ext import commands
 
+from backend.core.dm_outbox import dm_outbox
+
 
 def get_current_time(format: str = "%d %B %Y %H:%M", timezone: str = "Europe/London") -> str:
     """
@@ -212,17 +215,12 @@ def generate_id(length: int = 12, symbols: bool = True) -> str:
     return ''.join(random.choices(chars, k=length))
 
 
-async def send_private_dm(member: discord.Member, message: str, ctx=None) -> bool:
+def send_private_dm(member: discord.Member, message: str, ctx=None) -> asyncio.Task:
     """
-    Attempt to send a private DM to a member; notify context on failure.
+    Queue a private DM to a member on the outbox; notify context on failure.
+    The returned task resolves to whether it was delivered.
     """
-    try:
-        await member.send(message)
-        return True
-    except Exception:
-        if ctx:
-            await ctx.reply(f"Wasn't able to message **{member}**.")
-        return False
+    return dm_outbox.send(member, message, ctx)
 
 
 def is_valid_url(url: str) -> bool:
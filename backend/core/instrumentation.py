@@ -0,0 +1,206 @@
+import bisect
+import functools
+import inspect
+from collections import deque
+from contextvars import ContextVar
+from typing import Any
+
+# Upper bounds in milliseconds, growing by half each bucket from 0.1ms to about 30s
+_BUCKETS: list[float] = [0.1 * 1.5 ** i for i in range(32)]
+
+_query_tag: ContextVar[tuple[str, int | None]] = ContextVar("query_tag", default=("untagged", None))
+
+
+class LatencyHistogram:
+    """
+    Bucketed latency distribution with query and row counters
+    """
+
+    __slots__ = ("counts", "queries", "calls", "rows", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKETS) + 1)
+        self.queries = 0
+        self.calls = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms: float, rows: int) -> None:
+        self.counts[bisect.bisect_left(_BUCKETS, elapsed_ms)] += 1
+        self.queries += 1
+        self.rows += max(rows, 0)
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-th quantile
+        """
+        if not self.queries:
+            return 0.0
+
+        threshold = q * self.queries
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= threshold:
+                return _BUCKETS[index] if index < len(_BUCKETS) else self.max_ms
+
+        return self.max_ms
+
+
+class QueryMetrics:
+    """
+    Per director function query latency histograms, per guild time and a log of slow queries
+    """
+
+    def __init__(self, slow_query_ms: float = 250, max_guilds: int = 10000):
+        self.slow_query_ms = slow_query_ms
+        self.max_guilds = max_guilds
+        self.functions: dict[str, LatencyHistogram] = {}
+        self.guild_ms: dict[int, float] = {}
+        self.slow_queries: deque[dict] = deque(maxlen=50)
+
+    def record(self, statement: str, elapsed_ms: float, rows: int) -> None:
+        function, guild_id = _query_tag.get()
+
+        histogram = self.functions.get(function)
+        if histogram is None:
+            histogram = self.functions[function] = LatencyHistogram()
+        histogram.record(elapsed_ms, rows)
+
+        if guild_id is not None:
+            if guild_id not in self.guild_ms and len(self.guild_ms) >= self.max_guilds:
+                self.guild_ms.clear()
+            self.guild_ms[guild_id] = self.guild_ms.get(guild_id, 0.0) + elapsed_ms
+
+        if elapsed_ms >= self.slow_query_ms:
+            statement = " ".join(statement.split())
+            self.slow_queries.append({
+                "function": function,
+                "guild_id": guild_id,
+                "elapsed_ms": elapsed_ms,
+                "statement": statement,
+            })
+            print(f"Slow query of {elapsed_ms:.0f}ms in {function} for guild {guild_id} -> {statement[:300]}")
+
+    def count_call(self, function: str) -> None:
+        histogram = self.functions.get(function)
+        if histogram is None:
+            histogram = self.functions[function] = LatencyHistogram()
+        histogram.calls += 1
+
+    def stats(self) -> list[dict]:
+        """
+        Return the percentiles of every function, most expensive first
+        """
+        return sorted((
+            {
+                "function": function,
+                "calls": histogram.calls,
+                "queries": histogram.queries,
+                "rows": histogram.rows,
+                "total_ms": histogram.total_ms,
+                "p50": histogram.percentile(0.50),
+                "p95": histogram.percentile(0.95),
+                "p99": histogram.percentile(0.99),
+                "max_ms": histogram.max_ms,
+            }
+            for function, histogram in self.functions.items()
+        ), key=lambda stats: stats["total_ms"], reverse=True)
+
+    def reset(self) -> None:
+        self.functions.clear()
+        self.guild_ms.clear()
+        self.slow_queries.clear()
+
+
+query_metrics = QueryMetrics()
+
+
+class PoolMetrics:
+    """
+    Connection pool checkout wait, pre-ping and background health check counters
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait = LatencyHistogram()
+        self.ping = LatencyHistogram()
+        self.health_checks = 0
+        self.health_check_failures = 0
+
+    def record_wait(self, elapsed_ms: float) -> None:
+        self.checkouts += 1
+        self.wait.record(elapsed_ms, 0)
+
+    def record_ping(self, elapsed_ms: float) -> None:
+        self.ping.record(elapsed_ms, 0)
+
+    def stats(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_p50": self.wait.percentile(0.50),
+            "wait_p99": self.wait.percentile(0.99),
+            "wait_max": self.wait.max_ms,
+            "pings": self.ping.queries,
+            "ping_p50": self.ping.percentile(0.50),
+            "ping_total": self.ping.total_ms,
+            "health_checks": self.health_checks,
+            "health_check_failures": self.health_check_failures,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+def current_guild_id() -> int | None:
+    """
+    Guild of the director call running in this context, None outside of them or when it has none
+    """
+    return _query_tag.get()[1]
+
+
+def _resolve_guild_id(arguments: dict[str, Any]) -> int | None:
+    if arguments.get("guild_id") is not None:
+        return arguments["guild_id"]
+
+    for name in ("guild", "ctx", "interaction"):
+        value = arguments.get(name)
+        if value is None:
+            continue
+
+        guild = value if name == "guild" else getattr(value, "guild", None)
+        if guild is not None:
+            return getattr(guild, "id", None)
+
+    return None
+
+
+def instrumented(func):
+    """
+    Decorator tagging the queries of a director function with its name and guild
+    """
+    # backend.punishments.director.get_punishment is tagged punishments.get_punishment
+    module = func.__module__.split(".")
+    name = f"{module[-2] if len(module) > 1 else module[0]}.{func.__name__}"
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            guild_id = _resolve_guild_id(signature.bind_partial(*args, **kwargs).arguments)
+        except TypeError:
+            guild_id = None
+
+        query_metrics.count_call(name)
+        token = _query_tag.set((name, guild_id))
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _query_tag.reset(token)
+
+    return wrapper
@@ -0,0 +1,181 @@
+import asyncio
+from collections import deque
+
+import discord
+
+from backend.core.workers import get_retry_after
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARACTERS = 6000
+
+
+class LogEntry:
+    """
+    Handle of a queued embed, resolves once it was posted so the embed can still be edited
+    """
+
+    __slots__ = ("embed", "posted", "batch")
+
+    def __init__(self, embed: discord.Embed):
+        self.embed = embed
+        self.posted: asyncio.Future[discord.Message | None] = asyncio.get_running_loop().create_future()
+        self.batch: _PostedBatch | None = None
+
+
+class _PostedBatch:
+    """
+    Entries sharing one message, edits go out one at a time so each carries every earlier change
+    """
+
+    __slots__ = ("entries", "lock")
+
+    def __init__(self, entries: list[LogEntry]):
+        self.entries = entries
+        self.lock = asyncio.Lock()
+
+
+class LogDispatcher:
+    """
+    Background sender for logging channel embeds, pending embeds of a channel are
+    coalesced into messages of up to 10 embeds so bursts don't hit the channel rate limit.
+    """
+
+    def __init__(self, flush_interval: float = 0.5, max_queued: int = 500, max_attempts: int = 3):
+        self.flush_interval = flush_interval
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.sent_messages = 0
+        self.sent_embeds = 0
+        self.retried = 0
+        self.dropped = 0
+        self.edited = 0
+        self._channels: dict[int, discord.abc.Messageable] = {}
+        self._queues: dict[int, deque[LogEntry]] = {}
+        self._wakeups: dict[int, asyncio.Event] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    def send(self, channel: discord.abc.GuildChannel, embed: discord.Embed) -> LogEntry:
+        """
+        Queue an embed for a channel and return straight away, the oldest one is dropped when full
+        """
+        queue = self._queues.setdefault(channel.id, deque())
+        self._channels[channel.id] = channel
+
+        if len(queue) >= self.max_queued:
+            queue.popleft().posted.set_result(None)
+            self.dropped += 1
+
+        entry = LogEntry(embed)
+        queue.append(entry)
+
+        task = self._tasks.get(channel.id)
+        if task is None or task.done():
+            self._wakeups[channel.id] = asyncio.Event()
+            self._tasks[channel.id] = asyncio.create_task(self._drain(channel.id))
+        elif len(queue) >= MAX_EMBEDS_PER_MESSAGE:
+            self._wakeups[channel.id].set()
+
+        return entry
+
+    async def edit(self, entry: LogEntry, embed: discord.Embed) -> bool:
+        """
+        Replace a queued or posted embed, returns whether it was shown
+        """
+        entry.embed = embed
+        if not entry.posted.done():
+            # Still queued, the new embed goes out in its place
+            return True
+
+        message = entry.posted.result()
+        if message is None:
+            return False
+
+        async with entry.batch.lock:
+            try:
+                await message.edit(embeds=[posted.embed for posted in entry.batch.entries])
+            except Exception as e:
+                print(f"Wasn't able to edit logs in {message.channel.id} -> {e}")
+                return False
+
+        self.edited += 1
+        return True
+
+    @staticmethod
+    def _take_batch(queue: deque[LogEntry]) -> list[LogEntry]:
+        batch: list[LogEntry] = []
+        characters = 0
+
+        while queue and len(batch) < MAX_EMBEDS_PER_MESSAGE:
+            size = len(queue[0].embed)
+            if batch and characters + size > MAX_EMBED_CHARACTERS:
+                break
+
+            batch.append(queue.popleft())
+            characters += size
+
+        return batch
+
+    async def _drain(self, channel_id: int) -> None:
+        queue = self._queues[channel_id]
+        wakeup = self._wakeups[channel_id]
+
+        while queue:
+            if len(queue) < MAX_EMBEDS_PER_MESSAGE:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            wakeup.clear()
+            await self._deliver(self._channels[channel_id], self._take_batch(queue))
+
+        self._queues.pop(channel_id, None)
+        self._channels.pop(channel_id, None)
+        self._wakeups.pop(channel_id, None)
+        self._tasks.pop(channel_id, None)
+
+    async def _deliver(self, channel: discord.abc.Messageable, batch: list[LogEntry]) -> None:
+        for attempt in range(self.max_attempts):
+            try:
+                message = await channel.send(embeds=[entry.embed for entry in batch])
+            except (discord.Forbidden, discord.NotFound) as e:
+                print(f"Wasn't able to send logs to {channel.id}. Dropping {len(batch)} embed(s)! -> {e}")
+                break
+            except Exception as e:
+                if attempt + 1 == self.max_attempts:
+                    print(f"Wasn't able to send logs to {channel.id}. Dropping {len(batch)} embed(s)! -> {e}")
+                    break
+
+                self.retried += 1
+                retry_after = get_retry_after(e)
+                await asyncio.sleep(retry_after if retry_after is not None else 2 ** attempt)
+            else:
+                self.sent_messages += 1
+                self.sent_embeds += len(batch)
+
+                posted = _PostedBatch(batch)
+                for entry in batch:
+                    entry.batch = posted
+                    entry.posted.set_result(message)
+                return
+
+        self.dropped += len(batch)
+        for entry in batch:
+            entry.posted.set_result(None)
+
+    def stats(self) -> dict:
+        """
+        Return counters describing the queued and sent logs
+        """
+        return {
+            "channels": len(self._queues),
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "sent_messages": self.sent_messages,
+            "sent_embeds": self.sent_embeds,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "edited": self.edited,
+        }
+
+
+log_dispatcher = LogDispatcher()
@@ -0,0 +1,101 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Arbitrary key for the advisory lock keeping two instances from migrating at once
+_MIGRATION_LOCK_KEY = 724_310_512
+
+# Applied in order, each version only once. Statements must also be safe on a database
+# freshly created from the models, which already holds everything declared there.
+# Statements changing data return the keys of the rows they touched, which are printed.
+MIGRATIONS: list[tuple[int, str, list[str]]] = [
+    (1, "composite indexes for hot lookups", [
+        # Keep the oldest row of any duplicated command before making the pair unique
+        """
+        DELETE FROM permissions p
+        USING permissions d
+        WHERE p.guild_id = d.guild_id
+          AND p.command_name = d.command_name
+          AND p.command_id > d.command_id
+        RETURNING p.command_id
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_permissions_guild_command ON permissions (guild_id, command_name)",
+        "CREATE INDEX IF NOT EXISTS ix_punishments_guild_user_type_active "
+        "ON punishments (guild_id, user_id, type, is_active)",
+        "CREATE INDEX IF NOT EXISTS ix_punishments_guild_user_added "
+        "ON punishments (guild_id, user_id, added_at, punishment_id)",
+        "CREATE INDEX IF NOT EXISTS ix_punishments_active_expires_at "
+        "ON punishments (expires_at) WHERE is_active AND expires_at IS NOT NULL",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_guild_user_closed ON tickets (guild_id, user_id, is_closed)",
+        "CREATE INDEX IF NOT EXISTS ix_tickets_guild_user_created "
+        "ON tickets (guild_id, user_id, created_at, ticket_id)",
+        "CREATE INDEX IF NOT EXISTS ix_voices_guild_user_deleted ON voices (guild_id, user_id, is_deleted)",
+    ]),
+    (2, "one open ticket per user", [
+        # Keep the newest open ticket of a user, the older ones are closed by nobody
+        """
+        UPDATE tickets t
+        SET is_closed = true, closed_at = now() AT TIME ZONE 'Europe/London'
+        FROM tickets d
+        WHERE t.guild_id = d.guild_id
+          AND t.user_id = d.user_id
+          AND NOT t.is_closed
+          AND NOT d.is_closed
+          AND t.ticket_id < d.ticket_id
+        RETURNING t.ticket_id
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_tickets_guild_user_open ON tickets (guild_id, user_id) WHERE NOT is_closed",
+    ]),
+    (3, "naive command cooldown expiries", [
+        # Running cooldowns keep their expiry as the naive Europe/London time the store compares
+        # against, a table created from the models is already naive and left alone
+        """
+        DO $$
+        BEGIN
+            IF (SELECT data_type FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'command_cooldowns'
+                  AND column_name = 'expires_at'
+            ) = 'timestamp with time zone' THEN
+                ALTER TABLE command_cooldowns
+                ALTER COLUMN expires_at TYPE TIMESTAMP WITHOUT TIME ZONE
+                USING expires_at AT TIME ZONE 'Europe/London';
+            END IF;
+        END $$
+        """,
+    ]),
+]
+
+
+async def run_migrations(connection: AsyncConnection) -> list[int]:
+    """
+    Apply every pending migration inside the given transaction, returns the applied versions
+    """
+    await connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "name VARCHAR NOT NULL, "
+        "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+    ))
+    await connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _MIGRATION_LOCK_KEY})
+
+    applied = set((await connection.scalars(text("SELECT version FROM schema_migrations"))).all())
+    ran: list[int] = []
+
+    for version, name, statements in sorted(MIGRATIONS):
+        if version in applied:
+            continue
+
+        for statement in statements:
+            result = await connection.execute(text(statement))
+            if result.returns_rows:
+                keys = ", ".join(str(key) for key in result.scalars())
+                print(f"Database migration #{version} {name} changed rows -> {keys or "none"}")
+
+        await connection.execute(
+            text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+            {"version": version, "name": name}
+        )
+        print(f"Applied database migration #{version} {name}")
+        ran.append(version)
+
+    return ran
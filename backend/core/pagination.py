@@ -1,6 +1,11 @@
+import math
+from typing import Any, Callable, Protocol, Sequence
+
 from discord import Embed, Interaction, ButtonStyle
 from discord.ui import View, Button
+from sqlalchemy import Select, func, select, tuple_
 
+from backend.core.database import get_session
 from backend.core.helper import get_time_now
 
 
@@ -46,12 +51,16 @@ class Pagination(View):
         self.author_id = author_id
         self.build_buttons()
 
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
     def create_embed(self) -> Embed:
         embed = Embed(
             title=self.title,
             color=0x393A41,
             timestamp=get_time_now()
-        ).set_footer(text=f"{self.page + 1}/{len(self.pages)}")
+        ).set_footer(text=f"{self.page + 1}/{self.page_count}")
 
         if not self.is_field:
             embed.description = self.pages[self.page] if self.pages else ""
@@ -65,7 +74,7 @@ class Pagination(View):
     def build_buttons(self):
         self.clear_items()
 
-        if len(self.pages) <= 1:
+        if self.page_count <= 1:
             return
 
         if self.page > 0:
@@ -74,7 +83,7 @@ class Pagination(View):
         self.add_item(Button(label="◀️", style=ButtonStyle.blurple, custom_id="prev"))
         self.add_item(Button(label="▶️", style=ButtonStyle.blurple, custom_id="next"))
 
-        if self.page < len(self.pages) - 1:
+        if self.page < self.page_count - 1:
             self.add_item(Button(label="⏭️", style=ButtonStyle.grey, custom_id="last"))
 
     async def interaction_check(self, interaction: Interaction) -> bool:
@@ -96,10 +105,161 @@ class Pagination(View):
                 if self.page > 0:
                     self.page -= 1
             case "next":
-                if self.page < len(self.pages) - 1:
+                if self.page < self.page_count - 1:
                     self.page += 1
             case "last":
-                self.page = len(self.pages) - 1
+                self.page = self.page_count - 1
+
+        self.build_buttons()
+        await interaction.message.edit(embed=self.create_embed(), view=self)
+
+
+class PageSource(Protocol):
+    """
+    Provides the pages of a SourcePagination view on demand
+    """
+
+    async def get_page_count(self) -> int:
+        ...
+
+    async def get_page(self, page: int) -> list[str]:
+        ...
+
+
+class KeysetPageSource:
+    """
+    Page source over a select statement using keyset pagination on the given key columns,
+    pages are fetched relative to the previously fetched one and only its rows are rendered.
+    """
+
+    def __init__(
+            self,
+            statement: Select,
+            key_columns: Sequence[Any],
+            render: Callable[[Any], str],
+            per_page: int
+    ):
+        self.statement = statement
+        self.key_columns = key_columns
+        self.render = render
+        self.per_page = per_page
+        self.total: int | None = None
+        self._page: int | None = None
+        self._first_key: tuple | None = None
+        self._last_key: tuple | None = None
+
+    def _key(self, row) -> tuple:
+        return tuple(getattr(row, column.key) for column in self.key_columns)
+
+    async def get_page_count(self) -> int:
+        if self.total is None:
+            async with get_session() as session:
+                self.total = await session.scalar(
+                    select(func.count()).select_from(self.statement.order_by(None).subquery())
+                )
+
+        return max(1, math.ceil(self.total / self.per_page))
+
+    async def _fetch(self, after: tuple | None = None, before: tuple | None = None, limit: int | None = None):
+        key = tuple_(*self.key_columns)
+        statement = self.statement
+
+        if after is not None:
+            statement = statement.filter(key > tuple_(*after))
+        if before is not None:
+            statement = statement.filter(key < tuple_(*before))
+
+        # Walking backwards reads the rows in reverse and flips them back
+        backwards = before is not None or (after is None and limit is not None)
+        order = [column.desc() if backwards else column.asc() for column in self.key_columns]
+        statement = statement.order_by(*order).limit(limit or self.per_page)
+
+        async with get_session() as session:
+            rows = (await session.scalars(statement)).all()
+
+        return list(reversed(rows)) if backwards else list(rows)
+
+    async def get_page(self, page: int) -> list[str]:
+        page_count = await self.get_page_count()
+        page = max(0, min(page, page_count - 1))
+
+        if page == 0:
+            rows = await self._fetch()
+        elif self._page is not None and page == self._page + 1:
+            rows = await self._fetch(after=self._last_key)
+        elif self._page is not None and page == self._page - 1:
+            rows = await self._fetch(before=self._first_key)
+        elif page == page_count - 1:
+            rows = await self._fetch(limit=self.total - page * self.per_page)
+        else:
+            async with get_session() as session:
+                ordered = self.statement.order_by(*[column.asc() for column in self.key_columns])
+                rows = (await session.scalars(ordered.offset(page * self.per_page).limit(self.per_page))).all()
+
+        self._page = page
+        if rows:
+            self._first_key, self._last_key = self._key(rows[0]), self._key(rows[-1])
+
+        return [self.render(row) for row in rows]
+
+
+class SourcePagination(Pagination):
+    """
+    Pagination view whose pages come from a PageSource, only the viewed page is held
+    """
+
+    def __init__(self, title: str, source: PageSource, page_count: int, lines: list[str], author_id: int,
+                 is_field: bool = False):
+        View.__init__(self, timeout=180)
+        self.title = title
+        self.is_field = is_field
+        self.source = source
+        self.page = 0
+        self._page_count = page_count
+        self.lines = lines
+        self.author_id = author_id
+        self.build_buttons()
+
+    @classmethod
+    async def create(cls, title: str, source: PageSource, author_id: int, is_field: bool = False):
+        page_count = await source.get_page_count()
+        return cls(title, source, page_count, await source.get_page(0), author_id, is_field)
+
+    @property
+    def page_count(self) -> int:
+        return self._page_count
+
+    def create_embed(self) -> Embed:
+        embed = Embed(
+            title=self.title,
+            color=0x393A41,
+            timestamp=get_time_now()
+        ).set_footer(text=f"{self.page + 1}/{self.page_count}")
+
+        if not self.is_field:
+            embed.description = "\n".join(self.lines)
+            return embed
+
+        for line in self.lines:
+            embed.add_field(name="", value=line, inline=True)
+        return embed
+
+    async def interaction_handler(self, interaction: Interaction):
+        match interaction.data["custom_id"]:
+            case "first":
+                page = 0
+            case "prev":
+                page = max(self.page - 1, 0)
+            case "next":
+                page = min(self.page + 1, self.page_count - 1)
+            case "last":
+                page = self.page_count - 1
+            case _:
+                page = self.page
+
+        if page != self.page:
+            self.lines = await self.source.get_page(page)
+            self.page = page
 
         self.build_buttons()
         await interaction.message.edit(embed=self.create_embed(), view=self)
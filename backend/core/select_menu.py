@@ -47,6 +47,24 @@ class SelectActionList(View):
         self.add_item(self.select)
         self.select.callback = self.interaction_handler
 
+    def copy(self) -> SelectActionList:
+        """
+        Fresh view with the same options, as a view tracks a single message once bound
+        """
+        return SelectActionList(
+            author_id=self.author_id,
+            embed_title=self.embed_title,
+            embed_description=self.embed_description,
+            options=self.select.options,
+            on_select=self.on_select,
+            placeholder=self.select.placeholder,
+            min_values=self.select.min_values,
+            max_values=self.select.max_values,
+            disable_after_select=self.disable_after_select,
+            timeout=self.timeout,
+            custom_id=self.select.custom_id
+        )
+
     def create_embed(self) -> Embed:
         return Embed(
             title=self.embed_title,
@@ -0,0 +1,188 @@
+import asyncio
+import time
+from collections import deque, defaultdict
+from typing import Any, Awaitable, Callable, Hashable
+
+import discord
+
+_pools: dict[str, "WorkerPool"] = {}
+
+Job = Callable[[], Awaitable[Any]]
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """
+    Seconds Discord asked us to wait, None when the error isn't a rate limit
+    """
+    if isinstance(error, discord.RateLimited):
+        return error.retry_after
+
+    if isinstance(error, discord.HTTPException) and error.status == 429:
+        headers = getattr(error.response, "headers", {}) or {}
+        try:
+            return float(headers.get("Retry-After", 1))
+        except (TypeError, ValueError):
+            return 1.0
+
+    return None
+
+
+def _is_global_rate_limit(error: Exception) -> bool:
+    headers = getattr(getattr(error, "response", None), "headers", {}) or {}
+    return str(headers.get("X-RateLimit-Global", "")).lower() == "true"
+
+
+class WorkerPool:
+    """
+    Bounded pool of worker tasks running jobs concurrently, at most per_key_limit at once for
+    the same key (usually a guild). Rate limited jobs are put back after Discord's retry-after.
+    """
+
+    def __init__(self, name: str, workers: int = 16, per_key_limit: int = 4, max_attempts: int = 5):
+        self.name = name
+        self.workers = workers
+        self.per_key_limit = per_key_limit
+        self.max_attempts = max_attempts
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self._queue: asyncio.Queue[tuple[Hashable, Job, asyncio.Future, int]] = asyncio.Queue()
+        self._admitted: dict[Hashable, int] = defaultdict(int)
+        self._backlog: dict[Hashable, deque[tuple[Job, asyncio.Future]]] = defaultdict(deque)
+        self._running = 0
+        self._paused_until = 0.0
+        self._finished: deque[float] = deque()
+        self._tasks: list[asyncio.Task] = []
+        # Futures of the jobs not finished yet, queued, backlogged, waiting out a rate limit or running
+        self._pending: set[asyncio.Future] = set()
+
+        _pools[name] = self
+
+    def submit(self, key: Hashable, job: Job) -> asyncio.Future:
+        """
+        Queue a job, it waits in the key's backlog while the key is at its limit.
+        The returned future resolves with the job's result, awaiting it is optional.
+        """
+        self._ensure_started()
+        self.submitted += 1
+
+        future = asyncio.get_running_loop().create_future()
+        # Failures are already reported by the pool, retrieve them so unawaited futures stay quiet
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        future.add_done_callback(self._pending.discard)
+        self._pending.add(future)
+
+        if self._admitted[key] < self.per_key_limit:
+            self._admitted[key] += 1
+            self._queue.put_nowait((key, job, future, 0))
+        else:
+            self._backlog[key].append((job, future))
+
+        return future
+
+    def stop(self) -> None:
+        """
+        Cancel the workers and fail every job that did not finish, so nothing awaits them forever
+        """
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+        # A fresh queue also drops the rate limited jobs still due to be put back in the old one
+        self._queue = asyncio.Queue()
+        self._admitted.clear()
+        self._backlog.clear()
+
+        for future in list(self._pending):
+            if not future.done():
+                future.set_exception(RuntimeError(f"The {self.name} pool was stopped"))
+        self._pending.clear()
+
+    def _ensure_started(self) -> None:
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._work()))
+
+    def _release(self, key: Hashable) -> None:
+        backlog = self._backlog.get(key)
+        if backlog:
+            job, future = backlog.popleft()
+            self._queue.put_nowait((key, job, future, 0))
+            if not backlog:
+                del self._backlog[key]
+            return
+
+        self._admitted[key] -= 1
+        if self._admitted[key] <= 0:
+            del self._admitted[key]
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            # Held on to, stop swaps the queue while this worker still finishes with its job
+            queue = self._queue
+            key, job, future, attempts = await queue.get()
+
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+
+            self._running += 1
+            try:
+                result = await job()
+            except Exception as e:
+                retry_after = get_retry_after(e)
+
+                if retry_after is not None and attempts + 1 < self.max_attempts:
+                    self.rate_limited += 1
+                    if _is_global_rate_limit(e):
+                        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+                    # Keep the key's slot, the job comes back once the limit resets
+                    loop.call_later(retry_after, queue.put_nowait, (key, job, future, attempts + 1))
+                    continue
+
+                self.failed += 1
+                print(f"Something went wrong while running a {self.name} job for {key} -> {e}")
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                self.completed += 1
+                if not future.done():
+                    future.set_result(result)
+                self._finished.append(time.monotonic())
+            finally:
+                self._running -= 1
+                queue.task_done()
+
+            self._release(key)
+
+    def stats(self) -> dict:
+        """
+        Return counters describing the pool throughput and depth
+        """
+        horizon = time.monotonic() - 60
+        while self._finished and self._finished[0] < horizon:
+            self._finished.popleft()
+
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "per_key_limit": self.per_key_limit,
+            "queued": self._queue.qsize() + sum(len(backlog) for backlog in self._backlog.values()),
+            "running": self._running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "per_minute": len(self._finished),
+        }
+
+
+def get_all_pool_stats() -> list[dict]:
+    """
+    Retrieve the counters of every registered worker pool
+    """
+    return [pool.stats() for pool in _pools.values()]
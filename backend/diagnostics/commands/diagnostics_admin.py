@@ -0,0 +1,316 @@
+from discord.ext import commands
+
+from backend.core.cache import get_all_cache_stats
+from backend.core.database import get_pool_stats
+from backend.core.dm_outbox import dm_outbox
+from backend.core.helper import get_commands_help_messages
+from backend.core.instrumentation import query_metrics
+from backend.core.log_dispatcher import log_dispatcher
+from backend.core.pagination import Pagination
+from backend.core.workers import get_all_pool_stats
+from backend.diagnostics.director import explain_hot_queries, measure_snapshot_footprint, benchmark_cooldown_backends
+from backend.permissions.cooldowns import cooldown_store
+from backend.permissions.enforce import has_permission
+from backend.tickets.director import ticket_step_metrics
+
+
+class DiagnosticsAdminCommand(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @has_permission()
+    @commands.group(name="diagnostics-admin", invoke_without_command=True, hidden=True)
+    async def _diagnostics_admin(self, ctx):
+        view = Pagination(
+            "ᴅɪᴀɢɴᴏѕᴛɪᴄѕ ᴀᴅᴍɪɴ ѕᴜʙᴄᴏᴍᴍᴀɴᴅѕ",
+            get_commands_help_messages(self.bot, [DiagnosticsAdminCommand], ctx.author.guild_permissions.administrator),
+            3,
+            ctx.author.id
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="cache")
+    async def _cache(self, ctx):
+        """
+        Display the in-process cache counters
+        """
+        lines: list[str] = []
+        for stats in get_all_cache_stats():
+            lines.append(
+                f"**{stats["name"]}**\n"
+                f"**ѕɪᴢᴇ**: **{stats["size"]}/{stats["max_size"]}**\n"
+                f"**ᴛᴛʟ**: **{stats["ttl"]:.0f}s**\n"
+                f"**ʜɪᴛѕ**: **{stats["hits"]}**\n"
+                f"**ᴍɪѕѕᴇѕ**: **{stats["misses"]}**\n"
+                f"**ᴇᴠɪᴄᴛɪᴏɴѕ**: **{stats["evictions"]}**\n"
+                f"**ʜɪᴛ ʀᴀᴛɪᴏ**: **{stats["hit_ratio"]:.1%}**\n"
+            )
+
+        view = Pagination(
+            f"ᴄᴀᴄʜᴇ ᴅɪᴀɢɴᴏѕᴛɪᴄѕ",
+            lines,
+            3,
+            ctx.author.id,
+            True
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="workers")
+    async def _workers(self, ctx):
+        """
+        Display the worker pool throughput and queue depth
+        """
+        lines: list[str] = []
+        for stats in get_all_pool_stats():
+            lines.append(
+                f"**{stats["name"]}**\n"
+                f"**ᴡᴏʀᴋᴇʀѕ**: **{stats["workers"]}** (**{stats["per_key_limit"]}** ᴘᴇʀ ɢᴜɪʟᴅ)\n"
+                f"**ǫᴜᴇᴜᴇᴅ**: **{stats["queued"]}**\n"
+                f"**ʀᴜɴɴɪɴɢ**: **{stats["running"]}**\n"
+                f"**ᴄᴏᴍᴘʟᴇᴛᴇᴅ**: **{stats["completed"]}/{stats["submitted"]}**\n"
+                f"**ꜰᴀɪʟᴇᴅ**: **{stats["failed"]}**\n"
+                f"**ʀᴀᴛᴇ ʟɪᴍɪᴛᴇᴅ**: **{stats["rate_limited"]}**\n"
+                f"**ʟᴀѕᴛ ᴍɪɴᴜᴛᴇ**: **{stats["per_minute"]}**\n"
+            )
+
+        view = Pagination(
+            f"ᴡᴏʀᴋᴇʀ ᴅɪᴀɢɴᴏѕᴛɪᴄѕ",
+            lines,
+            3,
+            ctx.author.id,
+            True
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="logs")
+    async def _logs(self, ctx):
+        """
+        Display the logging channel dispatcher counters
+        """
+        stats = log_dispatcher.stats()
+
+        await ctx.reply(
+            f"**ǫᴜᴇᴜᴇᴅ**: **{stats["queued"]}** ɪɴ **{stats["channels"]}** ᴄʜᴀɴɴᴇʟ(ѕ)\n"
+            f"**ѕᴇɴᴛ**: **{stats["sent_embeds"]}** ᴇᴍʙᴇᴅѕ ɪɴ **{stats["sent_messages"]}** ᴍᴇѕѕᴀɢᴇѕ\n"
+            f"**ʀᴇᴛʀɪᴇᴅ**: **{stats["retried"]}**\n"
+            f"**ᴇᴅɪᴛᴇᴅ**: **{stats["edited"]}**\n"
+            f"**ᴅʀᴏᴘᴘᴇᴅ**: **{stats["dropped"]}**"
+        )
+
+    @has_permission()
+    @_diagnostics_admin.command(name="dms")
+    async def _dms(self, ctx):
+        """
+        Display the private message outbox counters
+        """
+        stats = dm_outbox.stats()
+
+        await ctx.reply(
+            f"**ᴅᴇʟɪᴠᴇʀᴇᴅ**: **{stats["delivered"]}**\n"
+            f"**ꜰᴀɪʟᴇᴅ**: **{stats["failed"]}**\n"
+            f"**ѕᴋɪᴘᴘᴇᴅ**: **{stats["skipped"]}**\n"
+            f"**ᴄʟᴏѕᴇᴅ ᴅᴍѕ**: **{stats["closed"]}**"
+        )
+
+    @has_permission()
+    @_diagnostics_admin.command(name="cooldowns")
+    async def _cooldowns(self, ctx):
+        """
+        Display the command cooldown store size and expirations
+        """
+        stats = cooldown_store.stats()
+
+        if stats["backend"] == "memory":
+            details = (
+                f"**ѕɪᴢᴇ**: **{stats["size"]}/{stats["max_entries"]}**\n"
+                f"**ʜᴇᴀᴘ**: **{stats["heap"]}**\n"
+                f"**ᴇxᴘɪʀᴇᴅ**: **{stats["expired"]}**\n"
+                f"**ᴇᴠɪᴄᴛɪᴏɴѕ**: **{stats["evictions"]}**"
+            )
+        else:
+            details = (
+                f"**ᴘʀᴜɴᴇᴅ**: **{stats["pruned"]}**\n"
+                f"**ꜰᴀɪʟᴜʀᴇѕ**: **{stats["failures"]}**"
+            )
+
+        await ctx.reply(
+            f"**ʙᴀᴄᴋᴇɴᴅ**: **{stats["backend"]}**\n"
+            f"**ᴄʜᴇᴄᴋѕ**: **{stats["checks"]}** (**{stats["on_cooldown"]}** ᴏɴ ᴄᴏᴏʟᴅᴏᴡɴ)\n"
+            f"{details}"
+        )
+
+    @has_permission()
+    @_diagnostics_admin.command(name="cooldown-bench")
+    async def _cooldown_bench(self, ctx):
+        """
+        Compare the per check latency of every cooldown backend
+        """
+        lines: list[str] = []
+        for result in await benchmark_cooldown_backends():
+            lines.append(
+                f"**{result["name"]}**\n"
+                f"**ѕᴛᴀʀᴛ**: **{result["start_mean"]:.3f}ms** ᴍᴇᴀɴ, **{result["start_p99"]:.3f}ms** ᴘ99\n"
+                f"**ᴏɴ ᴄᴏᴏʟᴅᴏᴡɴ**: **{result["hit_mean"]:.3f}ms** ᴍᴇᴀɴ, **{result["hit_p99"]:.3f}ms** ᴘ99\n"
+                f"**ꜰᴀɪʟᴜʀᴇѕ**: **{result["failures"]}**\n"
+            )
+
+        await ctx.reply("\n".join(lines))
+
+    @has_permission()
+    @_diagnostics_admin.command(name="queries")
+    async def _queries(self, ctx):
+        """
+        Display the query plans and latencies of the hot lookups
+        """
+        lines: list[str] = []
+        for result in await explain_hot_queries(ctx.guild.id, ctx.author.id):
+            nodes = "\n".join(f"`{node}`" for node in result["nodes"][:4])
+            lines.append(
+                f"**{result["name"]}**\n"
+                f"{nodes}\n"
+                f"**ᴘʟᴀɴɴɪɴɢ**: **{result["planning_ms"]:.2f}ms**\n"
+                f"**ᴇxᴇᴄᴜᴛɪᴏɴ**: **{result["execution_ms"]:.2f}ms**\n"
+                f"**ʀᴏᴜɴᴅ ᴛʀɪᴘ**: **{result["round_trip_ms"]:.2f}ms**\n"
+            )
+
+        view = Pagination(
+            f"ǫᴜᴇʀʏ ᴅɪᴀɢɴᴏѕᴛɪᴄѕ",
+            lines,
+            3,
+            ctx.author.id,
+            True
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="latency")
+    async def _latency(self, ctx):
+        """
+        Display the database latency percentiles per director function
+        """
+        lines: list[str] = []
+        for stats in query_metrics.stats():
+            lines.append(
+                f"**{stats["function"]}**\n"
+                f"**ᴄᴀʟʟѕ**: **{stats["calls"]}** (**{stats["queries"]}** ǫᴜᴇʀɪᴇѕ, **{stats["rows"]}** ʀᴏᴡѕ)\n"
+                f"**ᴛᴏᴛᴀʟ**: **{stats["total_ms"]:.0f}ms**\n"
+                f"**ᴘ50**: **{stats["p50"]:.1f}ms**\n"
+                f"**ᴘ95**: **{stats["p95"]:.1f}ms**\n"
+                f"**ᴘ99**: **{stats["p99"]:.1f}ms**\n"
+                f"**ᴍᴀx**: **{stats["max_ms"]:.1f}ms**\n"
+            )
+
+        view = Pagination(
+            f"ʟᴀᴛᴇɴᴄʏ ᴅɪᴀɢɴᴏѕᴛɪᴄѕ",
+            lines,
+            6,
+            ctx.author.id,
+            True
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="ticket-steps")
+    async def _ticket_steps(self, ctx):
+        """
+        Display the latency percentiles of every step of opening a ticket
+        """
+        lines: list[str] = []
+        for name, histogram in ticket_step_metrics.items():
+            lines.append(
+                f"**{name}**\n"
+                f"**ᴄᴀʟʟѕ**: **{histogram.queries}**\n"
+                f"**ᴘ50**: **{histogram.percentile(0.50):.1f}ms**\n"
+                f"**ᴘ99**: **{histogram.percentile(0.99):.1f}ms**\n"
+                f"**ᴍᴀx**: **{histogram.max_ms:.1f}ms**\n"
+            )
+
+        view = Pagination(
+            f"ᴛɪᴄᴋᴇᴛ ѕᴛᴇᴘ ᴅɪᴀɢɴᴏѕᴛɪᴄѕ",
+            lines,
+            6,
+            ctx.author.id,
+            True
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="slow-queries")
+    async def _slow_queries(self, ctx):
+        """
+        Display the latest queries above the slow query threshold
+        """
+        lines: list[str] = []
+        for query in reversed(query_metrics.slow_queries):
+            lines.append(
+                f"**{query["function"]}** **{query["elapsed_ms"]:.0f}ms** ɢᴜɪʟᴅ {query["guild_id"]}\n"
+                f"`{query["statement"][:300]}`\n"
+            )
+
+        view = Pagination(
+            f"ѕʟᴏᴡ ǫᴜᴇʀɪᴇѕ ᴀʙᴏᴠᴇ {query_metrics.slow_query_ms:.0f}ᴍѕ",
+            lines,
+            5,
+            ctx.author.id
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+    @has_permission()
+    @_diagnostics_admin.command(name="pool")
+    async def _pool(self, ctx):
+        """
+        Display the database connection pool state and checkout timings
+        """
+        stats = get_pool_stats()
+
+        await ctx.reply(
+            f"**ᴄʜᴇᴄᴋᴇᴅ ᴏᴜᴛ**: **{stats["checked_out"]}** (**{stats["checked_in"]}** ɪᴅʟᴇ)\n"
+            f"**ѕɪᴢᴇ**: **{stats["size"]}**\n"
+            f"**ᴏᴠᴇʀꜰʟᴏᴡ**: **{stats["overflow"]}/{stats["max_overflow"]}**\n"
+            f"**ᴄʜᴇᴄᴋᴏᴜᴛѕ**: **{stats["checkouts"]}** (**{stats["timeouts"]}** ᴛɪᴍᴇᴅ ᴏᴜᴛ)\n"
+            f"**ᴡᴀɪᴛ**: **{stats["wait_p50"]:.1f}ms** ᴘ50, **{stats["wait_p99"]:.1f}ms** ᴘ99, "
+            f"**{stats["wait_max"]:.1f}ms** ᴍᴀx\n"
+            f"**ᴘɪɴɢ ᴍᴏᴅᴇ**: **{stats["ping_mode"]}**\n"
+            f"**ᴘʀᴇ-ᴘɪɴɢѕ**: **{stats["pings"]}** (**{stats["ping_p50"]:.1f}ms** ᴘ50, "
+            f"**{stats["ping_total"]:.0f}ms** ᴛᴏᴛᴀʟ)\n"
+            f"**ʜᴇᴀʟᴛʜ ᴄʜᴇᴄᴋѕ**: **{stats["health_checks"]}** (**{stats["health_check_failures"]}** ꜰᴀɪʟᴇᴅ)"
+        )
+
+    @has_permission()
+    @_diagnostics_admin.command(name="memory")
+    async def _memory(self, ctx):
+        """
+        Compare the memory of cached snapshots against the ORM rows
+        """
+        lines: list[str] = []
+        for result in await measure_snapshot_footprint(ctx.guild.id):
+            lines.append(
+                f"**{result["name"]}**\n"
+                f"**ᴏʀᴍ**: **{result["orm_bytes"]:.0f}** ʙʏᴛᴇѕ\n"
+                f"**ѕɴᴀᴘѕʜᴏᴛ**: **{result["snapshot_bytes"]:.0f}** ʙʏᴛᴇѕ\n"
+                f"**ѕᴀᴠᴇᴅ**: **{result["saved"]:.1%}**\n"
+            )
+
+        view = Pagination(
+            f"ᴍᴇᴍᴏʀʏ ᴅɪᴀɢɴᴏѕᴛɪᴄѕ",
+            lines,
+            5,
+            ctx.author.id,
+            True
+        )
+
+        await ctx.reply(embed=view.create_embed(), view=view)
+
+
+async def setup(bot):
+    await bot.add_cog(DiagnosticsAdminCommand(bot))
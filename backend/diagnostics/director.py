@@ -0,0 +1,176 @@
+import pickle
+import time
+import tracemalloc
+
+from sqlalchemy import select, text, delete
+
+from backend.core.database import Session, Engine
+from backend.core.instrumentation import LatencyHistogram
+from backend.permissions.cooldowns import COOLDOWN_BACKENDS, PostgresCooldownStore
+from backend.permissions.engine import PermissionRecord
+from backend.permissions.models.command_cooldown import CommandCooldown
+from backend.permissions.models.permission import Permission
+from backend.punishments.models.punishment import Punishment, PunishmentType
+from backend.punishments.models.punishment_config import PunishmentConfig
+from backend.punishments.snapshots import PunishmentConfigSnapshot
+from backend.tickets.models.ticket import Ticket
+from backend.tickets.models.ticket_config import TicketConfig
+from backend.tickets.models.ticket_panel import TicketPanel
+from backend.tickets.snapshots import TicketConfigSnapshot, TicketPanelSnapshot
+from backend.voice.models.voice import Voice
+from backend.voice.models.voice_config import VoiceConfig
+from backend.voice.snapshots import VoiceConfigSnapshot
+
+# Cached model and the snapshot built from it
+SNAPSHOTS = [
+    (Permission, PermissionRecord.from_permission),
+    (PunishmentConfig, PunishmentConfigSnapshot.from_row),
+    (VoiceConfig, VoiceConfigSnapshot.from_row),
+    (TicketConfig, TicketConfigSnapshot.from_row),
+    (TicketPanel, TicketPanelSnapshot.from_row),
+]
+
+# No Discord guild has a negative id, the cooldowns of the benchmark never meet those of a real command
+BENCHMARK_GUILD_ID = -1
+
+
+def get_hot_queries(guild_id: int, user_id: int) -> dict:
+    """
+    Statements behind the most frequent lookups, for a guild and member
+    """
+    return {
+        "permission": select(Permission).filter_by(guild_id=guild_id, command_name="help"),
+        "active punishment": select(Punishment).filter_by(
+            guild_id=guild_id, user_id=user_id, type=PunishmentType.MUTE, is_active=True
+        ),
+        "expiring punishments": select(Punishment).filter(
+            Punishment.is_active == True,
+            Punishment.type.in_([PunishmentType.MUTE, PunishmentType.BAN]),
+            Punishment.expires_at.is_not(None)
+        ),
+        "punishment modlog": select(Punishment).filter_by(guild_id=guild_id, user_id=user_id).order_by(
+            Punishment.added_at, Punishment.punishment_id
+        ).limit(3),
+        "open ticket": select(Ticket).filter_by(guild_id=guild_id, user_id=user_id, is_closed=False),
+        "active voice": select(Voice).filter_by(guild_id=guild_id, user_id=user_id, is_deleted=False),
+    }
+
+
+def _plan_nodes(plan: dict) -> list[str]:
+    """
+    Flatten a JSON plan into 'Node Type on relation using index' strings
+    """
+    node = plan["Node Type"]
+    if "Index Name" in plan:
+        node += f" using {plan["Index Name"]}"
+    elif "Relation Name" in plan:
+        node += f" on {plan["Relation Name"]}"
+
+    nodes = [node]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+async def explain_hot_queries(guild_id: int, user_id: int, runs: int = 5) -> list[dict]:
+    """
+    Run EXPLAIN ANALYZE on every hot query and time a few plain executions of it
+    """
+    results: list[dict] = []
+
+    async with Session() as session:
+        for name, statement in get_hot_queries(guild_id, user_id).items():
+            sql = str(statement.compile(dialect=Engine.dialect, compile_kwargs={"literal_binds": True}))
+            plan = (await session.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))).scalar()[0]
+
+            started = time.perf_counter()
+            for _ in range(runs):
+                (await session.execute(statement)).all()
+            elapsed = (time.perf_counter() - started) / runs
+
+            results.append({
+                "name": name,
+                "nodes": _plan_nodes(plan["Plan"]),
+                "planning_ms": plan.get("Planning Time", 0.0),
+                "execution_ms": plan.get("Execution Time", 0.0),
+                "round_trip_ms": elapsed * 1000,
+            })
+
+    return results
+
+
+def _measure(factory, count: int) -> float:
+    """
+    Bytes still allocated per object after building count of them
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        objects = [factory() for _ in range(count)]
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    del objects
+    return retained / count
+
+
+async def measure_snapshot_footprint(guild_id: int, count: int = 1000) -> list[dict]:
+    """
+    Compare the memory of count ORM copies of a guild's cached rows against their snapshots
+    """
+    results: list[dict] = []
+
+    async with Session() as session:
+        for model, from_row in SNAPSHOTS:
+            row = await session.scalar(select(model).filter_by(guild_id=guild_id).limit(1))
+            if row is None:
+                continue
+
+            # Unpickling allocates fresh values like decoding a result row does, the
+            # temporary rows behind the snapshots are freed before being counted
+            values = pickle.dumps({column.key: getattr(row, column.key) for column in model.__table__.columns})
+            orm_bytes = _measure(lambda: model(**pickle.loads(values)), count)
+            snapshot_bytes = _measure(lambda: from_row(model(**pickle.loads(values))), count)
+
+            results.append({
+                "name": model.__name__,
+                "orm_bytes": orm_bytes,
+                "snapshot_bytes": snapshot_bytes,
+                "saved": 1 - snapshot_bytes / orm_bytes if orm_bytes else 0.0,
+            })
+
+    return results
+
+
+async def benchmark_cooldown_backends(checks: int = 200) -> list[dict]:
+    """
+    Time the checks of every cooldown backend, once starting cooldowns and once hitting them,
+    under BENCHMARK_GUILD_ID whose rows are deleted afterwards
+    """
+    results: list[dict] = []
+
+    for name, backend in COOLDOWN_BACKENDS.items():
+        store = backend()
+        histograms = {"start": LatencyHistogram(), "hit": LatencyHistogram()}
+
+        try:
+            for phase, histogram in histograms.items():
+                for user_id in range(checks):
+                    started = time.perf_counter()
+                    await store.hit((BENCHMARK_GUILD_ID, "diagnostics-admin cooldown-bench", user_id), 5)
+                    histogram.record((time.perf_counter() - started) * 1000, 0)
+        finally:
+            if isinstance(store, PostgresCooldownStore):
+                async with Engine.begin() as connection:
+                    await connection.execute(delete(CommandCooldown).filter_by(guild_id=BENCHMARK_GUILD_ID))
+
+        results.append({
+            "name": name,
+            # The mean, as the in-process backend sits below the smallest histogram bucket
+            **{f"{phase}_mean": histogram.total_ms / histogram.queries for phase, histogram in histograms.items()},
+            **{f"{phase}_p99": histogram.percentile(0.99) for phase, histogram in histograms.items()},
+            "failures": store.stats().get("failures", 0),
+        })
+
+    return results
@@ -18,3 +18,8 @@ class InvalidURL(CustomError):
 class TicketPanelNotFound(CustomError):
     def __init__(self, panel_id: str):
         super().__init__(f"Panel **{panel_id}** not found, or not owned by this guild!")
+
+
+class CommandNotFound(CustomError):
+    def __init__(self, command_name: str):
+        super().__init__(f"Command **{command_name}** not found!")
@@ -2,10 +2,12 @@ from discord.ext import commands
 
 from backend.core.helper import get_commands_help_messages
 from backend.core.pagination import Pagination
+from backend.diagnostics.commands.diagnostics_admin import DiagnosticsAdminCommand
 from backend.permissions.commands.permission_admin import PermissionAdminCommand
 from backend.permissions.enforce import has_permission, has_cooldown
 from backend.punishments.commands.ban import BanCommand
 from backend.punishments.commands.kick import KickCommand
+from backend.punishments.commands.mass import MassCommand
 from backend.punishments.commands.mute import MuteCommand
 from backend.punishments.commands.punishment import PunishmentCommand
 from backend.punishments.commands.punishment_admin import PunishmentAdminCommand
@@ -44,7 +46,8 @@ class HelpCommand(commands.Cog):
             "ᴍᴏᴅᴇʀᴀᴛɪᴏɴ ѕᴜʙᴄᴏᴍᴍᴀɴᴅѕ",
             get_commands_help_messages(
                 self.bot,
-                [BanCommand, KickCommand, MuteCommand, WarnCommand, PunishmentCommand, TicketCommand, VoiceCommand],
+                [BanCommand, KickCommand, MuteCommand, MassCommand, WarnCommand, PunishmentCommand, TicketCommand,
+                 VoiceCommand],
                 ctx.author.guild_permissions.administrator
             ),
             5,
@@ -64,7 +67,8 @@ class HelpCommand(commands.Cog):
             "ᴍᴀɴᴀɢᴇᴍᴇɴᴛ ѕᴜʙᴄᴏᴍᴍᴀɴᴅѕ",
             get_commands_help_messages(
                 self.bot,
-                [PunishmentAdminCommand, PermissionAdminCommand, TicketAdminCommand, VoiceAdminCommand],
+                [PunishmentAdminCommand, PermissionAdminCommand, TicketAdminCommand, VoiceAdminCommand,
+                 DiagnosticsAdminCommand],
                 ctx.author.guild_permissions.administrator
             ),
             5,
@@ -1,36 +1,179 @@
+import asyncio
+import time
+
 from discord.ext import commands
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, delete
 
-from backend.core.database import Engine
+from backend.core.database import get_session, commit, upsert, insert_missing
 from backend.core.helper import get_time_now
+from backend.core.instrumentation import instrumented
 from backend.guilds.models.guild import Guild
-from backend.permissions.director import initialize_permissions_for_guild
+from backend.guilds.models.panel_message import PanelMessage
+from backend.permissions.director import initialize_permissions_for_guild, reconcile_permissions, \
+    load_permissions_for_guilds, RECONCILE_MODE
+from backend.punishments.director import load_punishment_configs, load_punishment_schedule
 from backend.punishments.models.punishment_config import PunishmentConfig
+from backend.tickets.director import load_ticket_configs, load_ticket_panels, load_open_tickets
+from backend.tickets.models.ticket_config import TicketConfig
+from backend.voice.director import load_voice_configs, load_live_voices
+from backend.voice.models.voice_config import VoiceConfig
 
 
-def create_or_update_guild(bot: commands.Bot, guild_id: int, **kwargs):
+@instrumented
+async def create_or_update_guild(bot: commands.Bot, guild_id: int, **kwargs):
     """
         Ensure a Guild record exists in the database and apply updates.
     """
-    with Session(Engine) as session:
-        guild = session.query(Guild).filter_by(guild_id=guild_id).first()
+    async with get_session() as session:
+        guild, created = await upsert(
+            session,
+            Guild,
+            {"guild_id": guild_id},
+            kwargs,
+            defaults={"added_at": get_time_now(), "is_active": True}
+        )
+
+        if created:
+            await upsert(session, PunishmentConfig, {"guild_id": guild_id})
+
+        await commit(session)
+
+    if created:
+        await initialize_permissions_for_guild(bot, guild_id)
+
+    return guild
+
+
+# IDs of every tracked panel message, so deleted messages are only looked up when they are one
+_panel_message_ids: set[int] = set()
+
+
+@instrumented
+async def record_panel_message(guild_id: int, channel_id: int, message_id: int, kind: str) -> None:
+    """
+    Track a sent panel or menu message, so its view is rebound at startup
+    """
+    async with get_session() as session:
+        session.add(PanelMessage(guild_id=guild_id, channel_id=channel_id, message_id=message_id, kind=kind))
+        await commit(session)
+
+    _panel_message_ids.add(message_id)
+
+
+@instrumented
+async def get_panel_messages() -> list[PanelMessage]:
+    """
+    Retrieve every tracked panel message
+    """
+    async with get_session() as session:
+        messages = (await session.scalars(select(PanelMessage))).all()
+
+    _panel_message_ids.clear()
+    _panel_message_ids.update(message.message_id for message in messages)
+    return list(messages)
+
+
+@instrumented
+async def delete_panel_messages(message_ids: set[int]) -> int:
+    """
+    Stop tracking the given messages, only touching the database for tracked ones
+    """
+    message_ids = message_ids & _panel_message_ids
+    if not message_ids:
+        return 0
+
+    async with get_session() as session:
+        await session.execute(delete(PanelMessage).filter(PanelMessage.message_id.in_(message_ids)))
+        await commit(session)
+
+    _panel_message_ids.difference_update(message_ids)
+    return len(message_ids)
+
+
+@instrumented
+async def seed_guilds(guild_ids: list[int]) -> list[int]:
+    """
+    Create the missing Guild and config rows of many guilds, returns the newly added guilds
+    """
+    now = get_time_now()
+    rows = [{"guild_id": guild_id} for guild_id in guild_ids]
 
-        if not guild:
-            guild = Guild(guild_id=guild_id, added_at=get_time_now(), is_active=True)
-            guild.punishment_configs = PunishmentConfig(guild_id=guild_id)
+    async with get_session() as session:
+        created = await insert_missing(
+            session,
+            Guild,
+            ["guild_id"],
+            [{"guild_id": guild_id, "added_at": now, "is_active": True} for guild_id in guild_ids]
+        )
 
-            session.add(guild)
-            session.commit()
-            session.refresh(guild)
+        # Guilds that added the bot back while it was offline, as on_guild_join would
+        await session.execute(
+            update(Guild)
+            .filter(Guild.guild_id.in_(guild_ids), Guild.is_active == False)
+            .values(added_at=now, is_active=True)
+        )
+
+        for model in (PunishmentConfig, VoiceConfig, TicketConfig):
+            await insert_missing(session, model, ["guild_id"], rows)
+
+        await commit(session)
+
+    return [guild_id for guild_id, in created]
+
+
+async def _timed(timings: dict[str, float], name: str, awaitable):
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[name] = (time.perf_counter() - started) * 1000
+
+
+async def warm_up_guilds(bot: commands.Bot) -> dict:
+    """
+    Seed and load the state of every guild the bot is in, one query per table,
+    so the first commands after a restart skip the cold path
+    """
+    started = time.perf_counter()
+    guild_ids = [guild.id for guild in bot.guilds]
+    timings: dict[str, float] = {}
 
-            initialize_permissions_for_guild(bot, guild_id)
+    created = await _timed(timings, "guilds", seed_guilds(guild_ids))
 
-        for field, value in kwargs.items():
-            if value is not None and hasattr(guild, field):
-                setattr(guild, field, value)
+    reconciled = None
+    if RECONCILE_MODE != "off":
+        reconciled = await _timed(
+            timings,
+            "reconcile permissions",
+            reconcile_permissions(bot, guild_ids, dry_run=RECONCILE_MODE == "dry-run")
+        )
 
-        session.add(guild)
-        session.commit()
-        session.refresh(guild)
+    # Separate tasks, so each load runs on its own pooled connection
+    loaded = await asyncio.gather(
+        _timed(timings, "permissions", load_permissions_for_guilds(guild_ids)),
+        _timed(timings, "punishment configs", load_punishment_configs(guild_ids)),
+        _timed(timings, "voice configs", load_voice_configs(guild_ids)),
+        _timed(timings, "ticket configs", load_ticket_configs(guild_ids)),
+        _timed(timings, "ticket panels", load_ticket_panels(guild_ids)),
+        _timed(timings, "punishments", load_punishment_schedule()),
+        # Read only, a channel may not be cached yet, closing orphans is left to the admin commands
+        _timed(timings, "tickets", load_open_tickets(bot.guilds)),
+        _timed(timings, "voices", load_live_voices(bot.guilds)),
+    )
 
-        return guild
+    permissions, punishment_configs, voice_configs, ticket_configs, panels, punishments, tickets, voices = loaded
+    return {
+        "guilds": len(guild_ids),
+        "created": len(created),
+        "reconciled": reconciled,
+        "permissions": permissions,
+        "configs": punishment_configs + voice_configs + ticket_configs,
+        "panels": panels,
+        "punishments": punishments,
+        "open_tickets": tickets[0],
+        "orphaned_tickets": len(tickets[1]),
+        "live_voices": voices[0],
+        "orphaned_voices": len(voices[1]),
+        "timings": timings,
+        "elapsed_ms": (time.perf_counter() - started) * 1000,
+    }
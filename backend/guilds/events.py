@@ -1,22 +1,60 @@
+import discord
 from discord.ext import commands
 
+from backend.core.audit_log import audit_log_index
 from backend.core.helper import get_time_now, get_current_time
-from backend.guilds.director import create_or_update_guild
+from backend.guilds.director import create_or_update_guild, warm_up_guilds, delete_panel_messages
+
+
+def _print_permission_reconciliation(report: dict) -> None:
+    prefix = "Dry run of permission reconciliation" if report["dry_run"] else "Reconciled permissions"
+    print(f"{prefix} for {report["commands"]} command(s) in {report["guilds"]} guild(s) -> "
+          f"{sum(report["missing"].values())} missing ({report["inserted"]} inserted), "
+          f"{sum(report["stale"].values())} stale ({report["deleted"]} deleted)")
+
+    if report["dry_run"]:
+        for command_name, count in report["missing"].most_common(20):
+            print(f"  + {command_name} in {count} guild(s)")
+        for command_name, count in report["stale"].most_common(20):
+            print(f"  - {command_name} in {count} guild(s)")
 
 
 class GuildEvents(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.warmed_up = False
 
     @commands.Cog.listener()
     async def on_ready(self):
         print(f"Logged in as {self.bot.user} with {len(self.bot.guilds)} guild(s) at {get_current_time()}")
 
+        # on_ready fires again after every reconnect, the caches only need warming once
+        if self.warmed_up:
+            return
+        self.warmed_up = True
+
+        try:
+            stats = await warm_up_guilds(self.bot)
+        except Exception as e:
+            print(f"Failed to warm up guilds -> {e}")
+            return
+
+        reconciled = stats["reconciled"]
+        if reconciled is not None:
+            _print_permission_reconciliation(reconciled)
+
+        timings = ", ".join(f"{name} {elapsed:.0f}ms" for name, elapsed in stats["timings"].items())
+        print(f"Warmed up {stats["guilds"]} guild(s) ({stats["created"]} new) in {stats["elapsed_ms"]:.0f}ms -> "
+              f"{stats["permissions"]} permissions, {stats["configs"]} configs, {stats["panels"]} panels, "
+              f"{stats["punishments"]} expiring punishments, "
+              f"{stats["open_tickets"]} open tickets ({stats["orphaned_tickets"]} without a channel), "
+              f"{stats["live_voices"]} live voices ({stats["orphaned_voices"]} without a channel) [{timings}]")
+
     @commands.Cog.listener()
     async def on_guild_join(self, guild):
         print(f"New guild named {guild.name} has been added! #{guild.id}")
 
-        create_or_update_guild(
+        await create_or_update_guild(
             self.bot,
             guild.id,
             added_at=get_time_now(),
@@ -27,13 +65,27 @@ class GuildEvents(commands.Cog):
     async def on_guild_remove(self, guild):
         print(f"A guild named {guild.name} has left! #{guild.id}")
 
-        create_or_update_guild(
+        await create_or_update_guild(
             self.bot,
             guild.id,
             removed_at=get_time_now(),
             is_active=False
         )
 
+        audit_log_index.forget(guild.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        await delete_panel_messages({payload.message_id})
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        await delete_panel_messages(payload.message_ids)
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry: discord.AuditLogEntry):
+        audit_log_index.record(entry)
+
 
 async def setup(bot):
     await bot.add_cog(GuildEvents(bot))
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, ForeignKey, String
+
+from backend.core.database import Base, NaiveDateTime
+from backend.core.helper import get_time_now
+
+
+class PanelMessage(Base):
+    __tablename__ = "panel_messages"
+
+    message_id = Column(BigInteger, primary_key=True)
+    guild_id = Column(BigInteger, ForeignKey("guilds.guild_id", ondelete="CASCADE"), index=True, nullable=False)
+    channel_id = Column(BigInteger, nullable=False)
+    # Custom ID of the menu, tickets.menu or voice.menu
+    kind = Column(String, nullable=False, index=True)
+    created_at = Column(NaiveDateTime, default=get_time_now())
@@ -35,7 +35,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Display the current command information
         """
-        permission = create_or_retrieve_command(self.bot, ctx.guild.id, command_name)
+        permission = await create_or_retrieve_command(self.bot, ctx.guild.id, command_name)
 
         if not permission:
             raise commands.ChannelNotFound
@@ -67,7 +67,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Display the current commands permissions
         """
-        permissions = get_permissions_for_guild(self.bot, ctx.guild.id)
+        permissions = await get_permissions_for_guild(self.bot, ctx.guild.id)
 
         lines: list[str] = []
         for permission in permissions:
@@ -100,7 +100,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Set the admin only for commands
         """
-        permission = create_or_retrieve_command(
+        permission = await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name,
@@ -125,7 +125,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Set the enabled for commands
         """
-        permission = create_or_retrieve_command(
+        permission = await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name,
@@ -153,7 +153,7 @@ class PermissionAdminCommand(commands.Cog):
         if seconds > 600 or seconds < 0:
             return await ctx.reply(f"Seconds must be between 0-600!")
 
-        permission = create_or_retrieve_command(
+        permission = await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name,
@@ -183,7 +183,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Add a role to permissions allowed roles
         """
-        permission = create_or_retrieve_command(
+        permission = await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name
@@ -199,7 +199,7 @@ class PermissionAdminCommand(commands.Cog):
 
         required_roles.append(role.id)
 
-        create_or_retrieve_command(
+        await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name,
@@ -221,7 +221,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Remove a role from permissions allowed roles
         """
-        permission = create_or_retrieve_command(
+        permission = await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name
@@ -237,7 +237,7 @@ class PermissionAdminCommand(commands.Cog):
 
         required_roles.remove(role.id)
 
-        create_or_retrieve_command(
+        await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name,
@@ -259,7 +259,7 @@ class PermissionAdminCommand(commands.Cog):
         """
         Allow everyone in this guild to run the command
         """
-        permission = create_or_retrieve_command(
+        permission = await create_or_retrieve_command(
             self.bot,
             ctx.guild.id,
             command_name
@@ -285,7 +285,7 @@ class PermissionAdminCommand(commands.Cog):
 
             required_roles.remove(guild_id)
 
-        create_or_retrieve_command(
+        await create_or_retrieve_command(
             self.bot,
             guild_id,
             command_name,
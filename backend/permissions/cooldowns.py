@@ -0,0 +1,200 @@
+import heapq
+import os
+import time
+from datetime import timedelta
+from typing import Hashable, Protocol
+
+from sqlalchemy import func, case, delete, DateTime
+from sqlalchemy.dialects.postgresql import insert
+
+from backend.core.database import Engine
+from backend.permissions.models.command_cooldown import CommandCooldown
+
+# memory keeps cooldowns in this process, postgres shares them between every bot process
+COOLDOWN_BACKEND = os.getenv("COOLDOWN_BACKEND", "memory").lower()
+
+CooldownKey = tuple[int, str, int]
+
+# The database clock as the naive Europe/London time every timestamp column holds, see get_time_now
+_DB_NOW = func.timezone("Europe/London", func.now(), type_=DateTime)
+
+
+class CooldownBackend(Protocol):
+    name: str
+
+    async def hit(self, key: CooldownKey, cooldown: float) -> float | None:
+        """
+        Start the cooldown of key, or return the seconds left while it is still running
+        """
+        ...
+
+    def stats(self) -> dict:
+        ...
+
+
+class CooldownStore:
+    """
+    Expiry time of every (guild, command, user) still on cooldown. Entries leave through an
+    expiry heap once their cooldown has passed, and when the store is full the ones closest
+    to expiring are evicted first.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 100_000):
+        self.max_entries = max_entries
+        self.checks = 0
+        self.on_cooldown = 0
+        self.expired = 0
+        self.evictions = 0
+        self._expires: dict[Hashable, float] = {}
+        self._heap: list[tuple[float, Hashable]] = []
+
+    async def hit(self, key: Hashable, cooldown: float) -> float | None:
+        """
+        Start the cooldown of key, or return the seconds left while it is still running
+        """
+        now = time.monotonic()
+        self.checks += 1
+
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at > now:
+            self.on_cooldown += 1
+            return expires_at - now
+
+        self._prune(now)
+        while len(self._expires) >= self.max_entries and self._heap:
+            self._pop(evicted=True)
+
+        expires_at = now + cooldown
+        self._expires[key] = expires_at
+        heapq.heappush(self._heap, (expires_at, key))
+        return None
+
+    def _prune(self, now: float) -> None:
+        while self._heap and self._heap[0][0] <= now:
+            self._pop(evicted=False)
+
+    def _pop(self, evicted: bool) -> None:
+        expires_at, key = heapq.heappop(self._heap)
+
+        # A key re-armed after expiring leaves its older heap entry behind
+        if self._expires.get(key) != expires_at:
+            return
+
+        del self._expires[key]
+        if evicted:
+            self.evictions += 1
+        else:
+            self.expired += 1
+
+    def clear(self) -> None:
+        self._expires.clear()
+        self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "checks": self.checks,
+            "on_cooldown": self.on_cooldown,
+            "size": len(self._expires),
+            "max_entries": self.max_entries,
+            "heap": len(self._heap),
+            "expired": self.expired,
+            "evictions": self.evictions,
+        }
+
+
+class PostgresCooldownStore:
+    """
+    Cooldowns shared by every bot process through an UNLOGGED table. Each check is a single
+    atomic upsert that only moves the expiry forward once the previous one has passed, timed
+    on the database clock so the processes agree.
+    """
+
+    name = "postgres"
+
+    def __init__(self, prune_interval: float = 300):
+        self.prune_interval = prune_interval
+        self.checks = 0
+        self.on_cooldown = 0
+        self.pruned = 0
+        self.failures = 0
+        self._next_prune = time.monotonic() + prune_interval
+
+    @staticmethod
+    def hit_statement(key: CooldownKey, cooldown: float):
+        """
+        Upsert starting the cooldown of key unless it still runs, returns whether it started and the seconds left
+        """
+        guild_id, command_name, user_id = key
+
+        # now() is fixed for the transaction, so the expiry we propose is comparable in RETURNING
+        proposed = _DB_NOW + timedelta(seconds=cooldown)
+        statement = insert(CommandCooldown).values(
+            guild_id=guild_id,
+            command_name=command_name,
+            user_id=user_id,
+            expires_at=proposed
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["guild_id", "command_name", "user_id"],
+            set_={"expires_at": case(
+                (CommandCooldown.expires_at <= _DB_NOW, statement.excluded.expires_at),
+                else_=CommandCooldown.expires_at
+            )}
+        ).returning(
+            CommandCooldown.expires_at == proposed,
+            func.extract("epoch", CommandCooldown.expires_at - _DB_NOW)
+        )
+
+        return statement
+
+    async def hit(self, key: CooldownKey, cooldown: float) -> float | None:
+        self.checks += 1
+        statement = self.hit_statement(key, cooldown)
+
+        try:
+            # Its own short transaction, the row lock is not held for the whole command
+            async with Engine.begin() as connection:
+                started, retry_after = (await connection.execute(statement)).one()
+
+                if time.monotonic() >= self._next_prune:
+                    self._next_prune = time.monotonic() + self.prune_interval
+                    self.pruned += (await connection.execute(
+                        delete(CommandCooldown).filter(CommandCooldown.expires_at <= _DB_NOW)
+                    )).rowcount
+        except Exception as e:
+            # Fail open, a database outage should not lock every command
+            self.failures += 1
+            print(f"Failed to check a command cooldown -> {e}")
+            return None
+
+        if started:
+            return None
+
+        self.on_cooldown += 1
+        return float(retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "checks": self.checks,
+            "on_cooldown": self.on_cooldown,
+            "pruned": self.pruned,
+            "failures": self.failures,
+        }
+
+
+COOLDOWN_BACKENDS: dict[str, type] = {
+    "memory": CooldownStore,
+    "postgres": PostgresCooldownStore,
+}
+
+if COOLDOWN_BACKEND not in COOLDOWN_BACKENDS:
+    raise ValueError(f"Unknown COOLDOWN_BACKEND {COOLDOWN_BACKEND!r}, expected one of {", ".join(COOLDOWN_BACKENDS)}")
+
+cooldown_store: CooldownBackend = COOLDOWN_BACKENDS[COOLDOWN_BACKEND]()
@@ -1,27 +1,40 @@
+import os
+from collections import Counter
+
 from discord.ext import commands
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
 
-from backend.core.database import Engine
+from backend.core.database import get_session, commit, insert_missing
 from backend.core.helper import is_valid_command, get_all_command_names
+from backend.core.instrumentation import instrumented
+from backend.permissions.engine import permission_engine
 from backend.permissions.models.permission import Permission
 
+# apply, dry-run or off for the reconciliation of permissions against the commands at startup
+RECONCILE_MODE = os.getenv("PERMISSION_RECONCILE", "apply").lower()
+
 
-def get_permissions_for_guild(bot: commands.Bot | None, guild_id: int) -> list[type[Permission]]:
+@instrumented
+async def get_permissions_for_guild(bot: commands.Bot | None, guild_id: int) -> list[Permission]:
     """
     Retrieve all Permission entries for the given guild.
     """
-    with Session(Engine) as session:
-        for perm in session.query(Permission).filter_by(guild_id=guild_id):
-            if bot is not None and not is_valid_command(bot, perm.command_name):
-                session.delete(perm)
+    async with get_session() as session:
+        if bot is not None:
+            await session.execute(delete(Permission).filter(
+                Permission.guild_id == guild_id,
+                Permission.command_name.not_in(_command_names(bot))
+            ))
+            await commit(session)
 
-        session.commit()
-        results = session.query(Permission).filter_by(guild_id=guild_id).all()
+        results = (await session.scalars(select(Permission).filter_by(guild_id=guild_id))).all()
 
-    return results
+    permission_engine.load(guild_id, results)
+    return list(results)
 
 
-def create_or_retrieve_command(
+@instrumented
+async def create_or_retrieve_command(
         bot: commands.Bot | None,
         guild_id: int,
         command_name: str,
@@ -32,13 +45,16 @@ def create_or_retrieve_command(
     """
     command_name = command_name.lower()
 
-    with Session(Engine) as session:
-        permission = session.query(Permission).filter_by(guild_id=guild_id, command_name=command_name).first()
+    async with get_session() as session:
+        permission = await session.scalar(
+            select(Permission).filter_by(guild_id=guild_id, command_name=command_name)
+        )
 
         if permission is not None:
             if bot is not None and not is_valid_command(bot, command_name):
-                session.delete(permission)
-                session.commit()
+                await session.delete(permission)
+                await commit(session)
+                permission_engine.discard(guild_id, command_name)
                 return None
 
         if permission is None:
@@ -52,12 +68,15 @@ def create_or_retrieve_command(
                 setattr(permission, field, value)
 
         session.add(permission)
-        session.commit()
-        session.refresh(permission)
+        await commit(session)
+        await session.refresh(permission)
+
+        permission_engine.update(permission)
         return permission
 
 
-def initialize_permissions_for_guild(bot: commands.Bot, guild_id: int):
+@instrumented
+async def initialize_permissions_for_guild(bot: commands.Bot, guild_id: int):
     """
     Seed a fresh Permission table for a new guild.
     Creates one Permission row per command/subcommand without checking for existing entries.
@@ -69,6 +88,89 @@ def initialize_permissions_for_guild(bot: commands.Bot, guild_id: int):
         for name in all_names
     ]
 
-    with Session(Engine) as session:
+    async with get_session() as session:
         session.add_all(perms)
-        session.commit()
+        await commit(session)
+
+    permission_engine.forget(guild_id)
+
+
+def _command_names(bot: commands.Bot) -> list[str]:
+    return [name.lower() for name in get_all_command_names(bot, True)]
+
+
+@instrumented
+async def reconcile_permissions(bot: commands.Bot, guild_ids: list[int], dry_run: bool = False) -> dict:
+    """
+    Diff the registered commands against the permissions table, then create the rows missing
+    for the given guilds and delete the rows of removed commands in every guild, set-based.
+    A dry run only reports what would change.
+    """
+    names = _command_names(bot)
+    if not names:
+        return {"commands": 0, "guilds": len(guild_ids), "missing": Counter(), "stale": Counter(),
+                "inserted": 0, "deleted": 0, "dry_run": dry_run}
+
+    name_set = set(names)
+    guild_set = set(guild_ids)
+
+    async with get_session() as session:
+        existing = (await session.execute(select(Permission.guild_id, Permission.command_name))).all()
+
+        present: dict[int, set[str]] = {guild_id: set() for guild_id in guild_ids}
+        stale: Counter[str] = Counter()
+        for guild_id, command_name in existing:
+            if command_name not in name_set:
+                stale[command_name] += 1
+            elif guild_id in guild_set:
+                present[guild_id].add(command_name)
+
+        rows = [
+            {"guild_id": guild_id, "command_name": name}
+            for guild_id, commands_present in present.items()
+            for name in names
+            if name not in commands_present
+        ]
+        missing = Counter(row["command_name"] for row in rows)
+
+        inserted = deleted = 0
+        if not dry_run:
+            if stale:
+                deleted = (await session.execute(
+                    delete(Permission).filter(Permission.command_name.not_in(names))
+                )).rowcount
+            inserted = len(await insert_missing(session, Permission, ["guild_id", "command_name"], rows))
+            await commit(session)
+
+    if inserted or deleted:
+        # Reloaded from the table on next use
+        for guild_id in guild_set | {guild_id for guild_id, _ in existing}:
+            permission_engine.forget(guild_id)
+
+    return {
+        "commands": len(names),
+        "guilds": len(guild_ids),
+        "missing": missing,
+        "stale": stale,
+        "inserted": inserted,
+        "deleted": deleted,
+        "dry_run": dry_run,
+    }
+
+
+@instrumented
+async def load_permissions_for_guilds(guild_ids: list[int]) -> int:
+    """
+    Load the permissions of many guilds into the engine with one query
+    """
+    async with get_session() as session:
+        results = (await session.scalars(select(Permission).filter(Permission.guild_id.in_(guild_ids)))).all()
+
+    by_guild: dict[int, list[Permission]] = {guild_id: [] for guild_id in guild_ids}
+    for permission in results:
+        by_guild[permission.guild_id].append(permission)
+
+    for guild_id, permissions in by_guild.items():
+        permission_engine.load(guild_id, permissions)
+
+    return len(results)
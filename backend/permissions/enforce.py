@@ -1,5 +1,3 @@
-import time
-
 from discord.app_commands import Cooldown
 from discord.ext import commands
 from discord.ext.commands import CheckFailure, BucketType
@@ -8,8 +6,28 @@ from discord.ext.commands import (
     CommandOnCooldown,
 )
 
-from backend.guilds.director import create_or_update_guild
-from backend.permissions.director import create_or_retrieve_command
+from backend.permissions.cooldowns import cooldown_store
+from backend.permissions.director import get_permissions_for_guild
+from backend.permissions.engine import permission_engine, PermissionRecord
+
+
+async def get_command_permission(bot: commands.Bot, guild_id: int, command_name: str) -> PermissionRecord:
+    """
+    Resolve a command permission from the engine, loading the guild once on first use.
+    A command without a row yet gets the defaults of a new row, the row itself is seeded
+    by the reconciliation at startup or written once an admin changes it.
+    """
+    if not permission_engine.is_loaded(guild_id):
+        async with permission_engine.lock(guild_id):
+            if not permission_engine.is_loaded(guild_id):
+                await get_permissions_for_guild(None, guild_id)
+
+    record = permission_engine.get(guild_id, command_name)
+
+    if record is None:
+        return PermissionRecord.default(command_name.lower())
+
+    return record
 
 
 def has_permission():
@@ -17,21 +35,13 @@ def has_permission():
     Decorator to ensure the invoking user has permission to run the given command
     """
 
-    def predicate(ctx: Context) -> bool:
+    async def predicate(ctx: Context) -> bool:
         if ctx.guild is None:
             return True
 
         guild_id = ctx.guild.id
 
-        create_or_update_guild(ctx.bot, guild_id)
-        permission = create_or_retrieve_command(
-            None,
-            guild_id,
-            ctx.command.qualified_name
-        )
-
-        if permission is None:
-            raise CheckFailure("I couldn't retrieve the command permissions, contact an administrator!")
+        permission = await get_command_permission(ctx.bot, guild_id, ctx.command.qualified_name)
 
         if not permission.is_enabled:
             raise CheckFailure("That command is currently disabled in this guild")
@@ -42,7 +52,7 @@ def has_permission():
         if permission.is_admin and not ctx.author.guild_permissions.administrator:
             return False
 
-        required_ids = permission.required_role_ids or []
+        required_ids = permission.required_role_ids
 
         if not required_ids:
             return False
@@ -55,15 +65,12 @@ def has_permission():
     return commands.check(predicate)
 
 
-_last_invocations: dict[tuple[int, str, int], float] = {}
-
-
 def has_cooldown():
     """
-    Decorator to enforce per-command cooldowns using _last_invocations
+    Decorator to enforce per-command cooldowns using the cooldown store
     """
 
-    def predicate(ctx: Context) -> bool:
+    async def predicate(ctx: Context) -> bool:
         if ctx.guild is None:
             return True
 
@@ -71,25 +78,18 @@ def has_cooldown():
             return True
 
         guild_id = ctx.guild.id
-        permission = create_or_retrieve_command(None, guild_id, str(ctx.command))
+        permission = await get_command_permission(ctx.bot, guild_id, str(ctx.command))
         cooldown_secs = permission.command_cooldown
 
         if cooldown_secs <= 0:
             return True
 
-        key = (guild_id, str(ctx.command), ctx.author.id)
-        now = time.time()
-        last = _last_invocations.get(key)
-
-        if last is not None:
-            elapsed = now - last
-            retry_after = cooldown_secs - elapsed
+        retry_after = await cooldown_store.hit((guild_id, str(ctx.command), ctx.author.id), cooldown_secs)
 
-            if retry_after > 0:
-                dummy_cd = Cooldown(1, cooldown_secs)
-                raise CommandOnCooldown(dummy_cd, retry_after, BucketType.user)
+        if retry_after is not None:
+            dummy_cd = Cooldown(1, cooldown_secs)
+            raise CommandOnCooldown(dummy_cd, retry_after, BucketType.user)
 
-        _last_invocations[key] = now
         return True
 
     return commands.check(predicate)
@@ -0,0 +1,113 @@
+import asyncio
+from dataclasses import dataclass
+
+from backend.core.cache import register_guild_reset
+from backend.permissions.models.permission import Permission
+
+
+@dataclass(frozen=True, slots=True)
+class PermissionRecord:
+    """
+    Compact, immutable view of a Permission row used by the command checks.
+    """
+    command_name: str
+    required_role_ids: frozenset[int]
+    command_cooldown: int
+    is_admin: bool
+    is_enabled: bool
+
+    @classmethod
+    def from_permission(cls, permission: Permission) -> "PermissionRecord":
+        return cls(
+            command_name=permission.command_name,
+            required_role_ids=frozenset(permission.required_role_ids or ()),
+            command_cooldown=permission.command_cooldown or 0,
+            is_admin=bool(permission.is_admin),
+            is_enabled=bool(permission.is_enabled),
+        )
+
+    @classmethod
+    def default(cls, command_name: str) -> "PermissionRecord":
+        """
+        Record of a command without a row, with the column defaults of Permission
+        """
+        columns = Permission.__table__.c
+        return cls(
+            command_name=command_name,
+            required_role_ids=frozenset(),
+            command_cooldown=columns.command_cooldown.default.arg,
+            is_admin=columns.is_admin.default.arg,
+            is_enabled=columns.is_enabled.default.arg,
+        )
+
+
+class PermissionEngine:
+    """
+    In-memory index of every loaded guild's permissions, keyed by command name.
+    """
+
+    def __init__(self):
+        self._guilds: dict[int, dict[str, PermissionRecord]] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+
+    def is_loaded(self, guild_id: int) -> bool:
+        return guild_id in self._guilds
+
+    def lock(self, guild_id: int) -> asyncio.Lock:
+        """
+        Lock serializing the first load of a guild
+        """
+        return self._locks.setdefault(guild_id, asyncio.Lock())
+
+    def load(self, guild_id: int, permissions: list[Permission]) -> None:
+        """
+        Replace the records of a guild with the given rows
+        """
+        self._guilds[guild_id] = {
+            permission.command_name: PermissionRecord.from_permission(permission)
+            for permission in permissions
+        }
+
+    def get(self, guild_id: int, command_name: str) -> PermissionRecord | None:
+        records = self._guilds.get(guild_id)
+        if records is None:
+            return None
+        return records.get(command_name.lower())
+
+    def update(self, permission: Permission) -> None:
+        """
+        Apply a written row, only when its guild is already loaded
+        """
+        records = self._guilds.get(permission.guild_id)
+        if records is not None:
+            records[permission.command_name] = PermissionRecord.from_permission(permission)
+
+    def discard(self, guild_id: int, command_name: str) -> None:
+        records = self._guilds.get(guild_id)
+        if records is not None:
+            records.pop(command_name.lower(), None)
+
+    def forget(self, guild_id: int) -> None:
+        """
+        Drop a guild so it is reloaded on next use
+        """
+        self._guilds.pop(guild_id, None)
+
+    def reset(self, guild_id: int | None) -> None:
+        """
+        Drop a guild, or every guild when None, each is reloaded on next use
+        """
+        if guild_id is None:
+            self._guilds.clear()
+        else:
+            self.forget(guild_id)
+
+    def stats(self) -> dict:
+        return {
+            "guilds": len(self._guilds),
+            "records": sum(len(records) for records in self._guilds.values()),
+        }
+
+
+permission_engine = PermissionEngine()
+register_guild_reset(permission_engine.reset)
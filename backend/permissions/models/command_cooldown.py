@@ -0,0 +1,14 @@
+from sqlalchemy import Column, BigInteger, String
+
+from backend.core.database import Base, NaiveDateTime
+
+
+class CommandCooldown(Base):
+    __tablename__ = "command_cooldowns"
+    # Cooldowns are short lived, losing them on a database crash is fine and skips the WAL writes
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    guild_id = Column(BigInteger, primary_key=True)
+    command_name = Column(String, primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+    expires_at = Column(NaiveDateTime, nullable=False, index=True)
@@ -1,19 +1,22 @@
-from sqlalchemy import Column, BigInteger, String, Boolean, ForeignKey, ARRAY, DateTime
+from sqlalchemy import Column, BigInteger, String, Boolean, ForeignKey, ARRAY, Index
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 
 
 class Permission(Base):
     __tablename__ = "permissions"
+    __table_args__ = (
+        Index("uq_permissions_guild_command", "guild_id", "command_name", unique=True),
+    )
 
     command_id = Column(BigInteger, primary_key=True)
     guild_id = Column(BigInteger, ForeignKey("guilds.guild_id", ondelete="CASCADE"), index=True)
     command_name = Column(String, nullable=False)
     command_cooldown = Column(BigInteger, default=5)
     required_role_ids = Column(ARRAY(BigInteger), default=list)
-    added_at = Column(DateTime, default=get_time_now())
-    updated_at = Column(DateTime, default=get_time_now(), onupdate=get_time_now())
+    added_at = Column(NaiveDateTime, default=get_time_now())
+    updated_at = Column(NaiveDateTime, default=get_time_now(), onupdate=get_time_now())
     updated_by = Column(BigInteger, nullable=True)
     is_admin = Column(Boolean, default=False)
     is_enabled = Column(Boolean, default=True)
@@ -31,7 +31,7 @@ class BanCommand(commands.Cog):
         if not await has_permission_to_punish(ctx, member):
             return
 
-        if get_user_active_punishment(ctx.guild.id, member.id, PunishmentType.BAN):
+        if await get_user_active_punishment(ctx.guild.id, member.id, PunishmentType.BAN):
             return await ctx.reply(f"{member.mention} is already banned!")
 
         if not is_valid_url(evidence_url):
@@ -47,7 +47,7 @@ class BanCommand(commands.Cog):
         except discord.Forbidden:
             return await ctx.reply(f"Wasn't able to ban {member.mention}. Aborting!")
 
-        punishment = create_punishment(
+        punishment = await create_punishment(
             ctx.guild.id,
             member.id,
             ctx.author.id,
@@ -61,9 +61,9 @@ class BanCommand(commands.Cog):
             f"{member.mention} has been {"permanently" if permanent else "temporarily"} banned for **{reason}**!")
 
         expiring = "**never** expiring!" if permanent else f"expiring in **{duration}**."
-        sent_dm = await send_private_dm(member,
-                                        f"You have been banned from **{ctx.guild.name}** for **{reason}** it's {expiring}",
-                                        ctx)
+        sent_dm = send_private_dm(member,
+                                  f"You have been banned from **{ctx.guild.name}** for **{reason}** it's {expiring}",
+                                  ctx)
 
         await send_punishment_moderation_log(
             ctx.guild,
@@ -37,7 +37,7 @@ class KickCommand(commands.Cog):
         except discord.Forbidden:
             return await ctx.reply(f"Wasn't able to kick {member.mention}. Aborting!")
 
-        punishment = create_punishment(
+        punishment = await create_punishment(
             ctx.guild.id,
             member.id,
             ctx.author.id,
@@ -47,8 +47,8 @@ class KickCommand(commands.Cog):
         )
 
         await ctx.reply(f"{member.mention} has been kicked for **{reason}**!")
-        sent_dm = await send_private_dm(member, f"You have been kicked from **{ctx.guild.name}** for **{reason}**.",
-                                        ctx)
+        sent_dm = send_private_dm(member, f"You have been kicked from **{ctx.guild.name}** for **{reason}**.",
+                                  ctx)
 
         await send_punishment_moderation_log(
             ctx.guild,
@@ -0,0 +1,165 @@
+import asyncio
+from functools import partial
+
+import discord
+from discord.ext import commands
+
+from backend.core.helper import parse_time_window, is_valid_url
+from backend.core.workers import WorkerPool
+from backend.errors.custom_errors import InvalidURL
+from backend.permissions.enforce import has_permission, has_cooldown
+from backend.punishments.director import can_punish, get_active_punished_user_ids, create_punishments, \
+    create_or_update_punishment_config, send_mass_punishment_moderation_log
+from backend.punishments.models.punishment import PunishmentType
+
+MAX_TARGETS = 1000
+BULK_BAN_SIZE = 200
+
+mass_pool = WorkerPool("mass_moderation", workers=8, per_key_limit=4)
+
+
+class MassCommand(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def _filter_targets(self, ctx, targets: list[discord.abc.Snowflake], punishment_type: PunishmentType):
+        """
+        Drop duplicates, protected and already punished targets, returns the rest and why others were skipped
+        """
+        unique = list({target.id: target for target in targets}.values())[:MAX_TARGETS]
+        punishment_config = await create_or_update_punishment_config(ctx.guild.id)
+        already = await get_active_punished_user_ids(ctx.guild.id, [target.id for target in unique], punishment_type)
+
+        allowed: list[discord.abc.Snowflake] = []
+        skipped: list[str] = []
+        for target in unique:
+            member = target if isinstance(target, discord.Member) else ctx.guild.get_member(target.id)
+            denied = can_punish(ctx.author, member or target, punishment_config)
+
+            if denied is not None:
+                skipped.append(denied)
+            elif target.id in already:
+                skipped.append(f"<@{target.id}> is already punished!")
+            else:
+                allowed.append(member or target)
+
+        return allowed, skipped
+
+    async def _finish(self, ctx, message: discord.Message, punishment_type: PunishmentType, punished: list[int],
+                      skipped: list[str], failed: int, evidence_url: str, reason: str, duration: str):
+        permanent = duration.lower() in ("permanent", "perm")
+
+        punishments = await create_punishments(
+            ctx.guild.id,
+            punished,
+            ctx.author.id,
+            punishment_type,
+            evidence_url,
+            reason,
+            None if permanent else parse_time_window(duration)
+        )
+
+        await send_mass_punishment_moderation_log(ctx.guild, ctx.author, punishments, duration)
+
+        content = (
+            f"**{len(punishments)}** {"permanently" if permanent else "temporarily"} "
+            f"{"banned" if punishment_type is PunishmentType.BAN else "muted"} for **{reason}**, "
+            f"**{len(skipped)}** skipped and **{failed}** failed!"
+        )
+
+        if skipped:
+            content += "\n" + "\n".join(skipped[:10])
+            if len(skipped) > 10:
+                content += f"\n... and **{len(skipped) - 10}** more"
+
+        await message.edit(content=content)
+
+    @has_permission()
+    @has_cooldown()
+    @commands.command(name="massban")
+    async def _massban(
+            self,
+            ctx,
+            users: commands.Greedy[discord.Object],
+            duration: str,
+            evidence_url: str,
+            *,
+            reason: str = "No reason"
+    ):
+        """
+        Ban many members or IDs at once
+        """
+        if not users:
+            return await ctx.reply(f"You need to provide at least one member or ID!")
+
+        if not is_valid_url(evidence_url):
+            raise InvalidURL()
+
+        if duration.lower() not in ("permanent", "perm"):
+            parse_time_window(duration)
+
+        allowed, skipped = await self._filter_targets(ctx, users, PunishmentType.BAN)
+        message = await ctx.reply(f"Banning **{len(allowed)}** member(s)...")
+
+        chunks = [allowed[i:i + BULK_BAN_SIZE] for i in range(0, len(allowed), BULK_BAN_SIZE)]
+        results = await asyncio.gather(
+            *(mass_pool.submit(ctx.guild.id, partial(ctx.guild.bulk_ban, chunk, reason=reason)) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        banned: list[int] = []
+        failed = 0
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                failed += len(chunk)
+                continue
+
+            banned.extend(user.id for user in result.banned)
+            failed += len(result.failed)
+
+        await self._finish(ctx, message, PunishmentType.BAN, banned, skipped, failed, evidence_url, reason, duration)
+
+    @has_permission()
+    @has_cooldown()
+    @commands.command(name="massmute")
+    async def _massmute(
+            self,
+            ctx,
+            members: commands.Greedy[discord.Member],
+            duration: str,
+            evidence_url: str,
+            *,
+            reason: str = "No reason"
+    ):
+        """
+        Mute many members at once by giving them a role
+        """
+        if not members:
+            return await ctx.reply(f"You need to provide at least one member!")
+
+        if not is_valid_url(evidence_url):
+            raise InvalidURL()
+
+        if duration.lower() not in ("permanent", "perm"):
+            parse_time_window(duration)
+
+        muted_role = ctx.guild.get_role((await create_or_update_punishment_config(ctx.guild.id)).muted_role_id)
+        if muted_role is None:
+            return await ctx.reply(f"There is no muted role configured. Aborting!")
+
+        allowed, skipped = await self._filter_targets(ctx, members, PunishmentType.MUTE)
+        message = await ctx.reply(f"Muting **{len(allowed)}** member(s)...")
+
+        results = await asyncio.gather(
+            *(mass_pool.submit(ctx.guild.id, partial(member.add_roles, muted_role, reason=reason)) for member in allowed),
+            return_exceptions=True
+        )
+
+        muted = [member.id for member, result in zip(allowed, results) if not isinstance(result, Exception)]
+        failed = len(allowed) - len(muted)
+
+        await self._finish(ctx, message, PunishmentType.MUTE, muted, skipped, failed, evidence_url, reason, duration)
+
+
+async def setup(bot):
+    await bot.add_cog(MassCommand(bot))
@@ -31,7 +31,7 @@ class MuteCommand(commands.Cog):
         if not await has_permission_to_punish(ctx, member):
             return
 
-        if get_user_active_punishment(ctx.guild.id, member.id, PunishmentType.MUTE):
+        if await get_user_active_punishment(ctx.guild.id, member.id, PunishmentType.MUTE):
             await ctx.reply(f"{member.mention} is already muted!")
             return
 
@@ -44,13 +44,13 @@ class MuteCommand(commands.Cog):
             parse_duration = parse_time_window(duration)
 
         try:
-            muted_role_id = create_or_update_punishment_config(ctx.guild.id).muted_role_id
+            muted_role_id = (await create_or_update_punishment_config(ctx.guild.id)).muted_role_id
             muted_role = ctx.guild.get_role(muted_role_id)
             await member.add_roles(muted_role, reason=reason)
         except Exception as e:
             return await ctx.reply(f"Wasn't able to mute {member.mention}. Aborting! -> {e}")
 
-        punishment = create_punishment(
+        punishment = await create_punishment(
             ctx.guild.id,
             member.id,
             ctx.author.id,
@@ -64,9 +64,9 @@ class MuteCommand(commands.Cog):
             f"{member.mention} has been {"permanently" if permanent else "temporarily"} muted for **{reason}**!")
 
         expiring = "**never** expiring!" if permanent else f"expiring in **{duration}**."
-        sent_dm = await send_private_dm(member,
-                                        f"You have been muted from **{ctx.guild.name}** for **{reason}** it's {expiring}",
-                                        ctx)
+        sent_dm = send_private_dm(member,
+                                  f"You have been muted from **{ctx.guild.name}** for **{reason}** it's {expiring}",
+                                  ctx)
 
         await send_punishment_moderation_log(
             ctx.guild,
@@ -3,11 +3,11 @@ from discord.ext import commands
 
 from backend.core.helper import format_time_in_zone, get_time_now, format_duration, \
     get_commands_help_messages, get_user_best, fmt_user
-from backend.core.pagination import Pagination
+from backend.core.pagination import Pagination, KeysetPageSource, SourcePagination
 from backend.permissions.enforce import has_permission, has_cooldown
 from backend.punishments.director import get_punishment, get_punishment_metadata, process_punishment_removal, \
-    get_user_punishments
-from backend.punishments.models.punishment import PunishmentType
+    select_user_punishments
+from backend.punishments.models.punishment import PunishmentType, Punishment
 
 
 class PunishmentCommand(commands.Cog):
@@ -33,7 +33,7 @@ class PunishmentCommand(commands.Cog):
         """
         Display detailed information about a specific punishment by ID
         """
-        punishment = get_punishment(ctx.guild.id, punishment_id)
+        punishment = await get_punishment(ctx.guild.id, punishment_id)
 
         if not punishment:
             await ctx.reply(f"No punishment matching **#{punishment_id}** found!")
@@ -89,7 +89,7 @@ class PunishmentCommand(commands.Cog):
         """
         Remove an active punishment and log the removal with reason
         """
-        punishment = get_punishment(ctx.guild.id, punishment_id)
+        punishment = await get_punishment(ctx.guild.id, punishment_id)
 
         if not punishment:
             await ctx.reply(f"No punishment matching **#{punishment_id}** found!")
@@ -121,51 +121,55 @@ class PunishmentCommand(commands.Cog):
         """
         Display all punishments of member
         """
-        punishments = get_user_punishments(ctx.guild.id, member.id, punishment_type)
+        source = KeysetPageSource(
+            select_user_punishments(ctx.guild.id, member.id, punishment_type),
+            (Punishment.added_at, Punishment.punishment_id),
+            self._format_punishment,
+            3
+        )
 
-        if len(punishments) <= 0:
+        await source.get_page_count()
+        if not source.total:
             return await ctx.reply(
                 f"No {punishment_type if punishment_type else ""} punishments to display yet!")
 
-        lines: list[str] = []
-        for punishment in punishments:
-            punishment_name, _, _ = get_punishment_metadata(punishment.type)
-
-            description = (
-                f"**#{punishment.punishment_id}**\n"
-                f"**ᴘᴜɴɪѕʜᴍᴇɴᴛ ᴛʏᴘᴇ**: **{punishment_name}**\n"
-                f"**ᴀᴅᴅᴇᴅ ʙʏ**: {fmt_user(punishment.added_by)}\n"
-                f"**ᴀᴅᴅᴇᴅ ᴀᴛ**: **{format_time_in_zone(punishment.added_at)}**\n"
-                f"**ᴇᴠɪᴅᴇɴᴄᴇ**: {punishment.evidence}\n"
-                f"**ᴀᴅᴅᴇᴅ ʀᴇᴀѕᴏɴ**: {punishment.reason}\n"
-            )
-
-            if punishment.type in (PunishmentType.MUTE or PunishmentType.BAN):
-                description += (
-                    f"**ᴅᴜʀᴀᴛɪᴏɴ**: **{format_duration(punishment.added_at, punishment.expires_at)}**\n"
-                )
-
-                if not punishment.is_active:
-                    description += (
-                        f"**ʀᴇᴍᴏᴠᴇᴅ ʙʏ**: {self.bot.user.mention if punishment.removed_by is None else fmt_user(punishment.removed_by)}\n"
-                        f"**ʀᴇᴍᴏᴠᴇᴅ ᴀᴛ**: **{format_time_in_zone(punishment.removed_at)}**\n"
-                        f"**ʀᴇᴍᴏᴠᴇᴅ ʀᴇᴀѕᴏɴ**: {punishment.removed_reason}"
-                    )
-
-            lines.append(description)
-
         _, punishment_fancy, _ = get_punishment_metadata(punishment_type)
 
-        view = Pagination(
+        view = await SourcePagination.create(
             f"ᴘᴜɴɪѕʜᴍᴇɴᴛ {punishment_fancy if punishment_type else ""} ᴍᴏᴅʟᴏɢ ꜰᴏʀ @{member if member else "None"}",
-            lines,
-            3,
+            source,
             ctx.author.id,
             True
         )
 
         await ctx.reply(embed=view.create_embed(), view=view)
 
+    def _format_punishment(self, punishment: Punishment) -> str:
+        punishment_name, _, _ = get_punishment_metadata(punishment.type)
+
+        description = (
+            f"**#{punishment.punishment_id}**\n"
+            f"**ᴘᴜɴɪѕʜᴍᴇɴᴛ ᴛʏᴘᴇ**: **{punishment_name}**\n"
+            f"**ᴀᴅᴅᴇᴅ ʙʏ**: {fmt_user(punishment.added_by)}\n"
+            f"**ᴀᴅᴅᴇᴅ ᴀᴛ**: **{format_time_in_zone(punishment.added_at)}**\n"
+            f"**ᴇᴠɪᴅᴇɴᴄᴇ**: {punishment.evidence}\n"
+            f"**ᴀᴅᴅᴇᴅ ʀᴇᴀѕᴏɴ**: {punishment.reason}\n"
+        )
+
+        if punishment.type in (PunishmentType.MUTE or PunishmentType.BAN):
+            description += (
+                f"**ᴅᴜʀᴀᴛɪᴏɴ**: **{format_duration(punishment.added_at, punishment.expires_at)}**\n"
+            )
+
+            if not punishment.is_active:
+                description += (
+                    f"**ʀᴇᴍᴏᴠᴇᴅ ʙʏ**: {self.bot.user.mention if punishment.removed_by is None else fmt_user(punishment.removed_by)}\n"
+                    f"**ʀᴇᴍᴏᴠᴇᴅ ᴀᴛ**: **{format_time_in_zone(punishment.removed_at)}**\n"
+                    f"**ʀᴇᴍᴏᴠᴇᴅ ʀᴇᴀѕᴏɴ**: {punishment.removed_reason}"
+                )
+
+        return description
+
 
 async def setup(bot):
     await bot.add_cog(PunishmentCommand(bot))
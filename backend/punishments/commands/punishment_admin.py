@@ -30,7 +30,7 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Display the current punishments config
         """
-        punishment_config = create_or_update_punishment_config(ctx.guild.id)
+        punishment_config = await create_or_update_punishment_config(ctx.guild.id)
 
         description = (
             f"**ᴘʀᴏᴛᴇᴄᴛᴇᴅ ʀᴏʟᴇѕ**: {fmt_roles(punishment_config.protected_roles)}\n"
@@ -62,7 +62,7 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Set the muted role for punishment config
         """
-        create_or_update_punishment_config(
+        await create_or_update_punishment_config(
             ctx.guild.id,
             muted_role_id=role.id,
             updated_by=ctx.author.id
@@ -80,7 +80,7 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Set the logging channel for punishment config
         """
-        create_or_update_punishment_config(
+        await create_or_update_punishment_config(
             ctx.guild.id,
             logging_channel_id=channel.id,
             updated_by=ctx.author.id
@@ -103,15 +103,15 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Add a role to punishment config protected roles
         """
-        punishment_config = create_or_update_punishment_config(ctx.guild.id)
-        protected_roles = punishment_config.protected_roles
+        punishment_config = await create_or_update_punishment_config(ctx.guild.id)
+        protected_roles = list(punishment_config.protected_roles or [])
 
         if role.id in protected_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         protected_roles.append(role.id)
 
-        create_or_update_punishment_config(
+        await create_or_update_punishment_config(
             ctx.guild.id,
             protected_roles=protected_roles,
             updated_by=ctx.author.id
@@ -129,15 +129,15 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Remove a role from punishment config protected roles
         """
-        punishment_config = create_or_update_punishment_config(ctx.guild.id)
-        protected_roles = punishment_config.protected_roles
+        punishment_config = await create_or_update_punishment_config(ctx.guild.id)
+        protected_roles = list(punishment_config.protected_roles or [])
 
         if role.id not in protected_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         protected_roles.remove(role.id)
 
-        create_or_update_punishment_config(
+        await create_or_update_punishment_config(
             ctx.guild.id,
             protected_roles=protected_roles,
             updated_by=ctx.author.id
@@ -160,15 +160,15 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Add a member to punishment config protected users
         """
-        punishment_config = create_or_update_punishment_config(ctx.guild.id)
-        protected_users = punishment_config.protected_users
+        punishment_config = await create_or_update_punishment_config(ctx.guild.id)
+        protected_users = list(punishment_config.protected_users or [])
 
         if member.id in protected_users:
             return await ctx.reply(f"User {member.mention} is present!")
 
         protected_users.append(member.id)
 
-        create_or_update_punishment_config(
+        await create_or_update_punishment_config(
             ctx.guild.id,
             protected_users=protected_users,
             updated_by=ctx.author.id
@@ -186,15 +186,15 @@ class PunishmentAdminCommand(commands.Cog):
         """
         Remove a member from punishment config protected users
         """
-        punishment_config = create_or_update_punishment_config(ctx.guild.id)
-        protected_users = punishment_config.protected_users
+        punishment_config = await create_or_update_punishment_config(ctx.guild.id)
+        protected_users = list(punishment_config.protected_users or [])
 
         if member.id not in protected_users:
             return await ctx.reply(f"User {member.mention} is not present!")
 
         protected_users.remove(member.id)
 
-        create_or_update_punishment_config(
+        await create_or_update_punishment_config(
             ctx.guild.id,
             protected_users=protected_users,
             updated_by=ctx.author.id
@@ -32,7 +32,7 @@ class WarnCommand(commands.Cog):
         if not is_valid_url(evidence_url):
             raise InvalidURL()
 
-        punishment = create_punishment(
+        punishment = await create_punishment(
             ctx.guild.id,
             member.id,
             ctx.author.id,
@@ -42,8 +42,8 @@ class WarnCommand(commands.Cog):
         )
 
         await ctx.reply(f"{member.mention} has been warned for **{reason}**!")
-        sent_dm = await send_private_dm(member, f"You have been warned from **{ctx.guild.name}** for **{reason}**.",
-                                        ctx)
+        sent_dm = send_private_dm(member, f"You have been warned from **{ctx.guild.name}** for **{reason}**.",
+                                  ctx)
 
         await send_punishment_moderation_log(
             ctx.guild,
@@ -1,17 +1,30 @@
+import asyncio
 from datetime import datetime, timedelta
+from functools import partial
 
 import discord
 from discord.ext import commands
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, select, insert
 
-from backend.core.database import Engine
+from backend.core.cache import TTLCache
+from backend.core.database import get_session, commit, upsert, after_commit
 from backend.core.helper import get_time_now, send_private_dm, get_user_best
+from backend.core.instrumentation import instrumented
+from backend.core.log_dispatcher import log_dispatcher
+from backend.core.workers import get_retry_after
 from backend.punishments.models.punishment import Punishment, PunishmentType
 from backend.punishments.models.punishment_config import PunishmentConfig
+from backend.punishments.scheduler import punishment_scheduler
+from backend.punishments.snapshots import PunishmentConfigSnapshot
 
+_config_cache = TTLCache("punishment_config", max_size=4096, ttl=600)
 
-def create_punishment(
+# Strong references to the log edits waiting on a DM, the loop only keeps weak ones to its tasks
+_pending_logs: set[asyncio.Task] = set()
+
+
+@instrumented
+async def create_punishment(
         guild_id: int,
         user_id: int,
         added_by: int,
@@ -23,7 +36,7 @@ def create_punishment(
     """
     Create and save a new punishment record
     """
-    with Session(Engine) as session:
+    async with get_session() as session:
         punishment = Punishment(
             guild_id=guild_id,
             user_id=user_id,
@@ -37,39 +50,108 @@ def create_punishment(
         )
 
         session.add(punishment)
-        session.commit()
-        session.refresh(punishment)
+        await commit(session)
+        await session.refresh(punishment)
 
-        return punishment
+    after_commit(partial(punishment_scheduler.schedule, punishment))
+    return punishment
 
 
-def get_global_active_expiring_punishments_within(within_seconds: int = 120):
+@instrumented
+async def create_punishments(
+        guild_id: int,
+        user_ids: list[int],
+        added_by: int,
+        punishment_type: PunishmentType,
+        evidence: str,
+        reason: str = "No reason",
+        duration: datetime = None
+):
+    """
+    Create and save punishment records for many users in a single statement
+    """
+    if not user_ids:
+        return []
+
+    added_at = get_time_now()
+    is_active = punishment_type in (PunishmentType.MUTE, PunishmentType.BAN)
+
+    async with get_session() as session:
+        punishments = (await session.scalars(
+            # Rows come back in the order of user_ids, lowest id first
+            insert(Punishment).returning(Punishment, sort_by_parameter_order=True),
+            [
+                {
+                    "guild_id": guild_id,
+                    "user_id": user_id,
+                    "added_by": added_by,
+                    "type": punishment_type,
+                    "evidence": evidence,
+                    "reason": reason,
+                    "added_at": added_at,
+                    "expires_at": duration,
+                    "is_active": is_active
+                }
+                for user_id in user_ids
+            ]
+        )).all()
+        await commit(session)
+
+    for punishment in punishments:
+        after_commit(partial(punishment_scheduler.schedule, punishment))
+
+    return punishments
+
+
+@instrumented
+async def get_global_active_expiring_punishments():
     """
-    Fetch active mutes/bans expiring within a given timespan
+    Fetch every active mute/ban that has an expiry
     """
-    threshold = get_time_now() + timedelta(seconds=within_seconds)
-    with Session(Engine) as session:
-        return session.query(Punishment).filter(
+    async with get_session() as session:
+        return (await session.scalars(select(Punishment).filter(
             and_(
                 Punishment.is_active == True,
                 Punishment.type.in_([PunishmentType.MUTE, PunishmentType.BAN]),
-                Punishment.expires_at <= threshold
+                Punishment.expires_at.is_not(None)
             )
-        ).all()
+        ))).all()
 
 
-def get_punishment(guild_id: int, punishment_id: int):
+async def load_punishment_schedule() -> int:
+    """
+    Fill the scheduler with every active mute/ban that has an expiry, returns how many
+    """
+    punishments = await get_global_active_expiring_punishments()
+    punishment_scheduler.load(punishments)
+    return len(punishments)
+
+
+@instrumented
+async def get_punishments_by_ids(punishment_ids: list[int]):
+    """
+    Retrieve punishments by their IDs across guilds
+    """
+    async with get_session() as session:
+        return (await session.scalars(
+            select(Punishment).filter(Punishment.punishment_id.in_(punishment_ids))
+        )).all()
+
+
+@instrumented
+async def get_punishment(guild_id: int, punishment_id: int):
     """
     Retrieve a punishment by its guild and ID
     """
-    with Session(Engine) as session:
-        return session.query(Punishment).filter_by(
+    async with get_session() as session:
+        return await session.scalar(select(Punishment).filter_by(
             guild_id=guild_id,
             punishment_id=punishment_id
-        ).first()
+        ))
 
 
-def get_user_punishments(
+@instrumented
+async def get_user_punishments(
         guild_id: int,
         user_id: int,
         punishment_type: PunishmentType = None
@@ -77,20 +159,31 @@ def get_user_punishments(
     """
     List punishments for a user, optionally filtered by type
     """
-    with Session(Engine) as session:
+    async with get_session() as session:
         if punishment_type:
-            return session.query(Punishment).filter_by(
+            return (await session.scalars(select(Punishment).filter_by(
                 guild_id=guild_id,
                 user_id=user_id,
                 type=punishment_type
-            ).all()
-        return session.query(Punishment).filter_by(
+            ))).all()
+        return (await session.scalars(select(Punishment).filter_by(
             guild_id=guild_id,
             user_id=user_id
-        ).all()
+        ))).all()
+
 
+def select_user_punishments(guild_id: int, user_id: int, punishment_type: PunishmentType = None):
+    """
+    Statement listing punishments for a user, optionally filtered by type, for page sources
+    """
+    statement = select(Punishment).filter_by(guild_id=guild_id, user_id=user_id)
+    if punishment_type:
+        statement = statement.filter_by(type=punishment_type)
+    return statement
 
-def get_user_active_punishment(
+
+@instrumented
+async def get_user_active_punishment(
         guild_id: int,
         user_id: int,
         punishment_type: PunishmentType
@@ -98,16 +191,31 @@ def get_user_active_punishment(
     """
     Get the active punishment of a specific type for a user
     """
-    with Session(Engine) as session:
-        return session.query(Punishment).filter_by(
+    async with get_session() as session:
+        return await session.scalar(select(Punishment).filter_by(
             guild_id=guild_id,
             user_id=user_id,
             type=punishment_type,
             is_active=True
-        ).first()
+        ))
+
+
+@instrumented
+async def get_active_punished_user_ids(guild_id: int, user_ids: list[int], punishment_type: PunishmentType) -> set[int]:
+    """
+    Retrieve which of the given users already have an active punishment of a type
+    """
+    async with get_session() as session:
+        return set((await session.scalars(select(Punishment.user_id).filter(
+            Punishment.guild_id == guild_id,
+            Punishment.user_id.in_(user_ids),
+            Punishment.type == punishment_type,
+            Punishment.is_active == True
+        ))).all())
 
 
-def remove_user_active_punishment(
+@instrumented
+async def remove_user_active_punishment(
         guild_id: int,
         punishment_id: int,
         removed_by: int = None,
@@ -116,15 +224,15 @@ def remove_user_active_punishment(
     """
     Mark an active punishment as removed with a reason
     """
-    with Session(Engine) as session:
-        punishment = session.query(Punishment).filter_by(
+    async with get_session() as session:
+        punishment = await session.scalar(select(Punishment).filter_by(
             guild_id=guild_id,
             punishment_id=punishment_id,
             is_active=True
-        ).first()
+        ))
 
         if not punishment:
-            return False
+            return None, False
 
         punishment.removed_at = get_time_now()
         punishment.removed_by = removed_by  # can be None
@@ -132,10 +240,11 @@ def remove_user_active_punishment(
         punishment.is_active = False
 
         session.add(punishment)
-        session.commit()
-        session.refresh(punishment)
+        await commit(session)
+        await session.refresh(punishment)
 
-        return punishment, True
+    after_commit(partial(punishment_scheduler.discard, punishment_id))
+    return punishment, True
 
 
 def get_punishment_metadata(punishment_type: PunishmentType):
@@ -156,15 +265,18 @@ def get_punishment_metadata(punishment_type: PunishmentType):
 
 
 async def send_punishment_moderation_log(guild: discord.Guild, member: discord.Member, moderator: discord.Member,
-                                         punishment: Punishment, sent_dm: bool,
+                                         punishment: Punishment, sent_dm: bool | asyncio.Future,
                                          duration: str = None, removed: bool = False):
     """
-    Log punishment actions to the guild's moderation channel
+    Log punishment actions to the guild's moderation channel, a pending DM is shown as such
+    and its outcome filled in once it resolves
     """
+    pending = isinstance(sent_dm, asyncio.Future) and not sent_dm.done()
+
     punishment_name, punishment_fancy, punishment_color = get_punishment_metadata(punishment.type)
     punishment_color = discord.Color.pink() if removed else punishment_color
 
-    logging_channel_id = create_or_update_punishment_config(guild.id).logging_channel_id
+    logging_channel_id = (await create_or_update_punishment_config(guild.id)).logging_channel_id
 
     description = (
         f"**ᴘᴜɴɪѕʜᴍᴇɴᴛ ɪᴅ**: **{punishment.punishment_id}**\n"
@@ -176,13 +288,9 @@ async def send_punishment_moderation_log(guild: discord.Guild, member: discord.M
     if not removed and punishment.type is not PunishmentType.WARN:
         description += f"**ᴅᴜʀᴀᴛɪᴏɴ**: {'Permanent' if duration in ('permanent', 'perm') else duration}\n"
 
-    description += (
-        f"**ᴘʀɪᴠᴀᴛᴇ ᴅᴍ**: {'✅' if sent_dm else '❎'}"
-    )
-
     embed = discord.Embed(
         title=f"{punishment_fancy} ᴘᴜɴɪѕʜᴍᴇɴᴛ ꜰᴏʀ @{member}" if not removed else f"{punishment_fancy} ʀᴇᴍᴏᴠᴇᴅ ꜰᴏʀ @{member}",
-        description=description,
+        description=description + _private_dm_line(None if pending else sent_dm),
         color=punishment_color,
         timestamp=datetime.utcnow()
     )
@@ -192,34 +300,112 @@ async def send_punishment_moderation_log(guild: discord.Guild, member: discord.M
 
     loging_channel = guild.get_channel(logging_channel_id)
 
-    if loging_channel:
-        await loging_channel.send(embed=embed)
+    if not loging_channel:
+        return
 
+    entry = log_dispatcher.send(loging_channel, embed)
 
-async def has_permission_to_punish(ctx, member: discord.Member) -> bool:
+    if pending:
+        def update_private_dm(dm: asyncio.Future):
+            updated = embed.copy()
+            updated.description = description + _private_dm_line(dm)
+            _track_pending_log(log_dispatcher.edit(entry, updated))
+
+        sent_dm.add_done_callback(update_private_dm)
+
+
+def _private_dm_line(sent_dm: bool | asyncio.Future | None) -> str:
     """
-    Verify the command issuer can punish the specified member
+    Private DM line of a moderation log, None while the DM is still being delivered
     """
-    if member.id == ctx.author.id:
-        await ctx.reply(f"You can't punish your self!")
-        return False
+    if isinstance(sent_dm, asyncio.Future):
+        sent_dm = not sent_dm.cancelled() and sent_dm.exception() is None and sent_dm.result()
 
-    if ctx.author.guild_permissions.administrator:
-        return True
+    return f"**ᴘʀɪᴠᴀᴛᴇ ᴅᴍ**: {'⏳' if sent_dm is None else '✅' if sent_dm else '❎'}"
 
-    punishment_config = create_or_update_punishment_config(ctx.guild.id)
-    protected_roles = punishment_config.protected_roles
-    protected_users = punishment_config.protected_users
 
-    protected_roles = set(protected_roles)
-    member_role_ids = {role.id for role in member.roles}
+def _track_pending_log(coroutine) -> None:
+    task = asyncio.create_task(coroutine)
+    _pending_logs.add(task)
+    task.add_done_callback(_pending_logs.discard)
 
-    if member.id in protected_users or member_role_ids & protected_roles:
-        await ctx.reply(f"{member.mention} has an exception from punishments!")
-        return False
 
-    if ctx.author.top_role.position <= member.top_role.position:
-        await ctx.reply(f"{member.mention} has an higher or equal role to yours")
+async def send_mass_punishment_moderation_log(guild: discord.Guild, moderator: discord.Member,
+                                              punishments: list[Punishment], duration: str):
+    """
+    Log a mass punishment as a single entry in the guild's moderation channel
+    """
+    if not punishments:
+        return
+
+    punishment_name, punishment_fancy, punishment_color = get_punishment_metadata(punishments[0].type)
+
+    logging_channel = guild.get_channel((await create_or_update_punishment_config(guild.id)).logging_channel_id)
+    if not logging_channel:
+        return
+
+    punishment_ids = [punishment.punishment_id for punishment in punishments]
+    users = ", ".join(f"<@{punishment.user_id}>" for punishment in punishments[:50])
+    if len(punishments) > 50:
+        users += f" and {len(punishments) - 50} more"
+
+    description = (
+        f"**ᴘᴜɴɪѕʜᴍᴇɴᴛ ɪᴅѕ**: **{min(punishment_ids)}** - **{max(punishment_ids)}**\n"
+        f"**ᴍᴏᴅᴇʀᴀᴛᴏʀ**: {moderator.mention}\n"
+        f"**ᴇᴠɪᴅᴇɴᴄᴇ**: {punishments[0].evidence}\n"
+        f"**ʀᴇᴀѕᴏɴ**: {punishments[0].reason}\n"
+        f"**ᴅᴜʀᴀᴛɪᴏɴ**: {'Permanent' if duration in ('permanent', 'perm') else duration}\n"
+        f"**ᴜѕᴇʀѕ**: {users}"
+    )
+
+    embed = discord.Embed(
+        title=f"ᴍᴀѕѕ {punishment_fancy} ᴘᴜɴɪѕʜᴍᴇɴᴛ ꜰᴏʀ {len(punishments)} ᴜѕᴇʀѕ",
+        description=description,
+        color=punishment_color,
+        timestamp=datetime.utcnow()
+    )
+
+    log_dispatcher.send(logging_channel, embed)
+
+
+def can_punish(author: discord.Member, target: discord.abc.Snowflake,
+               punishment_config: PunishmentConfigSnapshot) -> str | None:
+    """
+    Check whether the author can punish the target without touching the database,
+    returns why not or None. The target may be a member or a bare user/ID outside the guild.
+    """
+    mention = f"<@{target.id}>"
+
+    if target.id == author.id:
+        return f"You can't punish your self!"
+
+    if author.guild_permissions.administrator:
+        return None
+
+    if target.id in punishment_config.protected_users:
+        return f"{mention} has an exception from punishments!"
+
+    if not isinstance(target, discord.Member):
+        return None
+
+    if any(role.id in punishment_config.protected_roles for role in target.roles):
+        return f"{mention} has an exception from punishments!"
+
+    if author.top_role.position <= target.top_role.position:
+        return f"{mention} has an higher or equal role to yours"
+
+    return None
+
+
+async def has_permission_to_punish(ctx, member: discord.Member) -> bool:
+    """
+    Verify the command issuer can punish the specified member
+    """
+    punishment_config = await create_or_update_punishment_config(ctx.guild.id)
+    denied = can_punish(ctx.author, member, punishment_config)
+
+    if denied is not None:
+        await ctx.reply(denied)
         return False
 
     return True
@@ -228,7 +414,7 @@ async def has_permission_to_punish(ctx, member: discord.Member) -> bool:
 async def process_punishment_removal(bot: commands.Bot, punishment: Punishment,
                                      moderator: discord.Member, reason: str):
     """
-    Remove roles/unban and mark punishment as revoked
+    Remove roles/unban and mark punishment as revoked, returns whether it went through
     """
     guild = bot.get_guild(punishment.guild_id)
     member = await get_user_best(bot, guild, punishment.user_id)
@@ -236,32 +422,41 @@ async def process_punishment_removal(bot: commands.Bot, punishment: Punishment,
     match punishment.type:
         case PunishmentType.MUTE:
             try:
-                muted_role_id = create_or_update_punishment_config(guild.id).muted_role_id
+                muted_role_id = (await create_or_update_punishment_config(guild.id)).muted_role_id
                 muted_role = guild.get_role(muted_role_id)
                 await member.remove_roles(muted_role, reason=reason)
             except Exception as e:
+                if get_retry_after(e) is not None:
+                    raise
+
                 print(f"Wasn't able remove mute for {punishment.user_id}. Aborting! -> {e}")
-                return
+                return False
 
-            sent_dm = await send_private_dm(member, f"Hey! You're able to chat now at **{guild.name}**!")
+            sent_dm = send_private_dm(member, f"Hey! You're able to chat now at **{guild.name}**!")
         case PunishmentType.BAN:
             try:
                 await guild.unban(discord.Object(id=punishment.user_id), reason=reason)
             except Exception as e:
+                if get_retry_after(e) is not None:
+                    raise
+
                 print(f"Wasn't able remove ban for {punishment.user_id}. Aborting! -> {e}")
-                return
+                return False
 
             sent_dm = False
         case _:
-            return
+            return False
 
-    removed_punishment, success = remove_user_active_punishment(
+    removed_punishment, success = await remove_user_active_punishment(
         punishment.guild_id,
         punishment.punishment_id,
         moderator.id,
         reason
     )
 
+    if not success:
+        return False
+
     await send_punishment_moderation_log(
         guild,
         member,
@@ -270,28 +465,41 @@ async def process_punishment_removal(bot: commands.Bot, punishment: Punishment,
         sent_dm,
         removed=True
     )
+    return True
 
 
-def create_or_update_punishment_config(guild_id: int, **kwargs):
+@instrumented
+async def load_punishment_configs(guild_ids: list[int]) -> int:
     """
-        Ensure a Punishment record exists in the database and apply updates.
+    Fill the config cache of many guilds with one query
     """
-    with Session(Engine) as session:
-        punishment = session.query(PunishmentConfig).filter_by(guild_id=guild_id).first()
-
-        if not punishment:
-            punishment = PunishmentConfig(guild_id=guild_id)
+    async with get_session() as session:
+        configs = (await session.scalars(
+            select(PunishmentConfig).filter(PunishmentConfig.guild_id.in_(guild_ids))
+        )).all()
 
-            session.add(punishment)
-            session.commit()
-            session.refresh(punishment)
+    for config in configs:
+        _config_cache.set(config.guild_id, PunishmentConfigSnapshot.from_row(config))
 
-        for field, value in kwargs.items():
-            if value is not None and hasattr(punishment, field):
-                setattr(punishment, field, value)
+    return len(configs)
 
-        session.add(punishment)
-        session.commit()
-        session.refresh(punishment)
 
-        return punishment
+@instrumented
+async def create_or_update_punishment_config(guild_id: int, **kwargs):
+    """
+        Ensure a Punishment record exists in the database and apply updates.
+    """
+    if not kwargs:
+        cached = _config_cache.get(guild_id)
+        if cached is not None:
+            return cached
+    else:
+        _config_cache.invalidate(guild_id)
+
+    async with get_session() as session:
+        punishment, _ = await upsert(session, PunishmentConfig, {"guild_id": guild_id}, kwargs)
+        await commit(session)
+
+    snapshot = PunishmentConfigSnapshot.from_row(punishment)
+    _config_cache.set(guild_id, snapshot)
+    return snapshot
@@ -1,62 +1,88 @@
-import asyncio
+from functools import partial
 
 import discord
 from discord.ext import commands, tasks
 
-from backend.punishments.director import get_global_active_expiring_punishments_within, get_user_active_punishment, \
-    process_punishment_removal, create_or_update_punishment_config
-from backend.punishments.models.punishment import PunishmentType
+from backend.core.audit_log import audit_log_index
+from backend.core.workers import WorkerPool
+from backend.punishments.director import get_user_active_punishment, \
+    process_punishment_removal, create_or_update_punishment_config, get_punishments_by_ids
+from backend.punishments.models.punishment import PunishmentType, Punishment
+from backend.punishments.scheduler import punishment_scheduler
+
+# The member role and ban routes share a bucket per guild handing out about 10 requests at once,
+# more concurrent jobs in one guild would only queue in the HTTP client past the rate limit
+expiry_pool = WorkerPool("punishment_expiry", workers=32, per_key_limit=10)
 
 
 class PunishmentEvents(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.check_expiring_punishments.start()
+        self.start_punishment_scheduler.start()
 
     def cog_unload(self):
-        self.check_expiring_punishments.cancel()
+        self.start_punishment_scheduler.cancel()
+        punishment_scheduler.stop()
+        expiry_pool.stop()
+
+    @tasks.loop(count=1)
+    async def start_punishment_scheduler(self):
+        # The schedule itself is loaded along with the rest of the guild state at on_ready
+        punishment_scheduler.start(self.expire_punishments)
+
+    @start_punishment_scheduler.before_loop
+    async def before_load(self):
+        await self.bot.wait_until_ready()
 
-    @tasks.loop(seconds=30)
-    async def check_expiring_punishments(self):
-        for punishment in get_global_active_expiring_punishments_within():
-            if not punishment.has_expired:
+    async def expire_punishments(self, punishment_ids: list[int]):
+        """
+        Hand the punishments the scheduler reports as due to the expiry pool
+        """
+        for punishment in await get_punishments_by_ids(punishment_ids):
+            if not punishment.is_active:
                 continue
 
-            await process_punishment_removal(
-                self.bot,
-                punishment,
-                self.bot.user,
-                "Automatic"
-            )
+            if not punishment.has_expired():
+                punishment_scheduler.schedule(punishment)
+                continue
 
-    @check_expiring_punishments.before_loop
-    async def before_check(self):
-        await self.bot.wait_until_ready()
+            future = expiry_pool.submit(punishment.guild_id, partial(self.expire_punishment, punishment))
+            future.add_done_callback(partial(self._retry_failed_expiry, punishment.punishment_id))
+
+    async def expire_punishment(self, punishment: Punishment) -> bool:
+        return await process_punishment_removal(
+            self.bot,
+            punishment,
+            self.bot.user,
+            "Automatic"
+        )
+
+    @staticmethod
+    def _retry_failed_expiry(punishment_id: int, future):
+        # Only once the job is over, a retry queued earlier would run the removal twice
+        if future.cancelled() or future.exception() is not None or not future.result():
+            punishment_scheduler.retry(punishment_id, 300)
 
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
-        muted_role_id = create_or_update_punishment_config(after.guild.id).muted_role_id
+        muted_role_id = (await create_or_update_punishment_config(after.guild.id)).muted_role_id
         muted_role = after.guild.get_role(muted_role_id)
 
         if not muted_role:
             return
 
         if muted_role in before.roles and muted_role not in after.roles:
-            await asyncio.sleep(1)
-
-            async for entry in after.guild.audit_logs(
-                    limit=5,
-                    action=discord.AuditLogAction.member_role_update
-            ):
-                if entry.target.id == after.id and muted_role in entry.changes.before.roles:
-                    actioner = entry.user
-                    reason = entry.reason
-                    break
-            else:
-                actioner = None
-                reason = None
-
-            punishment = get_user_active_punishment(after.guild.id, after.id, PunishmentType.MUTE)
+            entry = await audit_log_index.wait_for(
+                after.guild.id,
+                discord.AuditLogAction.member_role_update,
+                after.id,
+                lambda e: any(role.id == muted_role.id for role in getattr(e.changes.before, "roles", None) or [])
+            )
+
+            actioner = entry.user if entry else None
+            reason = entry.reason if entry else None
+
+            punishment = await get_user_active_punishment(after.guild.id, after.id, PunishmentType.MUTE)
             reason = reason if reason else "No reason"
 
             await process_punishment_removal(
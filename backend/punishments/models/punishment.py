@@ -1,12 +1,18 @@
-from sqlalchemy import Column, BigInteger, DateTime, Enum, String, Boolean, ForeignKey
+from sqlalchemy import Column, BigInteger, Enum, String, Boolean, ForeignKey, Index, text
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 from backend.punishments.models.punishment_type import PunishmentType
 
 
 class Punishment(Base):
     __tablename__ = "punishments"
+    __table_args__ = (
+        Index("ix_punishments_guild_user_type_active", "guild_id", "user_id", "type", "is_active"),
+        Index("ix_punishments_guild_user_added", "guild_id", "user_id", "added_at", "punishment_id"),
+        Index("ix_punishments_active_expires_at", "expires_at",
+              postgresql_where=text("is_active AND expires_at IS NOT NULL")),
+    )
 
     punishment_id = Column(BigInteger, primary_key=True)
     guild_id = Column(BigInteger, ForeignKey("guilds.guild_id", ondelete="CASCADE"), index=True)
@@ -15,12 +21,12 @@ class Punishment(Base):
     type = Column(Enum(PunishmentType), nullable=False, index=True)
     evidence = Column(String, nullable=True)
     reason = Column(String, nullable=True)
-    added_at = Column(DateTime, default=get_time_now())
-    expires_at = Column(DateTime, nullable=True)
+    added_at = Column(NaiveDateTime, default=get_time_now())
+    expires_at = Column(NaiveDateTime, nullable=True)
     removed_by = Column(BigInteger, nullable=True, index=True)
-    removed_at = Column(DateTime, nullable=True)
+    removed_at = Column(NaiveDateTime, nullable=True)
     removed_reason = Column(String, nullable=True)
     is_active = Column(Boolean, nullable=True, index=True)
 
     def has_expired(self) -> bool:
-        return self.expires_at is not None and get_time_now() >= self.expires_at
+        return self.expires_at is not None and get_time_now().replace(tzinfo=None) >= self.expires_at
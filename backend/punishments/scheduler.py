@@ -0,0 +1,129 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import Callable, Awaitable, Iterable
+
+from backend.core.helper import get_time_now
+from backend.punishments.models.punishment import Punishment
+
+
+def _now() -> datetime:
+    """
+    Wall clock time comparable with the naive expires_at stored in the database
+    """
+    return get_time_now().replace(tzinfo=None)
+
+
+class PunishmentScheduler:
+    """
+    Min-heap of (expires_at, punishment_id) drained by a single timer task
+    that sleeps until the next expiry.
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[datetime, int]] = []
+        self._scheduled: dict[int, datetime] = {}
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._on_expire: Callable[[list[int]], Awaitable[None]] | None = None
+        # Consecutive failed hand-offs, doubling the delay before the due punishments are tried again
+        self._failures = 0
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def load(self, punishments: Iterable[Punishment]) -> None:
+        """
+        Replace every scheduled entry with the given active punishments
+        """
+        self._scheduled = {
+            punishment.punishment_id: punishment.expires_at
+            for punishment in punishments
+            if punishment.expires_at is not None
+        }
+        self._heap = [(expires_at, punishment_id) for punishment_id, expires_at in self._scheduled.items()]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def schedule(self, punishment: Punishment) -> None:
+        """
+        Track an active punishment until it expires
+        """
+        if punishment.expires_at is None or not punishment.is_active:
+            return
+
+        self._push(punishment.punishment_id, punishment.expires_at.replace(tzinfo=None))
+
+    def retry(self, punishment_id: int, delay: float = 60) -> None:
+        """
+        Schedule another attempt for a punishment whose removal failed
+        """
+        self._push(punishment_id, _now() + timedelta(seconds=delay))
+
+    def _push(self, punishment_id: int, expires_at: datetime) -> None:
+        self._scheduled[punishment_id] = expires_at
+        heapq.heappush(self._heap, (expires_at, punishment_id))
+
+        if self._heap[0][1] == punishment_id:
+            self._wakeup.set()
+
+    def discard(self, punishment_id: int) -> None:
+        """
+        Stop tracking a punishment, its heap entry is skipped lazily
+        """
+        self._scheduled.pop(punishment_id, None)
+
+    def start(self, on_expire: Callable[[list[int]], Awaitable[None]]) -> None:
+        self._on_expire = on_expire
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _pop_due(self, now: datetime) -> list[int]:
+        due: list[int] = []
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, punishment_id = heapq.heappop(self._heap)
+            if self._scheduled.get(punishment_id) == expires_at:
+                del self._scheduled[punishment_id]
+                due.append(punishment_id)
+        return due
+
+    def _next_delay(self, now: datetime) -> float | None:
+        while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+        if not self._heap:
+            return None
+        return max(0.0, (self._heap[0][0] - now).total_seconds())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            now = _now()
+
+            due = self._pop_due(now)
+            if due:
+                try:
+                    await self._on_expire(due)
+                    self._failures = 0
+                except Exception as e:
+                    print(f"Something went wrong while expiring punishments {due} -> {e}")
+                    # They already left the schedule, without this they would stay active until a restart
+                    delay = min(30 * 2 ** self._failures, 900)
+                    self._failures += 1
+                    for punishment_id in due:
+                        if punishment_id not in self._scheduled:
+                            self.retry(punishment_id, delay)
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_delay(now))
+            except asyncio.TimeoutError:
+                pass
+
+
+punishment_scheduler = PunishmentScheduler()
@@ -0,0 +1,31 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+
+from backend.punishments.models.punishment_config import PunishmentConfig
+
+
+@dataclass(frozen=True, slots=True)
+class PunishmentConfigSnapshot:
+    """
+    Compact, immutable view of a PunishmentConfig row kept in the config cache.
+    """
+    guild_id: int
+    muted_role_id: int | None
+    logging_channel_id: int | None
+    protected_roles: array
+    protected_users: array
+    updated_at: datetime | None
+    updated_by: int | None
+
+    @classmethod
+    def from_row(cls, config: PunishmentConfig) -> "PunishmentConfigSnapshot":
+        return cls(
+            guild_id=config.guild_id,
+            muted_role_id=config.muted_role_id,
+            logging_channel_id=config.logging_channel_id,
+            protected_roles=array("q", config.protected_roles or ()),
+            protected_users=array("q", config.protected_users or ()),
+            updated_at=config.updated_at,
+            updated_by=config.updated_by,
+        )
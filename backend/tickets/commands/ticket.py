@@ -2,10 +2,11 @@ import discord
 from discord.ext import commands
 
 from backend.core.helper import get_commands_help_messages, get_time_now, format_time_in_zone, fmt_user, get_user_best
-from backend.core.pagination import Pagination
+from backend.core.pagination import Pagination, KeysetPageSource, SourcePagination
 from backend.permissions.enforce import has_permission, has_cooldown
 from backend.tickets.director import mark_ticket_closed, get_ticket_by_channel, send_ticket_logging, get_ticket_by_id, \
-    get_user_tickets
+    select_user_tickets
+from backend.tickets.models.ticket import Ticket
 
 
 class TicketCommand(commands.Cog):
@@ -30,7 +31,7 @@ class TicketCommand(commands.Cog):
         """
         Close the current ticket channel
         """
-        ticket = get_ticket_by_channel(ctx.guild.id, ctx.channel.id)
+        ticket = await get_ticket_by_channel(ctx.guild.id, ctx.channel.id)
 
         if ticket is None:
             return await ctx.reply("This channel is not a ticket!")
@@ -38,7 +39,7 @@ class TicketCommand(commands.Cog):
             return await ctx.reply("This ticket is already closed?")
 
         try:
-            closed_ticket = mark_ticket_closed(ctx.guild.id, ctx.channel.id, ctx.author.id)
+            closed_ticket = await mark_ticket_closed(ctx.guild.id, ctx.channel.id, ctx.author.id)
         except Exception:
             return await ctx.reply("Failed to close ticket. Contact an administrator!")
 
@@ -57,7 +58,7 @@ class TicketCommand(commands.Cog):
         """
         Display detailed information about a specific ticket by ID
         """
-        ticket = get_ticket_by_id(ctx.guild.id, ticket_id)
+        ticket = await get_ticket_by_id(ctx.guild.id, ticket_id)
 
         if not ticket:
             await ctx.reply(f"No ticket matching **#{ticket_id}** found!")
@@ -101,37 +102,42 @@ class TicketCommand(commands.Cog):
         """
         Display all tickets of member
         """
-        tickets = get_user_tickets(ctx.guild.id, member.id)
+        source = KeysetPageSource(
+            select_user_tickets(ctx.guild.id, member.id),
+            (Ticket.created_at, Ticket.ticket_id),
+            self._format_ticket,
+            3
+        )
 
-        if len(tickets) <= 0:
+        await source.get_page_count()
+        if not source.total:
             return await ctx.reply("No ticket to display yet!")
 
-        lines: list[str] = []
-        for ticket in tickets:
-            description = (
-                f"**#{ticket.ticket_id}**\n"
-                f"**ᴘᴀɴᴇʟ ɪᴅ**: **{ticket.panel_id}**\n"
-                f"**ᴄʀᴇᴀᴛᴇᴅ ᴀᴛ**: {format_time_in_zone(ticket.created_at)}\n"
-            )
-
-            if ticket.is_closed:
-                description += (
-                    f"**ᴄʟᴏѕᴇᴅ ᴀᴛ**: {format_time_in_zone(ticket.closed_at)}\n"
-                    f"**ᴄʟᴏѕᴇᴅ ʙʏ**: {fmt_user(ticket.closed_by)}\n"
-                )
-
-            lines.append(description)
-
-        view = Pagination(
+        view = await SourcePagination.create(
             f"ᴛɪᴄᴋᴇᴛ ᴍᴏᴅʟᴏɢ ꜰᴏʀ @{member}",
-            lines,
-            3,
+            source,
             ctx.author.id,
             True
         )
 
         await ctx.reply(embed=view.create_embed(), view=view)
 
+    @staticmethod
+    def _format_ticket(ticket: Ticket) -> str:
+        description = (
+            f"**#{ticket.ticket_id}**\n"
+            f"**ᴘᴀɴᴇʟ ɪᴅ**: **{ticket.panel_id}**\n"
+            f"**ᴄʀᴇᴀᴛᴇᴅ ᴀᴛ**: {format_time_in_zone(ticket.created_at)}\n"
+        )
+
+        if ticket.is_closed:
+            description += (
+                f"**ᴄʟᴏѕᴇᴅ ᴀᴛ**: {format_time_in_zone(ticket.closed_at)}\n"
+                f"**ᴄʟᴏѕᴇᴅ ʙʏ**: {fmt_user(ticket.closed_by)}\n"
+            )
+
+        return description
+
 
 async def setup(bot):
     await bot.add_cog(TicketCommand(bot))
@@ -5,9 +5,10 @@ from backend.core.helper import get_commands_help_messages, format_time_in_zone,
     fmt_user, fmt_users
 from backend.core.pagination import Pagination
 from backend.errors.custom_errors import TicketPanelNotFound
+from backend.guilds.director import record_panel_message
 from backend.permissions.enforce import has_permission
 from backend.tickets.director import create_ticket_panel, delete_ticket_panel, update_or_retrieve_ticket_panel, \
-    get_panels_for_guild, build_panel_list_view, update_or_retrieve_ticket_config
+    get_panels_for_guild, build_panel_list_view, update_or_retrieve_ticket_config, close_orphaned_tickets
 
 
 class TicketAdminCommand(commands.Cog):
@@ -41,7 +42,7 @@ class TicketAdminCommand(commands.Cog):
         if len(panel_id) > 15:
             return await ctx.reply("Id characters length is too long!")
 
-        panel = create_ticket_panel(ctx.guild.id, panel_id)
+        panel = await create_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             return await ctx.reply(f"Ticket panel {panel_id} is present!")
@@ -64,7 +65,7 @@ class TicketAdminCommand(commands.Cog):
                 f"This will permanently delete panel **{panel_id}**!, Re-run by adding **true** to proceed!"
             )
 
-        deleted = delete_ticket_panel(ctx.guild.id, panel_id)
+        deleted = await delete_ticket_panel(ctx.guild.id, panel_id)
         if not deleted:
             raise TicketPanelNotFound(panel_id)
 
@@ -81,7 +82,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Display the current command information
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
@@ -125,7 +126,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Display the current ticket panels
         """
-        panels = get_panels_for_guild(ctx.guild.id)
+        panels = await get_panels_for_guild(ctx.guild.id)
 
         if len(panels) <= 0:
             return await ctx.reply("No ticket panels to display yet!")
@@ -157,7 +158,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Display the current ticket config
         """
-        config = update_or_retrieve_ticket_config(ctx.guild.id)
+        config = await update_or_retrieve_ticket_config(ctx.guild.id)
 
         description = (
             f"**ʙᴀɴɴᴇᴅ ᴜѕᴇʀѕ**: {fmt_users(config.banned_user_ids)}\n"
@@ -193,7 +194,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the panel name for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             panel_name=name,
@@ -217,7 +218,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the panel description for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             panel_description=description,
@@ -240,7 +241,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the panel emoji for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             panel_emoji=emoji,
@@ -263,7 +264,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the enabled for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             panel_author_url=enabled,
@@ -286,7 +287,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the category id for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             category_id=channel.id,
@@ -315,7 +316,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the embed title for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             ticket_title=title,
@@ -339,7 +340,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the embed description for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             ticket_description=description,
@@ -362,7 +363,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the logging channel for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             logging_channel_id=channel.id,
@@ -385,7 +386,7 @@ class TicketAdminCommand(commands.Cog):
         """
         Set the enabled for ticket panel
         """
-        panel = update_or_retrieve_ticket_panel(
+        panel = await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             is_enabled=enabled,
@@ -413,19 +414,19 @@ class TicketAdminCommand(commands.Cog):
         """
         Add a role to ticket panel required roles
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        required_roles = panel.required_role_ids
+        required_roles = list(panel.required_role_ids or [])
 
         if role.id in required_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         required_roles.append(role.id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             required_role_ids=required_roles,
@@ -445,19 +446,19 @@ class TicketAdminCommand(commands.Cog):
         """
         Remove a role from ticket panel required roles
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        required_roles = panel.required_role_ids
+        required_roles = list(panel.required_role_ids or [])
 
         if role.id not in required_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         required_roles.remove(role.id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             required_role_ids=required_roles,
@@ -477,12 +478,12 @@ class TicketAdminCommand(commands.Cog):
         """
         Allow everyone in this guild to run the command
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        required_roles = panel.required_role_ids
+        required_roles = list(panel.required_role_ids or [])
 
         guild_id = ctx.guild.id
         if allow:
@@ -496,7 +497,7 @@ class TicketAdminCommand(commands.Cog):
 
             required_roles.remove(guild_id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             required_role_ids=required_roles,
@@ -522,19 +523,19 @@ class TicketAdminCommand(commands.Cog):
         """
         Add a role to ticket panel staff roles
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        staff_roles = panel.staff_role_ids
+        staff_roles = list(panel.staff_role_ids or [])
 
         if role.id in staff_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         staff_roles.append(role.id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             staff_role_ids=staff_roles,
@@ -554,19 +555,19 @@ class TicketAdminCommand(commands.Cog):
         """
         Remove a role from ticket panel staff roles
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        staff_roles = panel.staff_role_ids
+        staff_roles = list(panel.staff_role_ids or [])
 
         if role.id not in staff_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         staff_roles.remove(role.id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             staff_role_ids=staff_roles,
@@ -591,19 +592,19 @@ class TicketAdminCommand(commands.Cog):
         """
         Add a role to ticket panel staff roles
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        mention_roles = panel.mention_role_ids
+        mention_roles = list(panel.mention_role_ids or [])
 
         if role.id in mention_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         mention_roles.append(role.id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             mention_role_ids=mention_roles,
@@ -623,19 +624,19 @@ class TicketAdminCommand(commands.Cog):
         """
         Remove a role from ticket panel staff roles
         """
-        panel = update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
+        panel = await update_or_retrieve_ticket_panel(ctx.guild.id, panel_id)
 
         if not panel:
             raise TicketPanelNotFound(panel_id)
 
-        mention_roles = panel.mention_role_ids
+        mention_roles = list(panel.mention_role_ids or [])
 
         if role.id not in mention_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         mention_roles.remove(role.id)
 
-        update_or_retrieve_ticket_panel(
+        await update_or_retrieve_ticket_panel(
             ctx.guild.id,
             panel_id,
             mention_role_ids=mention_roles,
@@ -659,16 +660,16 @@ class TicketAdminCommand(commands.Cog):
         """
         Add a role to ticket config banned roles
         """
-        config = update_or_retrieve_ticket_config(ctx.guild.id)
+        config = await update_or_retrieve_ticket_config(ctx.guild.id)
 
-        banned_roles = config.banned_role_ids
+        banned_roles = list(config.banned_role_ids or [])
 
         if role.id in banned_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         banned_roles.append(role.id)
 
-        update_or_retrieve_ticket_config(
+        await update_or_retrieve_ticket_config(
             ctx.guild.id,
             banned_role_ids=banned_roles,
             updated_by=ctx.author.id
@@ -686,16 +687,16 @@ class TicketAdminCommand(commands.Cog):
         """
         Remove a role from ticket config banned roles
         """
-        config = update_or_retrieve_ticket_config(ctx.guild.id)
+        config = await update_or_retrieve_ticket_config(ctx.guild.id)
 
-        banned_roles = config.banned_role_ids
+        banned_roles = list(config.banned_role_ids or [])
 
         if role.id not in banned_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         banned_roles.remove(role.id)
 
-        update_or_retrieve_ticket_config(
+        await update_or_retrieve_ticket_config(
             ctx.guild.id,
             banned_role_ids=banned_roles,
             updated_by=ctx.author.id
@@ -718,16 +719,16 @@ class TicketAdminCommand(commands.Cog):
         """
         Add a role to ticket config banned users
         """
-        config = update_or_retrieve_ticket_config(ctx.guild.id)
+        config = await update_or_retrieve_ticket_config(ctx.guild.id)
 
-        banned_users = config.banned_user_ids
+        banned_users = list(config.banned_user_ids or [])
 
         if member.id in banned_users:
             return await ctx.reply(f"User {member.mention} is present!")
 
         banned_users.append(member.id)
 
-        update_or_retrieve_ticket_config(
+        await update_or_retrieve_ticket_config(
             ctx.guild.id,
             banned_user_ids=banned_users,
             updated_by=ctx.author.id
@@ -745,16 +746,16 @@ class TicketAdminCommand(commands.Cog):
         """
         Remove a role from ticket config banned users
         """
-        config = update_or_retrieve_ticket_config(ctx.guild.id)
+        config = await update_or_retrieve_ticket_config(ctx.guild.id)
 
-        banned_users = config.banned_user_ids
+        banned_users = list(config.banned_user_ids or [])
 
         if member.id not in banned_users:
             return await ctx.reply(f"User {member.mention} is not present!")
 
         banned_users.remove(member.id)
 
-        update_or_retrieve_ticket_config(
+        await update_or_retrieve_ticket_config(
             ctx.guild.id,
             banned_user_ids=banned_users,
             updated_by=ctx.author.id
@@ -762,16 +763,32 @@ class TicketAdminCommand(commands.Cog):
 
         await ctx.reply(f"Updated ticket config **banned users** by removing {member.mention}.")
 
+    @has_permission()
+    @_ticket_admin.command(name="close-orphaned")
+    async def _close_orphaned(self, ctx):
+        """
+        Close the open tickets whose channel was deleted
+        """
+        open_tickets, closed = await close_orphaned_tickets([ctx.guild])
+
+        await ctx.reply(f"Closed **{closed}** of **{open_tickets}** open ticket(s) whose channel was deleted.")
+
     @has_permission()
     @_ticket_admin.command(name="send-embed", hidden=True)
     async def _send_embed(self, ctx):
-        panels = get_panels_for_guild(ctx.guild.id)
+        panels = await get_panels_for_guild(ctx.guild.id)
         if not panels:
             return await ctx.reply("No panels configured for this guild!")
 
-        view = build_panel_list_view(ctx.guild.id, panels)
+        view = await build_panel_list_view(ctx.guild.id, panels)
+
+        message = await ctx.send(embed=view.create_embed(), view=view)
+        await record_panel_message(ctx.guild.id, ctx.channel.id, message.id, "tickets.menu")
 
-        await ctx.send(embed=view.create_embed(), view=view)
+        # Sending bound the view to the message, clicks on it must not be handled a second time
+        ticket_events = self.bot.get_cog("TicketEvents")
+        if ticket_events is not None:
+            ticket_events.track_panel_view(message.id, view)
 
 
 async def setup(bot):
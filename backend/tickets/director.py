@@ -1,27 +1,56 @@
+import asyncio
+import time
+from dataclasses import dataclass
 from typing import Sequence, Optional
 
 import discord
 from discord import Interaction, PermissionOverwrite, SelectOption, TextChannel
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, and_
+from sqlalchemy.exc import IntegrityError
 
-from backend.core.database import Engine
+from backend.core.cache import TTLCache
+from backend.core.database import get_session, commit, upsert, update_returning
 from backend.core.helper import get_time_now, format_time_in_zone, fmt_user, fmt_roles
+from backend.core.instrumentation import instrumented, LatencyHistogram
+from backend.core.log_dispatcher import log_dispatcher
 from backend.core.select_menu import SelectActionList
 from backend.tickets.models.ticket import Ticket
 from backend.tickets.models.ticket_config import TicketConfig
 from backend.tickets.models.ticket_panel import TicketPanel
+from backend.tickets.snapshots import TicketConfigSnapshot, TicketPanelSnapshot
 
+_config_cache = TTLCache("ticket_config", max_size=4096, ttl=600)
+_panel_cache = TTLCache("ticket_panel", max_size=8192, ttl=600)
+_view_cache = TTLCache("ticket_panel_view", max_size=4096, ttl=3600)
 
-def create_ticket(
+# Ticket being created per (guild, user), resolving to its channel or None when nothing was opened
+_ticket_creations: dict[tuple[int, int], asyncio.Future] = {}
+
+# Latency of every step of opening a ticket, from the channel creation to the log post
+ticket_step_metrics: dict[str, LatencyHistogram] = {}
+
+
+@dataclass(frozen=True, slots=True)
+class TicketAdmission:
+    """
+    Everything deciding whether a member may open a ticket on a panel
+    """
+    panel: TicketPanelSnapshot | None
+    config: TicketConfigSnapshot | None
+    open_ticket: Ticket | None
+
+
+@instrumented
+async def create_ticket(
         guild_id: int,
         user_id: int,
         channel_id: int,
         panel_id: str
 ):
     """
-    Create and save a new ticket record
+    Create and save a new ticket record, None when the user already has an open ticket
     """
-    with Session(Engine) as session:
+    async with get_session() as session:
         ticket = Ticket(
             guild_id=guild_id,
             user_id=user_id,
@@ -29,32 +58,41 @@ def create_ticket(
             panel_id=panel_id
         )
 
-        session.add(ticket)
-        session.commit()
-        session.refresh(ticket)
+        try:
+            # The savepoint keeps a unit of work usable when uq_tickets_guild_user_open rejects the row
+            async with session.begin_nested():
+                session.add(ticket)
+        except IntegrityError:
+            return None
+
+        await commit(session)
+        await session.refresh(ticket)
 
         return ticket
 
 
-def create_ticket_panel(guild_id: int, panel_id: str) -> bool:
+@instrumented
+async def create_ticket_panel(guild_id: int, panel_id: str) -> bool:
     """
     Create and save a new ticket panel record.
     """
     panel_id = panel_id.lower()
 
-    with Session(Engine) as session:
-        if session.get(TicketPanel, panel_id) is not None:
+    async with get_session() as session:
+        if await session.get(TicketPanel, panel_id) is not None:
             return False
 
         panel = TicketPanel(guild_id=guild_id, panel_id=panel_id)
         session.add(panel)
-        session.commit()
-        session.refresh(panel)
+        await commit(session)
+        await session.refresh(panel)
 
-        return True
+    _view_cache.invalidate(guild_id)
+    return True
 
 
-def update_or_retrieve_ticket_panel(
+@instrumented
+async def update_or_retrieve_ticket_panel(
         guild_id: int,
         panel_id: str,
         **kwargs
@@ -75,94 +113,93 @@ def update_or_retrieve_ticket_panel(
         "ticket_description": "description"
     }
 
-    with Session(Engine) as session:
-        panel = (
-            session.query(TicketPanel)
-            .filter_by(guild_id=guild_id, panel_id=panel_id)
-            .first()
+    if not kwargs:
+        cached = _panel_cache.get((guild_id, panel_id))
+        if cached is not None:
+            return cached
+    else:
+        _panel_cache.invalidate((guild_id, panel_id))
+        _view_cache.invalidate(guild_id)
+
+    pe_updates = {}
+
+    if "panel_embed" in kwargs and kwargs["panel_embed"] is not None:
+        try:
+            pe_updates.update(dict(kwargs["panel_embed"]))
+        except Exception:
+            pass
+
+    for k, inner in panel_keys_map.items():
+        if k in kwargs and kwargs[k] is not None:
+            pe_updates[inner] = kwargs[k]
+
+    te_updates = {}
+
+    if "ticket_embed" in kwargs and kwargs["ticket_embed"] is not None:
+        try:
+            te_updates.update(dict(kwargs["ticket_embed"]))
+        except Exception:
+            pass
+
+    for k, inner in ticket_keys_map.items():
+        if k in kwargs and kwargs[k] is not None:
+            te_updates[inner] = kwargs[k]
+
+    handled = {"panel_embed", "ticket_embed"}
+    handled.update(panel_keys_map.keys())
+    handled.update(ticket_keys_map.keys())
+
+    values = {field: value for field, value in kwargs.items() if field not in handled}
+
+    async with get_session() as session:
+        panel = await update_returning(
+            session,
+            TicketPanel,
+            {"guild_id": guild_id, "panel_id": panel_id},
+            values,
+            merge={"panel_embed": pe_updates, "ticket_embed": te_updates}
         )
-        if panel is None:
-            return None
-
-        pe_current = dict(panel.panel_embed or {})
-        pe_updates = {}
-
-        if "panel_embed" in kwargs and kwargs["panel_embed"] is not None:
-            try:
-                pe_updates.update(dict(kwargs["panel_embed"]))
-            except Exception:
-                pass
-
-        for k, inner in panel_keys_map.items():
-            if k in kwargs and kwargs[k] is not None:
-                pe_updates[inner] = kwargs[k]
+        await commit(session)
 
-        if pe_updates:
-            merged = pe_current.copy()
-            merged.update(pe_updates)
-            panel.panel_embed = merged
+    if panel is None:
+        return None
 
-        te_current = dict(panel.ticket_embed or {})
-        te_updates = {}
+    snapshot = TicketPanelSnapshot.from_row(panel)
+    _panel_cache.set((guild_id, panel_id), snapshot)
+    return snapshot
 
-        if "ticket_embed" in kwargs and kwargs["ticket_embed"] is not None:
-            try:
-                te_updates.update(dict(kwargs["ticket_embed"]))
-            except Exception:
-                pass
 
-        for k, inner in ticket_keys_map.items():
-            if k in kwargs and kwargs[k] is not None:
-                te_updates[inner] = kwargs[k]
-
-        if te_updates:
-            merged = te_current.copy()
-            merged.update(te_updates)
-            panel.ticket_embed = merged
-
-        handled = {"panel_embed", "ticket_embed"}
-        handled.update(panel_keys_map.keys())
-        handled.update(ticket_keys_map.keys())
-
-        for field, value in kwargs.items():
-            if field in handled:
-                continue
-            if value is not None and hasattr(panel, field):
-                setattr(panel, field, value)
-
-        session.add(panel)
-        session.commit()
-        session.refresh(panel)
-        return panel
-
-
-def delete_ticket_panel(guild_id: int, panel_id: str) -> bool:
+@instrumented
+async def delete_ticket_panel(guild_id: int, panel_id: str) -> bool:
     """
     Delete a ticket panel
     """
     panel_id = panel_id.lower()
+    _panel_cache.invalidate((guild_id, panel_id))
+    _view_cache.invalidate(guild_id)
 
-    with Session(Engine) as session:
-        panel = session.query(TicketPanel).filter_by(guild_id=guild_id, panel_id=panel_id).first()
+    async with get_session() as session:
+        panel = await session.scalar(select(TicketPanel).filter_by(guild_id=guild_id, panel_id=panel_id))
 
         if panel is None:
             return False
 
-        session.delete(panel)
-        session.commit()
+        await session.delete(panel)
+        await commit(session)
         return True
 
 
-def get_user_open_ticket(guild: discord.Guild, user_id: int):
+@instrumented
+async def get_user_open_ticket(guild: discord.Guild, user_id: int):
     """
     Check if the user has an open ticket. If a channel is missing, auto-close the ticket and return None.
     """
-    with Session(Engine) as session:
-        ticket = session.query(Ticket).filter_by(
+    async with get_session() as session:
+        ticket = await session.scalar(select(Ticket).filter_by(
             guild_id=guild.id,
             user_id=user_id,
             is_closed=False
-        ).first()
+        ))
 
         if ticket is None:
             return None
@@ -171,54 +208,109 @@ def get_user_open_ticket(guild: discord.Guild, user_id: int):
             ticket.is_closed = True
             ticket.closed_at = get_time_now()
             session.add(ticket)
-            session.commit()
+            await commit(session)
             return None
 
         return ticket
 
 
-def get_user_tickets(guild_id: int, user_id: int):
+@instrumented
+async def load_open_tickets(guilds: list[discord.Guild]) -> tuple[int, list[int]]:
+    """
+    Read the open tickets of the given guilds in one query,
+    returns how many are open and the channels of those whose channel no longer exists
+    """
+    guilds_by_id = {guild.id: guild for guild in guilds if not guild.unavailable}
+
+    async with get_session() as session:
+        open_tickets = (await session.execute(
+            select(Ticket.guild_id, Ticket.channel_id).filter(
+                Ticket.guild_id.in_(guilds_by_id),
+                Ticket.is_closed == False
+            )
+        )).all()
+
+    orphaned = [
+        channel_id for guild_id, channel_id in open_tickets
+        if guilds_by_id[guild_id].get_channel(channel_id) is None
+    ]
+
+    return len(open_tickets), orphaned
+
+
+@instrumented
+async def close_orphaned_tickets(guilds: list[discord.Guild]) -> tuple[int, int]:
+    """
+    Close the open tickets whose channel no longer exists in the given guilds,
+    returns how many are open and how many were closed
+    """
+    open_tickets, orphaned = await load_open_tickets(guilds)
+
+    if orphaned:
+        async with get_session() as session:
+            await session.execute(
+                update(Ticket)
+                .filter(Ticket.channel_id.in_(orphaned))
+                .values(is_closed=True, closed_at=get_time_now())
+            )
+            await commit(session)
+
+    return open_tickets, len(orphaned)
+
+
+@instrumented
+async def get_user_tickets(guild_id: int, user_id: int):
     """
     Retrieve a tickets for a user.
     """
-    with Session(Engine) as session:
-        return session.query(Ticket).filter_by(
+    async with get_session() as session:
+        return (await session.scalars(select(Ticket).filter_by(
             guild_id=guild_id,
             user_id=user_id
-        ).all()
+        ))).all()
 
 
-def get_ticket_by_channel(guild_id: int, channel_id: int) -> Ticket | None:
+def select_user_tickets(guild_id: int, user_id: int):
+    """
+    Statement listing tickets for a user, for page sources
+    """
+    return select(Ticket).filter_by(guild_id=guild_id, user_id=user_id)
+
+
+@instrumented
+async def get_ticket_by_channel(guild_id: int, channel_id: int) -> Ticket | None:
     """
     Retrieve a ticket for a given channel.
     """
-    with Session(Engine) as session:
-        return session.query(Ticket).filter_by(
+    async with get_session() as session:
+        return await session.scalar(select(Ticket).filter_by(
             guild_id=guild_id,
             channel_id=channel_id
-        ).first()
+        ))
 
 
-def get_ticket_by_id(guild_id: int, ticket_id: int) -> Ticket | None:
+@instrumented
+async def get_ticket_by_id(guild_id: int, ticket_id: int) -> Ticket | None:
     """
     Retrieve a ticket for a given ID.
     """
-    with Session(Engine) as session:
-        return session.query(Ticket).filter_by(
+    async with get_session() as session:
+        return await session.scalar(select(Ticket).filter_by(
             guild_id=guild_id,
             ticket_id=ticket_id
-        ).first()
+        ))
 
 
-def mark_ticket_closed(guild_id: int, channel_id: int, closed_by: int):
+@instrumented
+async def mark_ticket_closed(guild_id: int, channel_id: int, closed_by: int):
     """
     Mark a ticket as closed and return a refreshed, detached instance.
     """
-    with Session(Engine) as session:
-        ticket = session.query(Ticket).filter_by(
+    async with get_session() as session:
+        ticket = await session.scalar(select(Ticket).filter_by(
             guild_id=guild_id,
             channel_id=channel_id
-        ).first()
+        ))
 
         if ticket is None:
             return None
@@ -228,55 +320,85 @@ def mark_ticket_closed(guild_id: int, channel_id: int, closed_by: int):
             ticket.closed_at = get_time_now()
             ticket.closed_by = closed_by
             session.add(ticket)
-            session.commit()
+            await commit(session)
 
-        session.refresh(ticket)
+        await session.refresh(ticket)
         session.expunge(ticket)
         return ticket
 
 
-def get_panels_for_guild(guild_id: int):
+@instrumented
+async def get_panels_for_guild(guild_id: int):
     """
     Retrieve all panel entries for the given guild.
     """
-    with Session(Engine) as session:
-        return session.query(TicketPanel).filter_by(guild_id=guild_id).all()
+    async with get_session() as session:
+        return (await session.scalars(select(TicketPanel).filter_by(guild_id=guild_id))).all()
 
 
-def update_or_retrieve_ticket_config(guild_id: int, **kwargs):
+@instrumented
+async def load_ticket_configs(guild_ids: list[int]) -> int:
     """
-        Apply updates for a ticket config
+    Fill the config cache of many guilds with one query
     """
-    with Session(Engine) as session:
-        config = session.query(TicketConfig).filter_by(guild_id=guild_id).first()
+    async with get_session() as session:
+        configs = (await session.scalars(select(TicketConfig).filter(TicketConfig.guild_id.in_(guild_ids)))).all()
 
-        if not config:
-            config = TicketConfig(guild_id=guild_id)
+    for config in configs:
+        _config_cache.set(config.guild_id, TicketConfigSnapshot.from_row(config))
 
-            session.add(config)
-            session.commit()
-            session.refresh(config)
+    return len(configs)
 
-        embed_updates = {}
-        if "embed_title" in kwargs or "embed_description" in kwargs:
-            embed_updates["title"] = kwargs.get("embed_title", config.panel_embed.get("title"))
-            embed_updates["description"] = kwargs.get("embed_description", config.panel_embed.get("description"))
-            config.panel_embed = embed_updates
 
-        for field, value in kwargs.items():
-            if field in ("embed_title", "embed_description"):
-                continue
-            if value is not None and hasattr(config, field):
-                setattr(config, field, value)
+@instrumented
+async def load_ticket_panels(guild_ids: list[int]) -> int:
+    """
+    Fill the panel cache of many guilds with one query
+    """
+    async with get_session() as session:
+        panels = (await session.scalars(select(TicketPanel).filter(TicketPanel.guild_id.in_(guild_ids)))).all()
 
-        session.add(config)
-        session.commit()
-        session.refresh(config)
+    for panel in panels:
+        _panel_cache.set((panel.guild_id, panel.panel_id), TicketPanelSnapshot.from_row(panel))
 
-        return config
+    return len(panels)
 
 
-def build_panel_list_view(guild_id: int, panels: list[TicketPanel]) -> SelectActionList:
+@instrumented
+async def update_or_retrieve_ticket_config(guild_id: int, **kwargs):
+    """
+        Apply updates for a ticket config
+    """
+    if not kwargs:
+        cached = _config_cache.get(guild_id)
+        if cached is not None:
+            return cached
+    else:
+        _config_cache.invalidate(guild_id)
+        _view_cache.invalidate(guild_id)
+
+    embed_updates = {}
+    if "embed_title" in kwargs:
+        embed_updates["title"] = kwargs.pop("embed_title")
+    if "embed_description" in kwargs:
+        embed_updates["description"] = kwargs.pop("embed_description")
+
+    async with get_session() as session:
+        config, _ = await upsert(
+            session,
+            TicketConfig,
+            {"guild_id": guild_id},
+            kwargs,
+            merge={"panel_embed": embed_updates}
+        )
+        await commit(session)
+
+    snapshot = TicketConfigSnapshot.from_row(config)
+    _config_cache.set(guild_id, snapshot)
+    return snapshot
+
+
+async def build_panel_list_view(guild_id: int, panels: list[TicketPanel]) -> SelectActionList:
     """
     Build the dropdown that lists all panels
     """
@@ -293,7 +415,7 @@ def build_panel_list_view(guild_id: int, panels: list[TicketPanel]) -> SelectAct
     async def on_select(interaction: Interaction, values: Sequence[str]) -> None:
         await handle_ticket_panel_selection(interaction, values)
 
-    panel_embed = update_or_retrieve_ticket_config(guild_id).panel_embed
+    panel_embed = (await update_or_retrieve_ticket_config(guild_id)).panel_embed
 
     return SelectActionList(
         embed_title=panel_embed.get("title"),
@@ -305,6 +427,84 @@ def build_panel_list_view(guild_id: int, panels: list[TicketPanel]) -> SelectAct
     )
 
 
+@instrumented
+async def load_panel_list_views(guild_ids: list[int]) -> int:
+    """
+    Build and cache the panel dropdown of many guilds, with one query for the panels and one for the configs
+    """
+    async with get_session() as session:
+        panels = (await session.scalars(select(TicketPanel).filter(TicketPanel.guild_id.in_(guild_ids)))).all()
+
+    by_guild: dict[int, list[TicketPanel]] = {}
+    for panel in panels:
+        by_guild.setdefault(panel.guild_id, []).append(panel)
+
+    await load_ticket_configs(list(by_guild))
+    for guild_id, guild_panels in by_guild.items():
+        _view_cache.set(guild_id, await build_panel_list_view(guild_id, guild_panels))
+
+    return len(by_guild)
+
+
+async def get_panel_list_view(guild_id: int) -> SelectActionList | None:
+    """
+    The panel dropdown of a guild, built once and reused until its panels or config change
+    """
+    view = _view_cache.get(guild_id)
+    if view is None:
+        panels = await get_panels_for_guild(guild_id)
+        if not panels:
+            return None
+
+        view = await build_panel_list_view(guild_id, panels)
+        _view_cache.set(guild_id, view)
+
+    return view
+
+
+@instrumented
+async def get_ticket_admission(guild_id: int, user_id: int, panel_id: str) -> TicketAdmission:
+    """
+    Retrieve the panel, the config and the open ticket of a user with a single query,
+    only the open ticket is read when the panel and config are cached
+    """
+    panel_id = panel_id.lower()
+    panel = _panel_cache.get((guild_id, panel_id))
+    config = _config_cache.get(guild_id)
+
+    is_open_ticket = and_(Ticket.guild_id == guild_id, Ticket.user_id == user_id, Ticket.is_closed == False)
+
+    if panel is not None and config is not None:
+        async with get_session() as session:
+            open_ticket = await session.scalar(select(Ticket).filter(is_open_ticket).limit(1))
+        return TicketAdmission(panel, config, open_ticket)
+
+    async with get_session() as session:
+        row = (await session.execute(
+            select(TicketPanel, TicketConfig, Ticket)
+            .outerjoin(TicketConfig, TicketConfig.guild_id == TicketPanel.guild_id)
+            .outerjoin(Ticket, is_open_ticket)
+            .filter(TicketPanel.guild_id == guild_id, TicketPanel.panel_id == panel_id)
+            .limit(1)
+        )).first()
+
+    if row is None:
+        return TicketAdmission(None, None, None)
+
+    panel_row, config_row, open_ticket = row
+
+    panel = TicketPanelSnapshot.from_row(panel_row)
+    _panel_cache.set((guild_id, panel_id), panel)
+
+    if config_row is None:
+        config = await update_or_retrieve_ticket_config(guild_id)
+    else:
+        config = TicketConfigSnapshot.from_row(config_row)
+        _config_cache.set(guild_id, config)
+
+    return TicketAdmission(panel, config, open_ticket)
+
+
 async def handle_ticket_panel_selection(interaction: Interaction, values: Sequence[str]):
     if not values:
         return await interaction.followup.send("No options selected...", ephemeral=True)
@@ -317,53 +517,156 @@ async def handle_ticket_panel_selection(interaction: Interaction, values: Sequen
     if action != "tickets.open":
         return await interaction.followup.send("Unknown action!", ephemeral=True)
 
-    panel = update_or_retrieve_ticket_panel(interaction.guild.id, panel_id)
+    key = (interaction.guild.id, interaction.user.id)
+    in_flight = _ticket_creations.get(key)
+    if in_flight is not None:
+        # A repeated click waits for the first one instead of opening a second channel
+        channel = await asyncio.shield(in_flight)
+        if channel is None:
+            return await interaction.followup.send("Your previous ticket request didn't go through!", ephemeral=True)
+        return await interaction.followup.send(f"You currently have an open ticket at {channel.mention}!",
+                                               ephemeral=True)
+
+    creation = _ticket_creations[key] = asyncio.get_running_loop().create_future()
+    channel = None
+    try:
+        channel = await open_ticket(interaction, panel_id)
+    finally:
+        creation.set_result(channel)
+        del _ticket_creations[key]
+
+
+async def open_ticket(interaction: Interaction, panel_id: str) -> TextChannel | None:
+    """
+    Admit the member and open a ticket on the panel, returns the created channel
+    """
+    admission = await get_ticket_admission(interaction.guild.id, interaction.user.id, panel_id)
+
+    panel = admission.panel
     if not panel or not panel.is_enabled:
-        return await interaction.followup.send("That panel is not available!", ephemeral=True)
+        await interaction.followup.send("That panel is not available!", ephemeral=True)
+        return None
 
-    config = update_or_retrieve_ticket_config(interaction.guild.id)
-    if (any(role.id in config.banned_role_ids for role in interaction.user.roles)
-            or interaction.user.id in config.banned_user_ids):
-        return await interaction.followup.send("You are not allowed to open tickets!", ephemeral=True)
+    # Built once, each role list is then a single pass of set lookups
+    role_ids = frozenset(role.id for role in interaction.user.roles)
 
-    if any(role.id in panel.staff_role_ids for role in interaction.user.roles):
-        return await interaction.followup.send("Staff is not allowed to open this ticket!", ephemeral=True)
+    config = admission.config
+    if not role_ids.isdisjoint(config.banned_role_ids) or interaction.user.id in config.banned_user_ids:
+        await interaction.followup.send("You are not allowed to open tickets!", ephemeral=True)
+        return None
 
-    if not any(role.id in panel.required_role_ids for role in interaction.user.roles):
-        return await interaction.followup.send("You are not allowed to open this ticket!", ephemeral=True)
+    if not role_ids.isdisjoint(panel.staff_role_ids):
+        await interaction.followup.send("Staff is not allowed to open this ticket!", ephemeral=True)
+        return None
 
-    has_ticket = get_user_open_ticket(interaction.guild, interaction.user.id)
+    if role_ids.isdisjoint(panel.required_role_ids):
+        await interaction.followup.send("You are not allowed to open this ticket!", ephemeral=True)
+        return None
+
+    has_ticket = admission.open_ticket
     if has_ticket:
         has_channel = interaction.guild.get_channel(has_ticket.channel_id)
-        has_channel = has_channel.mention if has_channel else has_ticket.channel_id
-        return await interaction.followup.send(f"You currently have an open ticket at {has_channel}!", ephemeral=True)
+        if has_channel is not None:
+            await interaction.followup.send(f"You currently have an open ticket at {has_channel.mention}!",
+                                            ephemeral=True)
+            return None
 
-    try:
-        channel = await create_ticket_channel(interaction.guild, interaction.user, panel)
-        if channel is None:
-            return await interaction.followup.send(
-                "Something went wrong while creating the ticket. I'm missing the category id!",
-                ephemeral=True)
+        # The channel was deleted without the ticket being closed
+        await mark_ticket_closed(interaction.guild.id, has_ticket.channel_id, None)
 
-        await send_ticket_embed(interaction, channel, panel)
-    except Exception as e:
-        print(f"Something went wrong while creating ticket <{interaction.guild.id} - {interaction.user.id}> -> {e}")
-        return await interaction.followup.send(
+    started = time.perf_counter()
+    label = f"<{interaction.guild.id} - {interaction.user.id}>"
+
+    channel = await _ticket_step("channel", create_ticket_channel(interaction.guild, interaction.user, panel))
+    if channel is None:
+        await interaction.followup.send(
+            "Something went wrong while creating the ticket. I'm missing the category id!",
+            ephemeral=True)
+        return None
+
+    if isinstance(channel, Exception):
+        print(f"Something went wrong while creating ticket {label} -> {channel}")
+        await interaction.followup.send(
             "Something went wrong while creating the ticket. Contact an administrator!",
             ephemeral=True)
+        return None
+
+    # Steps only fail into their result, so one failing never cancels the others
+    async with asyncio.TaskGroup() as group:
+        embed = group.create_task(_ticket_step("embed", send_ticket_embed(interaction, channel, panel)))
+        mention = group.create_task(_ticket_step("mention", send_ticket_mention(interaction, channel, panel)))
+
+        # Written by this task, so the row belongs to the unit of work of the interaction
+        ticket = await _ticket_step("row", create_ticket(
+            guild_id=interaction.guild.id,
+            user_id=interaction.user.id,
+            channel_id=channel.id,
+            panel_id=panel_id
+        ))
 
-    ticket = create_ticket(
-        guild_id=interaction.guild.id,
-        user_id=interaction.user.id,
-        channel_id=channel.id,
-        panel_id=panel_id
-    )
+    if isinstance(mention.result(), Exception):
+        print(f"Something went wrong while mentioning ticket {label} -> {mention.result()}")
 
-    await send_ticket_logging(interaction.guild, ticket)
+    if ticket is None or isinstance(ticket, Exception) or isinstance(embed.result(), Exception):
+        if ticket is None:
+            # Another instance opened one between the admission and now
+            reply = "You already have an open ticket!"
+        else:
+            reply = "Something went wrong while creating the ticket. Contact an administrator!"
+            print(f"Something went wrong while creating ticket {label} -> "
+                  f"{ticket if isinstance(ticket, Exception) else embed.result()}")
+
+        await _discard_ticket_channel(channel, ticket)
+        await interaction.followup.send(reply, ephemeral=True)
+        return None
+
+    async with asyncio.TaskGroup() as group:
+        confirm = group.create_task(_ticket_step("confirm", interaction.followup.send(
+            f"Created a new ticket at {channel.mention}!", ephemeral=True)))
+        log_post = group.create_task(_ticket_step("logging", send_ticket_logging(interaction.guild, ticket)))
+
+    for name, step in (("confirming", confirm), ("logging", log_post)):
+        if isinstance(step.result(), Exception):
+            print(f"Something went wrong while {name} ticket {label} -> {step.result()}")
+
+    _record_ticket_step("total", (time.perf_counter() - started) * 1000)
+    return channel
+
+
+def _record_ticket_step(name: str, elapsed_ms: float) -> None:
+    histogram = ticket_step_metrics.get(name)
+    if histogram is None:
+        histogram = ticket_step_metrics[name] = LatencyHistogram()
+    histogram.record(elapsed_ms, 0)
+
+
+async def _ticket_step(name: str, awaitable):
+    """
+    Await one step of opening a ticket and record its latency, a failure is returned instead of raised
+    """
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    except Exception as e:
+        return e
+    finally:
+        _record_ticket_step(name, (time.perf_counter() - started) * 1000)
+
+
+async def _discard_ticket_channel(channel: TextChannel, ticket: Ticket | Exception | None) -> None:
+    """
+    Remove the channel of a ticket that could not be opened, closing its row when one was written
+    """
+    try:
+        if isinstance(ticket, Ticket):
+            await mark_ticket_closed(ticket.guild_id, ticket.channel_id, None)
+        await channel.delete(reason="Ticket could not be opened")
+    except Exception as e:
+        print(f"Something went wrong while discarding ticket channel {channel.id} -> {e}")
 
 
 async def create_ticket_channel(guild: discord.Guild, member: discord.Member,
-                                panel: Optional[TicketPanel]) -> TextChannel | None:
+                                panel: Optional[TicketPanelSnapshot]) -> TextChannel | None:
     overwrites: dict[discord.Role | discord.Member, discord.PermissionOverwrite] = {
         guild.default_role: discord.PermissionOverwrite(view_channel=False),
         member: discord.PermissionOverwrite(
@@ -407,7 +710,7 @@ async def create_ticket_channel(guild: discord.Guild, member: discord.Member,
 
 
 async def send_ticket_embed(interaction: Interaction, channel: discord.TextChannel,
-                            panel: Optional[TicketPanel]) -> None:
+                            panel: Optional[TicketPanelSnapshot]) -> None:
     embed_title = panel.ticket_embed.get("title").replace("user%", interaction.user.mention)
     author_url = panel.ticket_embed.get("author_url")
 
@@ -425,8 +728,13 @@ async def send_ticket_embed(interaction: Interaction, channel: discord.TextChann
     from backend.tickets.models.ticket_close_button import TicketCloseButton
     await channel.send(embed=embed, view=TicketCloseButton())
 
+
+async def send_ticket_mention(interaction: Interaction, channel: discord.TextChannel,
+                              panel: Optional[TicketPanelSnapshot]) -> None:
+    """
+    Ping the panel roles and the member in the new channel, removed right after
+    """
     await channel.send(f"{fmt_roles(panel.mention_role_ids)}{interaction.user.mention}", delete_after=1)
-    await interaction.followup.send(f"Created a new ticket at {channel.mention}!", ephemeral=True)
 
 
 async def send_ticket_logging(guild: discord.Guild, ticket: Ticket):
@@ -436,7 +744,7 @@ async def send_ticket_logging(guild: discord.Guild, ticket: Ticket):
     if ticket is None:
         return
 
-    panel = update_or_retrieve_ticket_panel(guild.id, ticket.panel_id)
+    panel = await update_or_retrieve_ticket_panel(guild.id, ticket.panel_id)
 
     if not panel or not panel.logging_channel_id:
         return
@@ -473,4 +781,4 @@ async def send_ticket_logging(guild: discord.Guild, ticket: Ticket):
     avatar_url = member.avatar.url if member.avatar is not None else "https://cdn.discordapp.com/embed/avatars/0.png"
     embed.set_thumbnail(url=avatar_url)
 
-    await logging_channel.send(embed=embed)
+    log_dispatcher.send(logging_channel, embed)
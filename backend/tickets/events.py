@@ -1,24 +1,107 @@
-import asyncio
+import time
+from collections import OrderedDict
 
 import discord
 from discord import InteractionType, AuditLogAction
 from discord.ext import commands
 
+from backend.core.audit_log import audit_log_index
+from backend.core.database import unit_of_work
+from backend.core.select_menu import SelectActionList
+from backend.guilds.director import get_panel_messages, delete_panel_messages
 from backend.tickets.director import (
-    get_panels_for_guild,
-    build_panel_list_view,
+    get_panel_list_view,
+    load_panel_list_views,
     handle_ticket_panel_selection, get_ticket_by_channel, mark_ticket_closed, send_ticket_logging,
 )
 from backend.tickets.models.ticket_close_button import TicketCloseButton
 
 
 class TicketEvents(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, max_bound_msgs: int = 2048):
         self.bot = bot
-        self._bound_msgs: set[int] = set()
+        self.max_bound_msgs = max_bound_msgs
+        # Panel messages bound to a copy of their guild's dropdown, least recently used first
+        self._bound_msgs: OrderedDict[int, SelectActionList] = OrderedDict()
+        self._rebound = False
         self.bot.add_view(TicketCloseButton())
 
+    def cog_unload(self):
+        for view in self._bound_msgs.values():
+            view.stop()
+        self._bound_msgs.clear()
+
+    async def bind_panel_message(self, guild_id: int, message_id: int) -> bool:
+        if message_id in self._bound_msgs:
+            self._bound_msgs.move_to_end(message_id)
+            return True
+
+        view = await get_panel_list_view(guild_id)
+        if view is None:
+            return False
+
+        view = view.copy()
+        self.bot.add_view(view, message_id=message_id)
+        self.track_panel_view(message_id, view)
+        return True
+
+    def track_panel_view(self, message_id: int, view: SelectActionList) -> None:
+        """
+        Register a view already bound to a panel message, like the one a panel is sent with
+        """
+        self._bound_msgs[message_id] = view
+        self._bound_msgs.move_to_end(message_id)
+
+        while len(self._bound_msgs) > self.max_bound_msgs:
+            # Stopping a view drops it from the client's view store
+            _, evicted = self._bound_msgs.popitem(last=False)
+            evicted.stop()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if self._rebound:
+            return
+        self._rebound = True
+
+        try:
+            started = time.perf_counter()
+            rebound, forgotten = await self.rebind_panel_messages()
+        except Exception as e:
+            print(f"Failed to rebind ticket panel messages -> {e}")
+            return
+
+        print(f"Rebound {rebound} ticket panel message(s) in {(time.perf_counter() - started) * 1000:.0f}ms, "
+              f"forgot {forgotten} whose channel is gone")
+
+    async def rebind_panel_messages(self) -> tuple[int, int]:
+        """
+        Bind every tracked ticket panel message ahead of its first click, voice menus need
+        no binding as their buttons are dispatched by the globally registered VoiceViews
+        """
+        messages = []
+        gone: set[int] = set()
+        for message in await get_panel_messages():
+            guild = self.bot.get_guild(message.guild_id)
+            if guild is None or guild.unavailable:
+                continue
+
+            if guild.get_channel(message.channel_id) is None:
+                gone.add(message.message_id)
+            elif message.kind == "tickets.menu":
+                messages.append(message)
+
+        await delete_panel_messages(gone)
+        await load_panel_list_views(list({message.guild_id for message in messages}))
+
+        # Most recent last, so they are the ones kept when there are more than the registry holds
+        rebound = 0
+        for message in sorted(messages, key=lambda m: m.message_id):
+            rebound += await self.bind_panel_message(message.guild_id, message.message_id)
+
+        return rebound, len(gone)
+
     @commands.Cog.listener()
+    @unit_of_work
     async def on_interaction(self, interaction: discord.Interaction):
         if interaction.type is not InteractionType.component or interaction.guild is None:
             return
@@ -26,12 +109,13 @@ class TicketEvents(commands.Cog):
         if interaction.data.get("custom_id") != "tickets.menu":
             return
 
-        message_id = interaction.message.id
-        if message_id not in self._bound_msgs:
-            view = build_panel_list_view(interaction.guild.id, get_panels_for_guild(interaction.guild.id))
+        if interaction.message.id in self._bound_msgs:
+            # The view store already handed this click to the bound view
+            self._bound_msgs.move_to_end(interaction.message.id)
+            return
 
-            self.bot.add_view(view, message_id=message_id)
-            self._bound_msgs.add(message_id)
+        # Only the following clicks reach the view, this one is handled here
+        await self.bind_panel_message(interaction.guild.id, interaction.message.id)
 
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=True)
@@ -46,25 +130,18 @@ class TicketEvents(commands.Cog):
 
         guild = channel.guild
 
-        ticket = get_ticket_by_channel(guild.id, channel.id)
+        ticket = await get_ticket_by_channel(guild.id, channel.id)
         if ticket is None or ticket.is_closed:
             return
 
-        await asyncio.sleep(1)
+        entry = await audit_log_index.wait_for(guild.id, AuditLogAction.channel_delete, channel.id)
 
         actioner_id = None
-        try:
-            async for entry in guild.audit_logs(
-                    limit=5,
-                    action=AuditLogAction.channel_delete
-            ):
-                actioner_id = None if entry.user.id == self.bot.user.id else entry.user.id
-                break
-        except Exception:
-            pass
+        if entry is not None and entry.user_id != self.bot.user.id:
+            actioner_id = entry.user_id
 
         try:
-            closed_ticket = mark_ticket_closed(guild.id, channel.id, actioner_id)
+            closed_ticket = await mark_ticket_closed(guild.id, channel.id, actioner_id)
             await send_ticket_logging(guild, closed_ticket)
         except Exception:
             return
@@ -1,19 +1,25 @@
-from sqlalchemy import Column, BigInteger, ForeignKey, DateTime, Boolean, String
+from sqlalchemy import Column, BigInteger, ForeignKey, Boolean, String, Index, text
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_guild_user_closed", "guild_id", "user_id", "is_closed"),
+        Index("ix_tickets_guild_user_created", "guild_id", "user_id", "created_at", "ticket_id"),
+        # A user holds at most one open ticket per guild
+        Index("uq_tickets_guild_user_open", "guild_id", "user_id", unique=True, postgresql_where=text("NOT is_closed")),
+    )
 
     ticket_id = Column(BigInteger, primary_key=True)
     guild_id = Column(BigInteger, ForeignKey("guilds.guild_id"), index=True)
     panel_id = Column(String, nullable=True)
     user_id = Column(BigInteger, nullable=False, index=True)
     channel_id = Column(BigInteger, nullable=False, unique=True)
-    created_at = Column(DateTime, default=get_time_now())
-    closed_at = Column(DateTime, nullable=True)
+    created_at = Column(NaiveDateTime, default=get_time_now())
+    closed_at = Column(NaiveDateTime, nullable=True)
     closed_by = Column(BigInteger, nullable=True, index=True)
-    updated_at = Column(DateTime, default=get_time_now(), onupdate=get_time_now())
+    updated_at = Column(NaiveDateTime, default=get_time_now(), onupdate=get_time_now())
     is_closed = Column(Boolean, default=False, index=True)
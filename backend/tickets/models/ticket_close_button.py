@@ -1,6 +1,7 @@
 import discord
 from discord import ButtonStyle
 
+from backend.core.database import unit_of_work
 from backend.tickets.director import send_ticket_logging, get_ticket_by_channel, \
     update_or_retrieve_ticket_panel, mark_ticket_closed
 
@@ -14,6 +15,7 @@ class TicketCloseButton(discord.ui.View):
         style=ButtonStyle.red,
         custom_id="tickets.close"
     )
+    @unit_of_work
     async def close_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if interaction.channel is discord.TextChannel:
             return await interaction.followup.send("You may only use this command on a text channel!",
@@ -22,8 +24,8 @@ class TicketCloseButton(discord.ui.View):
         if not interaction.response.is_done():
             await interaction.response.defer(ephemeral=True)
 
-        ticket = get_ticket_by_channel(interaction.guild.id, interaction.channel.id)
-        panel = update_or_retrieve_ticket_panel(interaction.guild.id, ticket.panel_id)
+        ticket = await get_ticket_by_channel(interaction.guild.id, interaction.channel.id)
+        panel = await update_or_retrieve_ticket_panel(interaction.guild.id, ticket.panel_id)
 
         if panel is None:
             return await interaction.followup.send("Ticket panel is not present!", ephemeral=True)
@@ -38,7 +40,7 @@ class TicketCloseButton(discord.ui.View):
             return await interaction.followup.send("This ticket is already closed?", ephemeral=True)
 
         try:
-            closed_ticket = mark_ticket_closed(interaction.guild.id, interaction.channel.id, interaction.user.id)
+            closed_ticket = await mark_ticket_closed(interaction.guild.id, interaction.channel.id, interaction.user.id)
         except Exception:
             return await interaction.followup.send("Failed to close ticket. Contact an administrator!",
                                                    ephemeral=True)
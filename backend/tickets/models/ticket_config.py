@@ -1,7 +1,7 @@
-from sqlalchemy import Column, BigInteger, ForeignKey, ARRAY, DateTime
+from sqlalchemy import Column, BigInteger, ForeignKey, ARRAY
 from sqlalchemy.dialects.postgresql import JSONB
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 
 
@@ -17,5 +17,5 @@ class TicketConfig(Base):
                          nullable=True)
     banned_user_ids = Column(ARRAY(BigInteger), default=list)
     banned_role_ids = Column(ARRAY(BigInteger), default=list)
-    updated_at = Column(DateTime, default=get_time_now(), onupdate=get_time_now())
+    updated_at = Column(NaiveDateTime, default=get_time_now(), onupdate=get_time_now())
     updated_by = Column(BigInteger, nullable=True)
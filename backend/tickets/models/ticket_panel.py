@@ -1,7 +1,7 @@
-from sqlalchemy import Column, BigInteger, ForeignKey, DateTime, String, ARRAY, Boolean
+from sqlalchemy import Column, BigInteger, ForeignKey, String, ARRAY, Boolean
 from sqlalchemy.dialects.postgresql import JSONB
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 
 
@@ -29,7 +29,7 @@ class TicketPanel(Base):
                           },
                           nullable=True)
     logging_channel_id = Column(BigInteger, nullable=True)
-    created_at = Column(DateTime, default=get_time_now())
-    updated_at = Column(DateTime, default=get_time_now(), onupdate=get_time_now())
+    created_at = Column(NaiveDateTime, default=get_time_now())
+    updated_at = Column(NaiveDateTime, default=get_time_now(), onupdate=get_time_now())
     updated_by = Column(BigInteger, nullable=True)
     is_enabled = Column(Boolean, default=True)
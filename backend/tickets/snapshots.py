@@ -0,0 +1,72 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping
+
+from backend.core.cache import freeze_mapping
+from backend.tickets.models.ticket_config import TicketConfig
+from backend.tickets.models.ticket_panel import TicketPanel
+
+
+@dataclass(frozen=True, slots=True)
+class TicketConfigSnapshot:
+    """
+    Compact, immutable view of a TicketConfig row kept in the config cache. Discord IDs
+    are packed into int64 arrays, far smaller than a list or set of int objects for the
+    handful of roles a config holds, and scanned just as fast at that size.
+    """
+    guild_id: int
+    panel_embed: Mapping | None
+    banned_user_ids: array
+    banned_role_ids: array
+    updated_at: datetime | None
+    updated_by: int | None
+
+    @classmethod
+    def from_row(cls, config: TicketConfig) -> "TicketConfigSnapshot":
+        return cls(
+            guild_id=config.guild_id,
+            panel_embed=freeze_mapping(config.panel_embed),
+            banned_user_ids=array("q", config.banned_user_ids or ()),
+            banned_role_ids=array("q", config.banned_role_ids or ()),
+            updated_at=config.updated_at,
+            updated_by=config.updated_by,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class TicketPanelSnapshot:
+    """
+    Compact, immutable view of a TicketPanel row kept in the panel cache.
+    """
+    panel_id: str
+    guild_id: int
+    panel_embed: Mapping | None
+    category_id: int | None
+    staff_role_ids: array
+    mention_role_ids: array
+    required_role_ids: array
+    ticket_embed: Mapping | None
+    logging_channel_id: int | None
+    created_at: datetime | None
+    updated_at: datetime | None
+    updated_by: int | None
+    is_enabled: bool
+
+    @classmethod
+    def from_row(cls, panel: TicketPanel) -> "TicketPanelSnapshot":
+        return cls(
+            panel_id=panel.panel_id,
+            guild_id=panel.guild_id,
+            panel_embed=freeze_mapping(panel.panel_embed),
+            category_id=panel.category_id,
+            staff_role_ids=array("q", panel.staff_role_ids or ()),
+            mention_role_ids=array("q", panel.mention_role_ids or ()),
+            required_role_ids=array("q", panel.required_role_ids or ()),
+            ticket_embed=freeze_mapping(panel.ticket_embed),
+            logging_channel_id=panel.logging_channel_id,
+            created_at=panel.created_at,
+            updated_at=panel.updated_at,
+            updated_by=panel.updated_by,
+            is_enabled=bool(panel.is_enabled),
+        )
@@ -34,9 +34,9 @@ class VoiceCommand(commands.Cog):
         """
         Create a permanent voice channel for member
         """
-        config = create_or_update_voice_config(member.guild.id)
+        config = await create_or_update_voice_config(member.guild.id)
 
-        owned_channel = has_user_existing_voice_channel(member)
+        owned_channel = await has_user_existing_voice_channel(member)
         if owned_channel:
             return await ctx.reply(f"An active voice channel found at {owned_channel.mention} for {member.mention}.")
 
@@ -58,13 +58,13 @@ class VoiceCommand(commands.Cog):
         """
         Delete a voice channel for member
         """
-        voice = get_voice_by_channel(ctx.guild.id, channel.id)
+        voice = await get_voice_by_channel(ctx.guild.id, channel.id)
         if not voice:
             return await ctx.reply(f"You may delete only managed voice channels.")
 
         try:
             await channel.delete()
-            mark_voice_closed(channel.id)
+            await mark_voice_closed(channel.id)
         except Exception as e:
             return await ctx.reply(f"Something went wrong while deleting a channel -> {e}")
 
@@ -4,8 +4,9 @@ from discord.ext import commands
 from backend.core.helper import get_commands_help_messages, fmt_channel, fmt_roles, format_time_in_zone, fmt_user, \
     get_time_now, fmt_users
 from backend.core.pagination import Pagination
+from backend.guilds.director import record_panel_message
 from backend.permissions.enforce import has_permission
-from backend.voice.director import create_or_update_voice_config
+from backend.voice.director import create_or_update_voice_config, close_orphaned_voices
 from backend.voice.ui.voice_views import VoiceViews
 
 
@@ -31,7 +32,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Display the voice config
         """
-        config = create_or_update_voice_config(ctx.guild.id)
+        config = await create_or_update_voice_config(ctx.guild.id)
 
         description = (
             f"**ᴅᴇꜰᴀᴜʟᴛ ᴄᴀᴛᴇɢᴏʀʏ ɪᴅ**: {config.default_category_id}\n"
@@ -70,7 +71,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the default category id for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             default_category_id=channel.id,
             updated_by=ctx.author.id
@@ -88,7 +89,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the custom category id for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             custom_category_id=channel.id,
             updated_by=ctx.author.id
@@ -106,7 +107,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the join channel for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             join_channel_id=channel.id,
             updated_by=ctx.author.id
@@ -129,15 +130,15 @@ class VoiceAdminCommand(commands.Cog):
         """
         Add a role to voice config staff roles
         """
-        config = create_or_update_voice_config(ctx.guild.id)
-        staff_roles = config.staff_role_ids
+        config = await create_or_update_voice_config(ctx.guild.id)
+        staff_roles = list(config.staff_role_ids or [])
 
         if role.id in staff_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         staff_roles.append(role.id)
 
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             staff_role_ids=staff_roles,
             updated_by=ctx.author.id
@@ -155,15 +156,15 @@ class VoiceAdminCommand(commands.Cog):
         """
         Remove a role from voice config staff roles
         """
-        config = create_or_update_voice_config(ctx.guild.id)
-        staff_roles = config.staff_role_ids
+        config = await create_or_update_voice_config(ctx.guild.id)
+        staff_roles = list(config.staff_role_ids or [])
 
         if role.id not in staff_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         staff_roles.remove(role.id)
 
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             staff_role_ids=staff_roles,
             updated_by=ctx.author.id
@@ -187,7 +188,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the embed title for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             embed_title=title,
             updated_by=ctx.author.id
@@ -206,7 +207,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the embed description for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             embed_description=description,
             updated_by=ctx.author.id
@@ -224,7 +225,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the logging channel for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             logging_channel_id=channel.id,
             updated_by=ctx.author.id
@@ -242,7 +243,7 @@ class VoiceAdminCommand(commands.Cog):
         """
         Set the enabled for voice config
         """
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             is_enabled=enabled,
             updated_by=ctx.author.id
@@ -265,16 +266,16 @@ class VoiceAdminCommand(commands.Cog):
         """
         Add a role to voice config banned roles
         """
-        config = create_or_update_voice_config(ctx.guild.id)
+        config = await create_or_update_voice_config(ctx.guild.id)
 
-        banned_roles = config.banned_role_ids
+        banned_roles = list(config.banned_role_ids or [])
 
         if role.id in banned_roles:
             return await ctx.reply(f"Role {role.mention} is present!")
 
         banned_roles.append(role.id)
 
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             banned_role_ids=banned_roles,
             updated_by=ctx.author.id
@@ -292,16 +293,16 @@ class VoiceAdminCommand(commands.Cog):
         """
         Remove a role from voice config banned roles
         """
-        config = create_or_update_voice_config(ctx.guild.id)
+        config = await create_or_update_voice_config(ctx.guild.id)
 
-        banned_roles = config.banned_role_ids
+        banned_roles = list(config.banned_role_ids or [])
 
         if role.id not in banned_roles:
             return await ctx.reply(f"Role {role.mention} is not present!")
 
         banned_roles.remove(role.id)
 
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             banned_role_ids=banned_roles,
             updated_by=ctx.author.id
@@ -324,16 +325,16 @@ class VoiceAdminCommand(commands.Cog):
         """
         Add a role to voice config banned users
         """
-        config = create_or_update_voice_config(ctx.guild.id)
+        config = await create_or_update_voice_config(ctx.guild.id)
 
-        banned_users = config.banned_user_ids
+        banned_users = list(config.banned_user_ids or [])
 
         if member.id in banned_users:
             return await ctx.reply(f"User {member.mention} is present!")
 
         banned_users.append(member.id)
 
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             banned_user_ids=banned_users,
             updated_by=ctx.author.id
@@ -351,16 +352,16 @@ class VoiceAdminCommand(commands.Cog):
         """
         Remove a role from voice config banned users
         """
-        config = create_or_update_voice_config(ctx.guild.id)
+        config = await create_or_update_voice_config(ctx.guild.id)
 
-        banned_users = config.banned_user_ids
+        banned_users = list(config.banned_user_ids or [])
 
         if member.id not in banned_users:
             return await ctx.reply(f"User {member.mention} is not present!")
 
         banned_users.remove(member.id)
 
-        create_or_update_voice_config(
+        await create_or_update_voice_config(
             ctx.guild.id,
             banned_user_ids=banned_users,
             updated_by=ctx.author.id
@@ -368,13 +369,23 @@ class VoiceAdminCommand(commands.Cog):
 
         await ctx.reply(f"Updated voice config **banned users** by removing {member.mention}.")
 
+    @has_permission()
+    @_voice_admin.command(name="close-orphaned")
+    async def _close_orphaned(self, ctx):
+        """
+        Mark closed the live voices whose channel was deleted
+        """
+        live, closed = await close_orphaned_voices([ctx.guild])
+
+        await ctx.reply(f"Closed **{closed}** of **{live}** live voice(s) whose channel was deleted.")
+
     @has_permission()
     @_voice_admin.command(name="send-embed")
     async def _send_embed(self, ctx):
         """
         Post the voice control panel
         """
-        config_embed = create_or_update_voice_config(ctx.guild.id).embed
+        config_embed = (await create_or_update_voice_config(ctx.guild.id)).embed
 
         embed = discord.Embed(
             title=config_embed.get("title"),
@@ -383,7 +394,8 @@ class VoiceAdminCommand(commands.Cog):
             timestamp=get_time_now(),
         )
 
-        await ctx.send(embed=embed, view=VoiceViews())
+        message = await ctx.send(embed=embed, view=VoiceViews())
+        await record_panel_message(ctx.guild.id, ctx.channel.id, message.id, "voice.menu")
 
 
 async def setup(bot):
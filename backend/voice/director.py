@@ -1,14 +1,20 @@
 import discord
 from discord import VoiceChannel
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
 
-from backend.core.database import Engine
+from backend.core.cache import TTLCache
+from backend.core.database import get_session, commit, upsert
 from backend.core.helper import get_time_now
+from backend.core.instrumentation import instrumented
 from backend.voice.models.voice import Voice
 from backend.voice.models.voice_config import VoiceConfig
+from backend.voice.snapshots import VoiceConfigSnapshot
 
+_config_cache = TTLCache("voice_config", max_size=4096, ttl=600)
 
-def create_voice(
+
+@instrumented
+async def create_voice(
         guild_id: int,
         user_id: int,
         channel_id: int,
@@ -17,7 +23,7 @@ def create_voice(
     """
     Create and save a new voice record
     """
-    with Session(Engine) as session:
+    async with get_session() as session:
         voice = Voice(
             guild_id=guild_id,
             user_id=user_id,
@@ -26,79 +32,136 @@ def create_voice(
         )
 
         session.add(voice)
-        session.commit()
-        session.refresh(voice)
+        await commit(session)
+        await session.refresh(voice)
 
         return voice
 
 
-def mark_voice_closed(channel_id: int):
-    with Session(Engine) as session:
-        voice = session.query(Voice).filter_by(channel_id=channel_id).first()
+@instrumented
+async def mark_voice_closed(channel_id: int):
+    async with get_session() as session:
+        voice = await session.scalar(select(Voice).filter_by(channel_id=channel_id))
 
         if not voice.is_deleted:
             voice.is_deleted = True
             voice.deleted_at = get_time_now()
             session.add(voice)
-            session.commit()
+            await commit(session)
 
-        session.refresh(voice)
+        await session.refresh(voice)
         session.expunge(voice)
         return voice
 
 
-def create_or_update_voice_config(guild_id: int, **kwargs):
+@instrumented
+async def create_or_update_voice_config(guild_id: int, **kwargs):
     """
     Apply updates for voice config
     """
-    with Session(Engine) as session:
-        config = session.query(VoiceConfig).filter_by(guild_id=guild_id).first()
+    if not kwargs:
+        cached = _config_cache.get(guild_id)
+        if cached is not None:
+            return cached
+    else:
+        _config_cache.invalidate(guild_id)
+
+    embed_updates = {}
+    if "embed_title" in kwargs:
+        embed_updates["title"] = kwargs.pop("embed_title")
+    if "embed_description" in kwargs:
+        embed_updates["description"] = kwargs.pop("embed_description")
+
+    async with get_session() as session:
+        config, _ = await upsert(session, VoiceConfig, {"guild_id": guild_id}, kwargs, merge={"embed": embed_updates})
+        await commit(session)
+
+    snapshot = VoiceConfigSnapshot.from_row(config)
+    _config_cache.set(guild_id, snapshot)
+    return snapshot
+
+
+@instrumented
+async def load_voice_configs(guild_ids: list[int]) -> int:
+    """
+    Fill the config cache of many guilds with one query
+    """
+    async with get_session() as session:
+        configs = (await session.scalars(select(VoiceConfig).filter(VoiceConfig.guild_id.in_(guild_ids)))).all()
+
+    for config in configs:
+        _config_cache.set(config.guild_id, VoiceConfigSnapshot.from_row(config))
+
+    return len(configs)
+
+
+@instrumented
+async def load_live_voices(guilds: list[discord.Guild]) -> tuple[int, list[int]]:
+    """
+    Read the live voices of the given guilds in one query,
+    returns how many are live and the channels of those whose channel no longer exists
+    """
+    guilds_by_id = {guild.id: guild for guild in guilds if not guild.unavailable}
 
-        if not config:
-            config = VoiceConfig(guild_id=guild_id)
+    async with get_session() as session:
+        live = (await session.execute(
+            select(Voice.guild_id, Voice.channel_id).filter(
+                Voice.guild_id.in_(guilds_by_id),
+                Voice.is_deleted == False
+            )
+        )).all()
 
-        embed_updates = {}
-        if "embed_title" in kwargs:
-            embed_updates["title"] = kwargs.pop("embed_title")
-        if "embed_description" in kwargs:
-            embed_updates["description"] = kwargs.pop("embed_description")
+    orphaned = [
+        channel_id for guild_id, channel_id in live
+        if guilds_by_id[guild_id].get_channel(channel_id) is None
+    ]
 
-        if embed_updates:
-            current = getattr(config, "embed") or {}
-            setattr(config, "embed", {**current, **embed_updates})
+    return len(live), orphaned
 
-        for field, value in kwargs.items():
-            if value is not None and hasattr(config, field):
-                setattr(config, field, value)
 
-        session.add(config)
-        session.commit()
-        session.refresh(config)
+@instrumented
+async def close_orphaned_voices(guilds: list[discord.Guild]) -> tuple[int, int]:
+    """
+    Mark closed the live voices whose channel no longer exists in the given guilds,
+    returns how many are live and how many were closed
+    """
+    live, orphaned = await load_live_voices(guilds)
+
+    if orphaned:
+        async with get_session() as session:
+            await session.execute(
+                update(Voice)
+                .filter(Voice.channel_id.in_(orphaned))
+                .values(is_deleted=True, deleted_at=get_time_now())
+            )
+            await commit(session)
 
-        return config
+    return live, len(orphaned)
 
 
-def get_voice_by_channel(guild_id: int, channel_id: int):
+@instrumented
+async def get_voice_by_channel(guild_id: int, channel_id: int):
     """
     Retrieve a voice obj by channel
     """
-    with Session(Engine) as session:
-        return session.query(Voice).filter_by(guild_id=guild_id, channel_id=channel_id).first()
+    async with get_session() as session:
+        return await session.scalar(select(Voice).filter_by(guild_id=guild_id, channel_id=channel_id))
 
 
-def get_user_active_voice(guild_id: int, user_id: int):
+@instrumented
+async def get_user_active_voice(guild_id: int, user_id: int):
     """
     Retrieve a user open ticket
     """
-    with Session(Engine) as session:
-        return session.query(Voice).filter_by(
+    async with get_session() as session:
+        return await session.scalar(select(Voice).filter_by(
             guild_id=guild_id,
             user_id=user_id,
             is_deleted=False
-        ).first()
+        ))
 
 
-def is_controller(member: discord.Member, config: VoiceConfig, voice: Voice) -> bool:
+def is_controller(member: discord.Member, config: VoiceConfigSnapshot, voice: Voice) -> bool:
     """
     Allow channel's owner and staff to manage
     """
@@ -108,7 +171,7 @@ def is_controller(member: discord.Member, config: VoiceConfig, voice: Voice) ->
     return any(role.id in config.staff_role_ids for role in member.roles)
 
 
-def is_banned(member: discord.Member, config: VoiceConfig) -> bool:
+def is_banned(member: discord.Member, config: VoiceConfigSnapshot) -> bool:
     """
     Check if user is banned from creating a voice channel
     """
@@ -122,7 +185,7 @@ async def handle_voice_channel_selection(interaction: discord.Interaction):
         await interaction.response.send_message("You are not in a voice channel.", ephemeral=True)
         return None, None
 
-    voice_config = create_or_update_voice_config(interaction.guild.id)
+    voice_config = await create_or_update_voice_config(interaction.guild.id)
     if not voice_config.is_enabled:
         await interaction.response.send_message("Voice system is currently disabled.", ephemeral=True)
         return None, None
@@ -132,7 +195,7 @@ async def handle_voice_channel_selection(interaction: discord.Interaction):
         return None, None
 
     voice_channel = interaction.user.voice.channel
-    voice = get_voice_by_channel(interaction.guild.id, voice_channel.id)
+    voice = await get_voice_by_channel(interaction.guild.id, voice_channel.id)
     if not voice:
         await interaction.response.send_message("You must be in a managed voice channel.", ephemeral=True)
         return None, None
@@ -144,13 +207,13 @@ async def handle_voice_channel_selection(interaction: discord.Interaction):
     return voice_channel, voice
 
 
-def has_user_existing_voice_channel(member: discord.Member) -> VoiceChannel | None:
-    owned = get_user_active_voice(member.guild.id, member.id)
+async def has_user_existing_voice_channel(member: discord.Member) -> VoiceChannel | None:
+    owned = await get_user_active_voice(member.guild.id, member.id)
     if owned:
         existing_channel = member.guild.get_channel(owned.channel_id)
         if existing_channel:
             return existing_channel
-        mark_voice_closed(owned.channel_id)
+        await mark_voice_closed(owned.channel_id)
     return None
 
 
@@ -165,6 +228,6 @@ async def create_voice_channel(member: discord.Member, category_id: int, is_temp
         if is_temporary:
             await member.move_to(created_channel)
 
-        create_voice(member.guild.id, member.id, created_channel.id, is_temporary)
+        await create_voice(member.guild.id, member.id, created_channel.id, is_temporary)
 
     return created_channel
@@ -15,12 +15,12 @@ class VoiceEvents(commands.Cog):
     async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState,
                                     after: discord.VoiceState):
         if after.channel and after.channel != before.channel:
-            config = create_or_update_voice_config(member.guild.id)
+            config = await create_or_update_voice_config(member.guild.id)
             if not config.is_enabled or is_banned(member, config):
                 return
 
             if config.join_channel_id and after.channel.id == config.join_channel_id:
-                owned_channel = has_user_existing_voice_channel(member)
+                owned_channel = await has_user_existing_voice_channel(member)
                 if owned_channel is not None:
                     try:
                         await member.move_to(owned_channel)
@@ -35,10 +35,10 @@ class VoiceEvents(commands.Cog):
 
         if before.channel and before.channel != after.channel:
             try:
-                voice = get_voice_by_channel(member.guild.id, before.channel.id)
+                voice = await get_voice_by_channel(member.guild.id, before.channel.id)
                 if voice and not before.channel.members and voice.is_temporary:
                     await before.channel.delete()
-                    mark_voice_closed(before.channel.id)
+                    await mark_voice_closed(before.channel.id)
             except Exception:
                 return
 
@@ -1,16 +1,19 @@
-from sqlalchemy import Column, BigInteger, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, BigInteger, ForeignKey, Boolean, Index
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 
 
 class Voice(Base):
     __tablename__ = "voices"
+    __table_args__ = (
+        Index("ix_voices_guild_user_deleted", "guild_id", "user_id", "is_deleted"),
+    )
 
     channel_id = Column(BigInteger, primary_key=True)
     guild_id = Column(BigInteger, ForeignKey("guilds.guild_id"), index=True)
     user_id = Column(BigInteger, nullable=False, index=True)
     is_temporary = Column(Boolean, default=True, index=True)
-    created_at = Column(DateTime, default=get_time_now())
-    deleted_at = Column(DateTime, nullable=True)
+    created_at = Column(NaiveDateTime, default=get_time_now())
+    deleted_at = Column(NaiveDateTime, nullable=True)
     is_deleted = Column(Boolean, default=False, index=True)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, BigInteger, ForeignKey, DateTime, ARRAY, Boolean
+from sqlalchemy import Column, BigInteger, ForeignKey, ARRAY, Boolean
 from sqlalchemy.dialects.postgresql import JSONB
 
-from backend.core.database import Base
+from backend.core.database import Base, NaiveDateTime
 from backend.core.helper import get_time_now
 
 
@@ -22,6 +22,6 @@ class VoiceConfig(Base):
     banned_user_ids = Column(ARRAY(BigInteger), default=list)
     banned_role_ids = Column(ARRAY(BigInteger), default=list)
     logging_channel_id = Column(BigInteger, nullable=True)
-    updated_at = Column(DateTime, default=get_time_now(), onupdate=get_time_now())
+    updated_at = Column(NaiveDateTime, default=get_time_now(), onupdate=get_time_now())
     updated_by = Column(BigInteger, nullable=True)
     is_enabled = Column(Boolean, default=True)
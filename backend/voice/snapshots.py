@@ -0,0 +1,43 @@
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Mapping
+
+from backend.core.cache import freeze_mapping
+from backend.voice.models.voice_config import VoiceConfig
+
+
+@dataclass(frozen=True, slots=True)
+class VoiceConfigSnapshot:
+    """
+    Compact, immutable view of a VoiceConfig row kept in the config cache.
+    """
+    guild_id: int
+    default_category_id: int | None
+    custom_category_id: int | None
+    join_channel_id: int | None
+    embed: Mapping | None
+    staff_role_ids: array
+    banned_user_ids: array
+    banned_role_ids: array
+    logging_channel_id: int | None
+    updated_at: datetime | None
+    updated_by: int | None
+    is_enabled: bool
+
+    @classmethod
+    def from_row(cls, config: VoiceConfig) -> "VoiceConfigSnapshot":
+        return cls(
+            guild_id=config.guild_id,
+            default_category_id=config.default_category_id,
+            custom_category_id=config.custom_category_id,
+            join_channel_id=config.join_channel_id,
+            embed=freeze_mapping(config.embed),
+            staff_role_ids=array("q", config.staff_role_ids or ()),
+            banned_user_ids=array("q", config.banned_user_ids or ()),
+            banned_role_ids=array("q", config.banned_role_ids or ()),
+            logging_channel_id=config.logging_channel_id,
+            updated_at=config.updated_at,
+            updated_by=config.updated_by,
+            is_enabled=bool(config.is_enabled),
+        )
@@ -1,5 +1,6 @@
 import discord
 
+from backend.core.database import unit_of_work
 from backend.voice.director import handle_voice_channel_selection
 
 
@@ -10,6 +11,7 @@ class RenameModal(discord.ui.Modal, title="Rename Channel"):
         super().__init__()
         self.channel_id = channel_id
 
+    @unit_of_work
     async def on_submit(self, interaction: discord.Interaction):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -30,6 +32,7 @@ class LimitModal(discord.ui.Modal, title="Set User Limit"):
         super().__init__()
         self.channel_id = channel_id
 
+    @unit_of_work
     async def on_submit(self, interaction: discord.Interaction):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -59,6 +62,7 @@ class _MemberSelect(discord.ui.UserSelect):
         self.channel_id = channel_id
         self.action = action
 
+    @unit_of_work
     async def callback(self, interaction: discord.Interaction):
         voice_channel, voice = await handle_voice_channel_selection(interaction)
         if not voice_channel:
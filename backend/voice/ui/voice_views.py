@@ -1,5 +1,6 @@
 import discord
 
+from backend.core.database import unit_of_work
 from backend.voice.director import (
     mark_voice_closed, handle_voice_channel_selection, get_voice_by_channel,
 )
@@ -11,6 +12,7 @@ class VoiceViews(discord.ui.View):
         super().__init__(timeout=None)
 
     @discord.ui.button(label="Rename", style=discord.ButtonStyle.secondary, custom_id="voice.button:rename")
+    @unit_of_work
     async def rename(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -19,6 +21,7 @@ class VoiceViews(discord.ui.View):
         await interaction.response.send_modal(RenameModal(voice_channel.id))
 
     @discord.ui.button(label="Limit", style=discord.ButtonStyle.secondary, custom_id="voice.button:limit")
+    @unit_of_work
     async def limit(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -27,6 +30,7 @@ class VoiceViews(discord.ui.View):
         await interaction.response.send_modal(LimitModal(voice_channel.id))
 
     @discord.ui.button(label="Lock", style=discord.ButtonStyle.primary, custom_id="voice.button:lock")
+    @unit_of_work
     async def lock(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, voice = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -43,6 +47,7 @@ class VoiceViews(discord.ui.View):
         await interaction.response.send_message("Locked.", ephemeral=True)
 
     @discord.ui.button(label="Unlock", style=discord.ButtonStyle.success, custom_id="voice.button:unlock")
+    @unit_of_work
     async def unlock(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -56,6 +61,7 @@ class VoiceViews(discord.ui.View):
         await interaction.response.send_message("Unlocked.", ephemeral=True)
 
     @discord.ui.button(label="Add", style=discord.ButtonStyle.secondary, custom_id="voice.button:add")
+    @unit_of_work
     async def add(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -68,6 +74,7 @@ class VoiceViews(discord.ui.View):
         )
 
     @discord.ui.button(label="Remove", style=discord.ButtonStyle.secondary, custom_id="voice.button:remove")
+    @unit_of_work
     async def remove(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -80,6 +87,7 @@ class VoiceViews(discord.ui.View):
         )
 
     @discord.ui.button(label="Kick", style=discord.ButtonStyle.danger, custom_id="voice.button:kick")
+    @unit_of_work
     async def kick(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
@@ -92,18 +100,19 @@ class VoiceViews(discord.ui.View):
         )
 
     @discord.ui.button(label="Delete", style=discord.ButtonStyle.danger, custom_id="voice.button:delete")
+    @unit_of_work
     async def delete(self, interaction: discord.Interaction, button: discord.ui.Button):
         voice_channel, _ = await handle_voice_channel_selection(interaction)
         if not voice_channel:
             return
 
-        voice = get_voice_by_channel(interaction.guild.id, voice_channel.id)
+        voice = await get_voice_by_channel(interaction.guild.id, voice_channel.id)
         if not voice.is_temporary:
             return await interaction.response.send_message("You need to use the command to delete this channel!",
                                                            ephemeral=True)
         try:
             await voice_channel.delete()
-            mark_voice_closed(voice_channel.id)
+            await mark_voice_closed(voice_channel.id)
         except Exception as e:
             return await interaction.response.send_message(f"Something went wrong while deleting the channel -> {e}")
 
@@ -5,7 +5,8 @@ import os
 import nest_asyncio
 from dotenv import load_dotenv
 
-from backend.core.database import Engine, init_tables
+from backend.core.database import Engine, init_tables, PING_MODE, keep_pool_healthy, begin_unit_of_work, \
+    end_unit_of_work
 
 nest_asyncio.apply()
 
@@ -22,22 +23,32 @@ from backend.core.helper import format_time_in_zone
 
 load_dotenv(f"io/.env")
 
-bot = commands.Bot(command_prefix="?", help_command=None, intents=discord.Intents.all())
+
+class Dorayaki(commands.Bot):
+    async def invoke(self, ctx: commands.Context):
+        # One session per command, shared by its checks, hooks and callback
+        token = begin_unit_of_work(ctx.guild.id if ctx.guild else None)
+        try:
+            await super().invoke(ctx)
+        except BaseException:
+            await end_unit_of_work(token, failed=True)
+            raise
+
+        try:
+            # The command error handler already ran for a failed command, its writes are rolled back
+            await end_unit_of_work(token, failed=ctx.command_failed)
+        except Exception as e:
+            # The command already answered, tell it its changes were lost
+            self.dispatch("command_error", ctx, commands.CommandInvokeError(e))
+
+
+bot = Dorayaki(command_prefix="?", help_command=None, intents=discord.Intents.all())
 bot.client = OpenAI(api_key=os.getenv("OPENAI"))
 
 print(f"Dorayaki Robot")
 print(f"Running at Python {platform.python_version()}v, "
       f"Discord.py {discord.__version__}v - {platform.system()} {platform.release()} ({os.name})")
 
-try:
-    postgre_uptime = datetime.now()
-    with Engine.connect() as connection:
-        print(f"Running PostgreSQL with SQLAlchemy at {str(format_time_in_zone(postgre_uptime, format="%S"))}ms")
-    init_tables()
-except Exception as e:
-    print(f"Failed to connect to PostgreSQL -> {e}")
-    sys.exit(0)
-
 try:
     test_response = bot.client.chat.completions.create(
         model="gpt-4o-mini",
@@ -69,7 +80,22 @@ async def load():
             continue
 
 
+async def connect():
+    try:
+        postgre_uptime = datetime.now()
+        async with Engine.connect() as connection:
+            print(f"Running PostgreSQL with SQLAlchemy at {str(format_time_in_zone(postgre_uptime, format="%S"))}ms")
+        await init_tables()
+
+        if PING_MODE == "background":
+            bot.pool_health_check = asyncio.create_task(keep_pool_healthy())
+    except Exception as e:
+        print(f"Failed to connect to PostgreSQL -> {e}")
+        sys.exit(0)
+
+
 async def main():
+    await connect()
     await load()
     await bot.start(os.getenv("TOKEN"))
 
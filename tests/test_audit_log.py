@@ -0,0 +1,74 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+
+import discord
+
+from backend.core.audit_log import AuditLogIndex
+
+ACTION = discord.AuditLogAction.channel_delete
+
+
+def make_entry(guild_id: int, target_id: int, action=ACTION):
+    return SimpleNamespace(
+        action=action,
+        target=SimpleNamespace(id=target_id),
+        guild=SimpleNamespace(id=guild_id),
+        created_at=discord.utils.utcnow()
+    )
+
+
+class AuditLogIndexTest(unittest.IsolatedAsyncioTestCase):
+    async def test_get_finds_the_recorded_entry(self):
+        index = AuditLogIndex()
+        entry = make_entry(1, 10)
+        index.record(entry)
+
+        self.assertIs(index.get(1, ACTION, 10), entry)
+        self.assertIsNone(index.get(1, ACTION, 11))
+        self.assertIsNone(index.get(2, ACTION, 10))
+
+    async def test_buffer_drops_the_oldest_entry(self):
+        index = AuditLogIndex(max_entries=2)
+        for target_id in (10, 11, 12):
+            index.record(make_entry(1, target_id))
+
+        self.assertIsNone(index.get(1, ACTION, 10))
+        self.assertIsNotNone(index.get(1, ACTION, 12))
+        self.assertEqual(index.stats()["entries"], 2)
+
+    async def test_wait_for_wakes_up_when_the_entry_arrives(self):
+        index = AuditLogIndex()
+        entry = make_entry(1, 10)
+
+        waiting = asyncio.create_task(index.wait_for(1, ACTION, 10, timeout=5))
+        await asyncio.sleep(0)
+        index.record(entry)
+
+        self.assertIs(await waiting, entry)
+        self.assertEqual(index.stats()["waiters"], 0)
+
+    async def test_wait_for_times_out(self):
+        index = AuditLogIndex()
+
+        self.assertIsNone(await index.wait_for(1, ACTION, 10, timeout=0.01))
+        self.assertEqual(index.stats()["waiters"], 0)
+
+    async def test_forget_releases_the_guild_waiters(self):
+        index = AuditLogIndex()
+
+        forgotten = asyncio.create_task(index.wait_for(1, ACTION, 10, timeout=5))
+        other = asyncio.create_task(index.wait_for(2, ACTION, 10, timeout=5))
+        await asyncio.sleep(0)
+
+        index.forget(1)
+        self.assertIsNone(await asyncio.wait_for(forgotten, timeout=1))
+        self.assertFalse(other.done())
+
+        entry = make_entry(2, 10)
+        index.record(entry)
+        self.assertIs(await other, entry)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+from backend.core import cache
+from backend.core.cache import TTLCache, freeze_mapping, reset_guild_caches
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class TTLCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.enterContext(mock.patch.object(cache, "time", self.clock))
+        self.enterContext(mock.patch.object(cache, "_caches", {}))
+        self.enterContext(mock.patch.object(cache, "_guild_reset_hooks", []))
+
+    def test_entries_expire_after_the_ttl(self):
+        configs = TTLCache("configs", ttl=60)
+        configs.set(1, "config")
+
+        self.clock.now += 59
+        self.assertEqual(configs.get(1), "config")
+
+        self.clock.now += 1
+        self.assertIsNone(configs.get(1))
+        self.assertEqual(len(configs), 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        configs = TTLCache("configs", max_size=2)
+        configs.set(1, "first")
+        configs.set(2, "second")
+        configs.get(1)
+        configs.set(3, "third")
+
+        self.assertIsNone(configs.get(2))
+        self.assertEqual(configs.get(1), "first")
+        self.assertEqual(configs.get(3), "third")
+        self.assertEqual(configs.evictions, 1)
+
+    def test_stats_count_hits_and_misses(self):
+        configs = TTLCache("configs")
+        configs.set(1, "config")
+        configs.get(1)
+        configs.get(1)
+        configs.get(2)
+
+        stats = configs.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["size"]), (2, 1, 1))
+        self.assertAlmostEqual(stats["hit_ratio"], 2 / 3)
+
+    def test_guild_reset_leaves_other_guilds_and_user_keyed_caches(self):
+        configs = TTLCache("configs")
+        closed_dms = TTLCache("closed_dms", guild_keyed=False)
+        reset: list[int | None] = []
+        cache.register_guild_reset(reset.append)
+
+        configs.set(1, "guild 1")
+        configs.set((1, "support"), "guild 1 panel")
+        configs.set(2, "guild 2")
+        closed_dms.set(1, True)
+
+        reset_guild_caches(1)
+        self.assertIsNone(configs.get(1))
+        self.assertIsNone(configs.get((1, "support")))
+        self.assertEqual(configs.get(2), "guild 2")
+        self.assertTrue(closed_dms.get(1))
+
+        reset_guild_caches(None)
+        self.assertEqual(len(configs), 0)
+        self.assertTrue(closed_dms.get(1))
+        self.assertEqual(reset, [1, None])
+
+    def test_frozen_mapping_is_a_read_only_copy(self):
+        embed = {"title": "Support"}
+        frozen = freeze_mapping(embed)
+        embed["title"] = "Changed"
+
+        self.assertEqual(frozen["title"], "Support")
+        with self.assertRaises(TypeError):
+            frozen["title"] = "Changed"
+        self.assertIsNone(freeze_mapping(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import discord
+
+from backend.core import cache, workers
+from backend.core.dm_outbox import DMOutbox
+
+
+def http_error(error: type[discord.HTTPException], status: int, code: int = 0) -> discord.HTTPException:
+    response = SimpleNamespace(status=status, reason="", headers={})
+    return error(response, {"code": code, "message": ""})
+
+
+class FakeGuild:
+    def __init__(self, member_ids: set[int]):
+        self.member_ids = member_ids
+
+    def get_member(self, user_id: int):
+        return object() if user_id in self.member_ids else None
+
+
+class FakeUser:
+    def __init__(self, user_id: int = 1, failures: list[Exception] | None = None, guild=None, mutual_guilds=()):
+        self.id = user_id
+        self.failures = list(failures or [])
+        self.guild = guild
+        self.mutual_guilds = list(mutual_guilds)
+        self.received: list[str] = []
+
+    async def send(self, message: str):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.received.append(message)
+
+    def __str__(self):
+        return f"user {self.id}"
+
+
+class DMOutboxTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(cache, "_caches", {}))
+        self.enterContext(mock.patch.object(workers, "_pools", {}))
+        self.outbox = DMOutbox()
+        self.addCleanup(self.outbox._pool.stop)
+
+    async def test_message_is_delivered(self):
+        user = FakeUser()
+
+        self.assertTrue(await self.outbox.send(user, "You were warned."))
+        self.assertEqual(user.received, ["You were warned."])
+        self.assertEqual(self.outbox.stats()["delivered"], 1)
+
+    async def test_closed_dms_are_skipped_until_they_expire(self):
+        left, other = FakeGuild(set()), FakeGuild({1})
+        user = FakeUser(failures=[http_error(discord.Forbidden, 403, 50007)], guild=left, mutual_guilds=[left, other])
+
+        self.assertFalse(await self.outbox.send(user, "First"))
+        self.assertFalse(await self.outbox.send(user, "Second"))
+
+        self.assertEqual(user.received, [])
+        self.assertEqual(self.outbox.stats()["skipped"], 1)
+        self.assertEqual(self.outbox.stats()["closed"], 1)
+
+    async def test_user_sharing_no_other_guild_is_not_marked_closed(self):
+        left = FakeGuild(set())
+        user = FakeUser(failures=[http_error(discord.Forbidden, 403, 50007)], guild=left, mutual_guilds=[left])
+
+        self.assertFalse(await self.outbox.send(user, "You were banned."))
+        self.assertTrue(await self.outbox.send(user, "You were unbanned."))
+        self.assertEqual(self.outbox.stats()["closed"], 0)
+
+    async def test_rate_limited_message_is_retried(self):
+        user = FakeUser(failures=[discord.RateLimited(0.01)])
+
+        self.assertTrue(await asyncio.wait_for(self.outbox.send(user, "You were muted."), timeout=1))
+        self.assertEqual(user.received, ["You were muted."])
+        self.assertEqual(self.outbox._pool.rate_limited, 1)
+
+    async def test_failure_is_reported_to_the_context(self):
+        ctx = SimpleNamespace(reply=mock.AsyncMock())
+        user = FakeUser(failures=[http_error(discord.HTTPException, 400)])
+
+        self.assertFalse(await self.outbox.send(user, "You were kicked.", ctx))
+        ctx.reply.assert_awaited_once_with("Wasn't able to message **user 1**.")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import discord
+
+from backend.core.log_dispatcher import LogDispatcher
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", embeds: list[discord.Embed]):
+        self.channel = channel
+        self.embeds = embeds
+
+    async def edit(self, embeds: list[discord.Embed]):
+        self.embeds = embeds
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int = 1, failures: list[Exception] | None = None):
+        self.id = channel_id
+        self.failures = list(failures or [])
+        self.messages: list[FakeMessage] = []
+
+    async def send(self, embeds: list[discord.Embed]) -> FakeMessage:
+        if self.failures:
+            raise self.failures.pop(0)
+
+        message = FakeMessage(self, embeds)
+        self.messages.append(message)
+        return message
+
+
+def make_embed(index: int, size: int = 0) -> discord.Embed:
+    return discord.Embed(title=f"Log {index}", description="x" * size or None)
+
+
+class LogDispatcherTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch("builtins.print"))
+        self.dispatcher = LogDispatcher(flush_interval=0.01)
+
+    async def test_embeds_are_coalesced_ten_per_message(self):
+        channel = FakeChannel()
+        entries = [self.dispatcher.send(channel, make_embed(index)) for index in range(25)]
+        await asyncio.wait_for(asyncio.gather(*(entry.posted for entry in entries)), timeout=1)
+
+        self.assertEqual([len(message.embeds) for message in channel.messages], [10, 10, 5])
+        titles = [embed.title for message in channel.messages for embed in message.embeds]
+        self.assertEqual(titles, [f"Log {index}" for index in range(25)])
+        self.assertEqual(self.dispatcher.stats()["sent_messages"], 3)
+
+    async def test_message_stays_under_the_character_limit(self):
+        channel = FakeChannel()
+        entries = [self.dispatcher.send(channel, make_embed(index, 2500)) for index in range(5)]
+        await asyncio.wait_for(asyncio.gather(*(entry.posted for entry in entries)), timeout=1)
+
+        self.assertEqual([len(message.embeds) for message in channel.messages], [2, 2, 1])
+        for message in channel.messages:
+            self.assertLessEqual(sum(len(embed) for embed in message.embeds), 6000)
+
+    async def test_channels_are_sent_separately(self):
+        first, second = FakeChannel(1), FakeChannel(2)
+        entries = [self.dispatcher.send(first, make_embed(0)), self.dispatcher.send(second, make_embed(1))]
+        await asyncio.wait_for(asyncio.gather(*(entry.posted for entry in entries)), timeout=1)
+
+        self.assertEqual(len(first.messages), 1)
+        self.assertEqual(len(second.messages), 1)
+        self.assertEqual(self.dispatcher.stats()["channels"], 0)
+
+    async def test_rate_limited_send_is_retried(self):
+        channel = FakeChannel(failures=[discord.RateLimited(0.01)])
+        entry = self.dispatcher.send(channel, make_embed(0))
+
+        self.assertIsNotNone(await asyncio.wait_for(entry.posted, timeout=1))
+        self.assertEqual(self.dispatcher.retried, 1)
+        self.assertEqual(len(channel.messages), 1)
+
+    async def test_embeds_are_dropped_after_max_attempts(self):
+        channel = FakeChannel(failures=[discord.RateLimited(0.001)] * 3)
+        entry = self.dispatcher.send(channel, make_embed(0))
+
+        self.assertIsNone(await asyncio.wait_for(entry.posted, timeout=1))
+        self.assertEqual(self.dispatcher.dropped, 1)
+
+    async def test_full_queue_drops_the_oldest_embed(self):
+        dispatcher = LogDispatcher(flush_interval=0.01, max_queued=3)
+        channel = FakeChannel()
+        entries = [dispatcher.send(channel, make_embed(index)) for index in range(4)]
+
+        self.assertIsNone(await entries[0].posted)
+        await asyncio.wait_for(entries[-1].posted, timeout=1)
+        self.assertEqual([embed.title for embed in channel.messages[0].embeds], ["Log 1", "Log 2", "Log 3"])
+
+    async def test_edit_keeps_the_rest_of_the_message(self):
+        channel = FakeChannel()
+        queued = self.dispatcher.send(channel, make_embed(0))
+        other = self.dispatcher.send(channel, make_embed(1))
+
+        # Edited before it was posted, the new embed goes out in its place
+        self.assertTrue(await self.dispatcher.edit(queued, make_embed(2)))
+        message = await asyncio.wait_for(queued.posted, timeout=1)
+        self.assertEqual([embed.title for embed in message.embeds], ["Log 2", "Log 1"])
+
+        self.assertTrue(await self.dispatcher.edit(other, make_embed(3)))
+        self.assertEqual([embed.title for embed in message.embeds], ["Log 2", "Log 3"])
+        self.assertEqual(self.dispatcher.edited, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
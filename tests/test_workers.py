@@ -0,0 +1,125 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import discord
+
+from backend.core import workers
+from backend.core.workers import WorkerPool, get_retry_after
+
+
+def rate_limit(retry_after: float, is_global: bool = False) -> discord.HTTPException:
+    headers = {"Retry-After": str(retry_after), "X-RateLimit-Global": "true" if is_global else "false"}
+    response = SimpleNamespace(status=429, reason="Too Many Requests", headers=headers)
+    return discord.HTTPException(response, "You are being rate limited.")
+
+
+class RetryAfterTest(unittest.TestCase):
+    def test_reads_the_rate_limit_delay(self):
+        self.assertEqual(get_retry_after(discord.RateLimited(2.5)), 2.5)
+        self.assertEqual(get_retry_after(rate_limit(0.75)), 0.75)
+        self.assertIsNone(get_retry_after(RuntimeError()))
+
+
+class WorkerPoolTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.object(workers, "_pools", {}))
+        self.enterContext(mock.patch("builtins.print"))
+
+    def make_pool(self, **kwargs) -> WorkerPool:
+        pool = WorkerPool("test", **kwargs)
+        self.addCleanup(pool.stop)
+        return pool
+
+    async def test_per_key_limit_bounds_concurrency(self):
+        pool = self.make_pool(workers=8, per_key_limit=2)
+        running: dict[str, int] = {"a": 0, "b": 0}
+        peak: dict[str, int] = {"a": 0, "b": 0}
+        release = asyncio.Event()
+
+        def job(key: str, value: int):
+            async def run():
+                running[key] += 1
+                peak[key] = max(peak[key], running[key])
+                await release.wait()
+                running[key] -= 1
+                return value
+
+            return run
+
+        futures = [pool.submit("a", job("a", value)) for value in range(5)]
+        futures.append(pool.submit("b", job("b", 5)))
+        await asyncio.sleep(0.01)
+
+        self.assertEqual(running, {"a": 2, "b": 1})
+        self.assertEqual(pool.stats()["queued"], 3)
+
+        release.set()
+        self.assertEqual(await asyncio.gather(*futures), list(range(6)))
+        self.assertEqual(peak, {"a": 2, "b": 1})
+        self.assertEqual(pool.completed, 6)
+
+    async def test_rate_limited_job_is_retried_after_the_delay(self):
+        pool = self.make_pool(workers=2)
+        attempts: list[float] = []
+
+        async def job():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise discord.RateLimited(0.05)
+            return "sent"
+
+        self.assertEqual(await asyncio.wait_for(pool.submit(1, job), timeout=1), "sent")
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.05)
+        self.assertEqual(pool.rate_limited, 1)
+        self.assertEqual(pool.failed, 0)
+
+    async def test_global_rate_limit_pauses_every_key(self):
+        pool = self.make_pool(workers=2)
+        limited = False
+
+        async def job():
+            nonlocal limited
+            if not limited:
+                limited = True
+                raise rate_limit(0.1, is_global=True)
+            return time.monotonic()
+
+        started = time.monotonic()
+        await asyncio.wait_for(pool.submit(1, job), timeout=1)
+        other = await asyncio.wait_for(pool.submit(2, lambda: asyncio.sleep(0, time.monotonic())), timeout=1)
+
+        self.assertGreaterEqual(other - started, 0.1)
+
+    async def test_job_fails_after_max_attempts(self):
+        pool = self.make_pool(workers=1, max_attempts=3)
+        calls = 0
+
+        async def job():
+            nonlocal calls
+            calls += 1
+            raise discord.RateLimited(0.001)
+
+        with self.assertRaises(discord.RateLimited):
+            await asyncio.wait_for(pool.submit(1, job), timeout=1)
+        self.assertEqual(calls, 3)
+        self.assertEqual(pool.failed, 1)
+
+    async def test_stop_fails_unfinished_jobs(self):
+        pool = self.make_pool(workers=1, per_key_limit=1)
+        release = asyncio.Event()
+
+        running = pool.submit(1, release.wait)
+        backlogged = pool.submit(1, release.wait)
+        await asyncio.sleep(0)
+
+        pool.stop()
+        for future in (running, backlogged):
+            with self.assertRaises(RuntimeError):
+                await future
+
+
+if __name__ == "__main__":
+    unittest.main()